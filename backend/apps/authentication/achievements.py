@@ -0,0 +1,196 @@
+"""
+Achievement rules and awarding.
+
+Every rule is a grouped query returning the ids of qualifying users, so a
+full evaluation is a handful of set-based statements no matter how many users
+there are. `award_achievements` runs them for everyone (the nightly
+`manage.py evaluate_achievements` job); `evaluate_for_activities` re-checks
+only the cheap rules triggered by a batch of freshly written activities.
+"""
+import uuid
+from datetime import timedelta
+
+from django.db.models import Count, Exists, F, OuterRef, Sum, Window
+from django.db.models.functions import Rank, TruncDate
+from django.utils import timezone
+
+from .models import User, AcademicProfile, Achievement, UserAchievement, UserActivity
+
+
+STREAK_DAYS = 7
+TOP_CONTRIBUTOR_MIN_POSTS = 3
+
+
+class Rule:
+    def __init__(self, name, qualifying, triggers=()):
+        self.name = name
+        self.qualifying = qualifying
+        self.triggers = set(triggers)
+
+
+RULES = {}
+
+
+def rule(name, triggers=()):
+    """Register a rule; `triggers` are the activity types that make it worth re-checking"""
+    def decorator(func):
+        RULES[name] = Rule(name, func, triggers)
+        return func
+    return decorator
+
+
+def _users_with_at_least(queryset, user_field, minimum, user_ids=None, value=None):
+    if user_ids is not None:
+        queryset = queryset.filter(**{f'{user_field}__in': user_ids})
+    return (
+        queryset.order_by()
+        .values(user_field)
+        .annotate(total=value or Count('pk'))
+        .filter(total__gte=minimum)
+        .values_list(user_field, flat=True)
+    )
+
+
+@rule('first_post', triggers=['post_created'])
+def first_post(user_ids=None):
+    from apps.hubs.models import Post
+    return _users_with_at_least(Post.objects.all(), 'author', 1, user_ids)
+
+
+@rule('knowledge_seeker', triggers=['post_created'])
+def knowledge_seeker(user_ids=None):
+    from apps.hubs.models import Post
+    return _users_with_at_least(Post.objects.filter(post_type='question'), 'author', 10, user_ids)
+
+
+@rule('community_builder', triggers=['comment_made'])
+def community_builder(user_ids=None):
+    from apps.hubs.models import Comment
+    return _users_with_at_least(Comment.objects.all(), 'author', 50, user_ids)
+
+
+@rule('helpful_contributor', triggers=['upvote_received'])
+def helpful_contributor(user_ids=None):
+    from apps.hubs.models import Post
+    return _users_with_at_least(Post.objects.all(), 'author', 10, user_ids, value=Sum('upvotes'))
+
+
+@rule('active_member', triggers=['hub_joined'])
+def active_member(user_ids=None):
+    from apps.hubs.models import CareerHub
+    return _users_with_at_least(CareerHub.members.through.objects.all(), 'user', 5, user_ids)
+
+
+@rule('goal_setter', triggers=['profile_updated'])
+def goal_setter(user_ids=None):
+    profiles = AcademicProfile.objects.exclude(career_goals__isnull=True).exclude(career_goals='')
+    if user_ids is not None:
+        profiles = profiles.filter(user__in=user_ids)
+    return profiles.values_list('user', flat=True)
+
+
+@rule('profile_complete', triggers=['profile_updated'])
+def profile_complete(user_ids=None):
+    users = User.objects.filter(profile_completion__gte=100)
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+    return users.values_list('pk', flat=True)
+
+
+@rule('streak_7')
+def streak_7(user_ids=None):
+    """Active on each of the last seven days, ending today or yesterday"""
+    today = timezone.localdate()
+    qualifying = set()
+    for end in (today, today - timedelta(days=1)):
+        start = end - timedelta(days=STREAK_DAYS - 1)
+        window = UserActivity.objects.annotate(day=TruncDate('created_at')).filter(day__gte=start, day__lte=end)
+        qualifying.update(
+            _users_with_at_least(window, 'user', STREAK_DAYS, user_ids, value=Count('day', distinct=True))
+        )
+    return qualifying
+
+
+@rule('top_contributor')
+def top_contributor(user_ids=None):
+    """Most posts in a hub this month (ties share the badge)"""
+    from apps.hubs.models import Post
+    month_start = timezone.localtime().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    ranked = (
+        Post.objects.filter(created_at__gte=month_start)
+        .order_by()
+        .values('hub', 'author')
+        .annotate(total=Count('pk'))
+        .filter(total__gte=TOP_CONTRIBUTOR_MIN_POSTS)
+        .annotate(rank=Window(Rank(), partition_by=F('hub'), order_by=F('total').desc()))
+        .filter(rank=1)
+    )
+    # Window filters are applied in an outer query, so narrow to users in Python
+    authors = set(ranked.values_list('author', flat=True))
+    if user_ids is not None:
+        authors &= set(user_ids)
+    return authors
+
+
+def award_achievements(rule_names=None, user_ids=None, dry_run=False, batch_size=1000):
+    """
+    Evaluate rules and award every achievement not held yet.
+    Returns `{rule_name: number_of_new_awards}`.
+    """
+    names = [name for name in (rule_names or RULES) if name in RULES]
+    achievements = {
+        achievement.name: achievement
+        for achievement in Achievement.objects.filter(name__in=names).order_by('-created_at')
+    }
+
+    results = {}
+    for name in names:
+        achievement = achievements.get(name)
+        if achievement is None:
+            continue
+        already_earned = UserAchievement.objects.filter(user=OuterRef('pk'), achievement=achievement)
+        qualifying = RULES[name].qualifying(user_ids)
+        new_user_ids = list(
+            User.objects.filter(pk__in=qualifying).filter(~Exists(already_earned)).values_list('pk', flat=True)
+        )
+        results[name] = len(new_user_ids)
+        if dry_run or not new_user_ids:
+            continue
+
+        UserAchievement.objects.bulk_create(
+            [UserAchievement(user_id=user_id, achievement=achievement) for user_id in new_user_ids],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        UserActivity.objects.bulk_create(
+            [
+                UserActivity(
+                    user_id=user_id,
+                    activity_type='achievement_earned',
+                    target_id=achievement.pk,
+                    target_type='achievement',
+                    description=f"Earned {achievement.title}",
+                )
+                for user_id in new_user_ids
+            ],
+            batch_size=batch_size,
+        )
+    return results
+
+
+def evaluate_for_activities(activities):
+    """Re-check the rules triggered by a batch of activities, for the affected users only"""
+    users_by_rule = {}
+    for activity in activities:
+        triggers = [(activity.activity_type, activity.user_id)]
+        # Upvotes count towards the post author, not the voter
+        author_id = (activity.metadata or {}).get('author_id')
+        if activity.activity_type == 'post_upvoted' and author_id:
+            triggers.append(('upvote_received', author_id))
+        for activity_type, user_id in triggers:
+            for candidate in RULES.values():
+                if activity_type in candidate.triggers:
+                    users_by_rule.setdefault(candidate.name, set()).add(user_id)
+
+    for name, user_ids in users_by_rule.items():
+        award_achievements([name], user_ids=[uuid.UUID(str(user_id)) for user_id in user_ids])
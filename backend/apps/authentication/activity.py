@@ -0,0 +1,186 @@
+"""
+Asynchronous UserActivity recording.
+
+Write paths call `record_activity`, which only hands the event off; rows reach
+`user_activities` in bulk INSERTs. The ACTIVITY_RECORDING_MODE setting picks
+how events wait:
+
+- `memory` (default): a bounded in-process buffer flushed by a background
+  thread every ACTIVITY_FLUSH_INTERVAL seconds, or as soon as
+  ACTIVITY_BATCH_SIZE events are waiting. Loss is bounded: once
+  ACTIVITY_BUFFER_SIZE events are waiting new ones are dropped (and counted),
+  and a crash loses at most what is buffered.
+- `durable`: events are staged in the narrow `activity_queue` table inside the
+  request's transaction and moved over by `manage.py flush_activities`.
+
+Either way an event is only recorded if the surrounding transaction commits.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+
+from .achievements import evaluate_for_activities
+from .models import User, UserActivity, QueuedActivity
+
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_FIELDS = ('user_id', 'activity_type', 'target_id', 'target_type', 'description', 'metadata', 'created_at')
+
+
+def write_activities(activities):
+    """Bulk insert UserActivity instances, skipping users deleted in the meantime"""
+    if not activities:
+        return 0
+    existing = set(
+        User.objects.filter(pk__in={activity.user_id for activity in activities}).values_list('pk', flat=True)
+    )
+    activities = [activity for activity in activities if activity.user_id in existing]
+    UserActivity.objects.bulk_create(activities, batch_size=settings.ACTIVITY_BATCH_SIZE)
+    try:
+        # Savepoint: a failed evaluation must not abort the caller's transaction
+        # (flush_activity_queue would otherwise roll the batch back and retry it forever)
+        with transaction.atomic():
+            evaluate_for_activities(activities)
+    except DatabaseError:
+        logger.exception('Could not evaluate achievements for %d activities', len(activities))
+    return len(activities)
+
+
+class ActivityBuffer:
+    """Bounded in-memory queue of pending activities with a lazily started flusher thread"""
+
+    def __init__(self, max_size, batch_size, flush_interval):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self._events = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def append(self, activity):
+        with self._lock:
+            if len(self._events) >= self.max_size:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 1000 == 0:
+                    logger.warning('Activity buffer full, %d events dropped so far', self.dropped)
+                return False
+            self._events.append(activity)
+            pending = len(self._events)
+        self._ensure_worker()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _drain(self):
+        with self._lock:
+            count = min(self.batch_size, len(self._events))
+            return [self._events.popleft() for _ in range(count)]
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of rows inserted"""
+        written = 0
+        while True:
+            batch = self._drain()
+            if not batch:
+                break
+            try:
+                written += write_activities(batch)
+            except DatabaseError:
+                self.dropped += len(batch)
+                logger.exception('Could not write %d buffered activities', len(batch))
+        self.written += written
+        return written
+
+    def _ensure_worker(self):
+        # Re-spawn after a fork: threads do not survive into the child process
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='activity-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                # The flusher thread owns its own connections; don't keep them idle
+                connections.close_all()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_activity_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = ActivityBuffer(
+                    max_size=settings.ACTIVITY_BUFFER_SIZE,
+                    batch_size=settings.ACTIVITY_BATCH_SIZE,
+                    flush_interval=settings.ACTIVITY_FLUSH_INTERVAL,
+                )
+                atexit.register(_buffer.flush)
+    return _buffer
+
+
+def record_activity(user, activity_type, description, target=None, target_type=None, metadata=None):
+    """
+    Record that `user` did something. `target` may be a model instance or a
+    raw id (with `target_type`). Returns immediately; see the module docstring.
+    """
+    if target is not None and hasattr(target, '_meta'):
+        target_type = target_type or target._meta.model_name
+        target = target.pk
+    activity = UserActivity(
+        user_id=user.pk,
+        activity_type=activity_type,
+        target_id=target,
+        target_type=target_type,
+        description=description,
+        metadata=metadata or {},
+    )
+
+    if settings.ACTIVITY_RECORDING_MODE == 'durable':
+        QueuedActivity.objects.create(**{field: getattr(activity, field) for field in ACTIVITY_FIELDS})
+    else:
+        transaction.on_commit(lambda: get_activity_buffer().append(activity))
+
+
+def flush_activity_queue(batch_size=None):
+    """
+    Move one batch of durable queue rows into UserActivity.
+    Rows are claimed with SKIP LOCKED where supported, so several workers can run.
+    """
+    batch_size = batch_size or settings.ACTIVITY_BATCH_SIZE
+    with transaction.atomic():
+        queued = list(
+            QueuedActivity.objects.select_for_update(skip_locked=True).order_by('id')[:batch_size]
+        )
+        if not queued:
+            return 0
+        write_activities([
+            UserActivity(**{field: getattr(entry, field) for field in ACTIVITY_FIELDS}) for entry in queued
+        ])
+        QueuedActivity.objects.filter(id__in=[entry.id for entry in queued]).delete()
+    return len(queued)
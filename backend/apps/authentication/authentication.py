@@ -0,0 +1,102 @@
+"""
+Authentication classes that resolve credentials to users through the cache.
+
+Token and JWT lookups normally cost a query on every authenticated request.
+Here the token-to-user mapping and the user row are cached for a short time
+and dropped explicitly on logout, password change and deactivation (see
+`signals.py`), so read traffic identifies users without a DB round-trip.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import User
+
+
+AUTH_CACHE_TIMEOUT = 5 * 60  # seconds
+
+
+def _user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def _token_cache_key(key):
+    return f'auth:token:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def get_cached_user(user_id):
+    """Return the user with `user_id`, or None if it does not exist"""
+    cache_key = _user_cache_key(user_id)
+    user = cache.get(cache_key)
+    if user is None:
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            return None
+        cache.set(cache_key, user, AUTH_CACHE_TIMEOUT)
+    return user
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(_user_cache_key(user_id))
+
+
+def invalidate_cached_token(key):
+    cache.delete(_token_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """DRF token authentication with the token-to-user resolution cached"""
+
+    def authenticate_credentials(self, key):
+        cache_key = _token_cache_key(key)
+        user_id = cache.get(cache_key)
+        if user_id is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, user.pk, AUTH_CACHE_TIMEOUT)
+            cache.set(_user_cache_key(user.pk), user, AUTH_CACHE_TIMEOUT)
+            return (user, token)
+
+        user = get_cached_user(user_id)
+        if user is None:
+            invalidate_cached_token(key)
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        token = self.get_model()(key=key, user=user)
+        return (user, token)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """Simple JWT authentication that loads the token's user from the cache"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        if jwt_settings.USER_ID_FIELD != 'id':
+            return super().get_user(validated_token)
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise exceptions.AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if jwt_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(jwt_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise exceptions.AuthenticationFailed(
+                    _("The user's password has been changed."), code='password_changed'
+                )
+
+        return user
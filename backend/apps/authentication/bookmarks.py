@@ -0,0 +1,63 @@
+"""
+Bookmark hydration.
+
+Bookmarks are polymorphic (`bookmark_type`, `bookmark_id`) pairs, so rendering
+a list used to take one detail request per bookmark. `hydrate_bookmarks`
+groups the ids by type and loads each type with a single `id__in` query.
+"""
+from apps.courses.models import Course, University
+from apps.hubs.models import Post
+from apps.societies.models import Society
+
+from .serializers import (
+    BookmarkedCourseSerializer, BookmarkedUniversitySerializer,
+    BookmarkedPostSerializer, BookmarkedSocietySerializer,
+)
+
+
+def _slim(model, serializer_class):
+    return model.objects.only(*serializer_class.Meta.fields)
+
+
+def _posts():
+    return (
+        Post.objects.filter(is_deleted=False)
+        .select_related('hub')
+        .only('id', 'title', 'slug', 'hub__name', 'post_type', 'score', 'comment_count', 'created_at')
+    )
+
+
+# bookmark_type -> (queryset factory, slim serializer)
+BOOKMARK_TARGETS = {
+    'course': (lambda: _slim(Course, BookmarkedCourseSerializer), BookmarkedCourseSerializer),
+    'university': (lambda: _slim(University, BookmarkedUniversitySerializer), BookmarkedUniversitySerializer),
+    'post': (_posts, BookmarkedPostSerializer),
+    'society': (lambda: _slim(Society, BookmarkedSocietySerializer), BookmarkedSocietySerializer),
+}
+
+
+def hydrate_bookmarks(bookmarks):
+    """
+    Attach the serialized target to each bookmark as `item`.
+    Bookmarks whose target no longer exists (or is deleted) are dropped.
+    """
+    bookmarks = list(bookmarks)
+    ids_by_type = {}
+    for bookmark in bookmarks:
+        ids_by_type.setdefault(bookmark.bookmark_type, set()).add(bookmark.bookmark_id)
+
+    items = {}
+    for bookmark_type, ids in ids_by_type.items():
+        if bookmark_type not in BOOKMARK_TARGETS:
+            continue
+        queryset, serializer_class = BOOKMARK_TARGETS[bookmark_type]
+        for obj in queryset().filter(id__in=ids):
+            items[(bookmark_type, obj.pk)] = serializer_class(obj).data
+
+    hydrated = []
+    for bookmark in bookmarks:
+        item = items.get((bookmark.bookmark_type, bookmark.bookmark_id))
+        if item is not None:
+            bookmark.item = item
+            hydrated.append(bookmark)
+    return hydrated
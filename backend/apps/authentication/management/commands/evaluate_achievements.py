@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.authentication.achievements import RULES, award_achievements
+
+
+class Command(BaseCommand):
+    help = 'Evaluate achievement rules for all users and award new badges'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rule',
+            action='append',
+            dest='rules',
+            choices=sorted(RULES),
+            help='Only evaluate the given rule (can be repeated)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many users would be awarded',
+        )
+
+    def handle(self, *args, **options):
+        results = award_achievements(options['rules'], dry_run=options['dry_run'])
+        if not results:
+            raise CommandError('No achievements found; run populate_achievements first')
+
+        action = 'would be awarded' if options['dry_run'] else 'awarded'
+        for name, count in results.items():
+            self.stdout.write(self.style.SUCCESS(f'{name}: {count} {action}'))
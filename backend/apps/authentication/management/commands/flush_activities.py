@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.authentication.activity import flush_activity_queue
+
+
+class Command(BaseCommand):
+    help = 'Move queued activities (durable recording mode) into the activity table in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Rows moved per transaction (default: ACTIVITY_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running as a worker, polling for new rows',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds to sleep when the queue is empty in --loop mode (default: 2)',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            moved = flush_activity_queue(options['batch_size'])
+            total += moved
+            if moved:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Flushed {total} queued activities'))
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from apps.authentication.models import UserActivity
+
+
+class Command(BaseCommand):
+    help = 'Delete activity rows past retention and compact repeated older activities'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retain-days',
+            type=int,
+            default=settings.ACTIVITY_RETENTION_DAYS,
+            help='Delete activities older than this many days (default: ACTIVITY_RETENTION_DAYS)',
+        )
+        parser.add_argument(
+            '--compact-days',
+            type=int,
+            default=30,
+            help='For activities older than this, keep only the latest per user, type and target (default: 30)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows deleted per statement (default: 5000)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count rows, do not delete anything',
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        expired = UserActivity.objects.filter(created_at__lt=now - timedelta(days=options['retain_days']))
+
+        newer_duplicate = UserActivity.objects.filter(
+            user=OuterRef('user'),
+            activity_type=OuterRef('activity_type'),
+            target_type=OuterRef('target_type'),
+            target_id=OuterRef('target_id'),
+            created_at__gt=OuterRef('created_at'),
+        )
+        superseded = UserActivity.objects.filter(
+            created_at__lt=now - timedelta(days=options['compact_days']),
+            target_id__isnull=False,
+        ).filter(Exists(newer_duplicate))
+
+        for label, queryset in (('expired', expired), ('superseded', superseded)):
+            if options['dry_run']:
+                self.stdout.write(f'{label}: {queryset.count()} rows would be deleted')
+                continue
+            deleted = self.delete_in_batches(queryset, max(1, options['batch_size']))
+            self.stdout.write(self.style.SUCCESS(f'{label}: deleted {deleted} rows'))
+
+    def delete_in_batches(self, queryset, batch_size):
+        """Short DELETE statements by primary key so the table is never locked for long"""
+        deleted = 0
+        while True:
+            pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                return deleted
+            deleted += UserActivity.objects.filter(pk__in=pks).delete()[0]
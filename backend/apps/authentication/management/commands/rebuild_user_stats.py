@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.authentication.stats import rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild materialized user analytics (totals and daily buckets) from posts, comments and votes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='users',
+            help='Only rebuild the given user id (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_user_stats(user_ids=options['users'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {count} users'))
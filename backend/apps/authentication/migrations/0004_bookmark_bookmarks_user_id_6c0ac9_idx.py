@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-19 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_achievement_userachievement_useractivity'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookmark',
+            index=models.Index(fields=['user', '-created_at'], name='bookmarks_user_id_6c0ac9_idx'),
+        ),
+    ]
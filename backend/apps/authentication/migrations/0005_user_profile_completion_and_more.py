@@ -0,0 +1,54 @@
+# Generated by Django 5.0.14 on 2026-10-19 17:57
+
+from django.db import migrations, models
+
+
+def backfill_profile_completion(apps, schema_editor):
+    User = apps.get_model('authentication', 'User')
+    AcademicProfile = apps.get_model('authentication', 'AcademicProfile')
+    UserInterest = apps.get_model('authentication', 'UserInterest')
+
+    with_grades = set(
+        AcademicProfile.objects.exclude(kcse_grades__isnull=True).exclude(kcse_grades={})
+        .values_list('user_id', flat=True)
+    )
+    with_interests = set(
+        UserInterest.objects.exclude(career_interests=[]).values_list('user_id', flat=True)
+    )
+
+    users = list(User.objects.all())
+    for user in users:
+        details = {
+            'basic_info': bool(user.first_name and user.last_name),
+            'email': bool(user.email),
+            'profile_picture': bool(user.profile_picture),
+            'bio': bool(user.bio),
+            'location': bool(user.location),
+            'phone': bool(user.phone_number),
+            'academic_profile': user.pk in with_grades,
+            'career_interests': user.pk in with_interests,
+        }
+        user.profile_completion_details = details
+        user.profile_completion = round(sum(details.values()) / len(details) * 100)
+    User.objects.bulk_update(users, ['profile_completion', 'profile_completion_details'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_bookmark_bookmarks_user_id_6c0ac9_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_completion',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='profile_completion_details',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(backfill_profile_completion, migrations.RunPython.noop),
+    ]
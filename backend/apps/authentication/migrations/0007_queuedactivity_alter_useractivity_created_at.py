@@ -0,0 +1,35 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0006_userstats_userdailystats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedActivity',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('user_id', models.UUIDField()),
+                ('activity_type', models.CharField(max_length=30)),
+                ('target_id', models.UUIDField(blank=True, null=True)),
+                ('target_type', models.CharField(blank=True, max_length=50, null=True)),
+                ('description', models.TextField()),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'activity_queue',
+            },
+        ),
+        migrations.AlterField(
+            model_name='useractivity',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 import uuid
 
 
@@ -21,6 +22,8 @@ class User(AbstractUser):
     location = models.CharField(max_length=100, blank=True, null=True)
     email_verified = models.BooleanField(default=False)
     mfa_enabled = models.BooleanField(default=False)
+    profile_completion = models.PositiveSmallIntegerField(default=0, editable=False)
+    profile_completion_details = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -34,6 +37,36 @@ class User(AbstractUser):
     def __str__(self):
         return self.email
     
+    def save(self, *args, **kwargs):
+        self.update_profile_completion()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'profile_completion', 'profile_completion_details'}
+        super().save(*args, **kwargs)
+    
+    def _basic_completion_details(self):
+        return {
+            'basic_info': bool(self.first_name and self.last_name),
+            'email': bool(self.email),
+            'profile_picture': bool(self.profile_picture),
+            'bio': bool(self.bio),
+            'location': bool(self.location),
+            'phone': bool(self.phone_number),
+        }
+    
+    def update_profile_completion(self, **related_flags):
+        """
+        Recompute the stored completion score without touching related tables.
+        `academic_profile` / `career_interests` flags are passed in by the signals
+        that watch those models; otherwise the stored flags are kept.
+        """
+        stored = self.profile_completion_details or {}
+        details = self._basic_completion_details()
+        for flag in ('academic_profile', 'career_interests'):
+            details[flag] = bool(related_flags.get(flag, stored.get(flag, False)))
+        self.profile_completion_details = details
+        self.profile_completion = round(sum(details.values()) / len(details) * 100)
+    
     def get_profile_completion_percentage(self):
         """Calculate profile completion percentage"""
         total_fields = 8  # Total fields to track
@@ -66,12 +99,7 @@ class User(AbstractUser):
     def get_profile_completion_details(self):
         """Get detailed profile completion breakdown"""
         return {
-            'basic_info': bool(self.first_name and self.last_name),
-            'email': bool(self.email),
-            'profile_picture': bool(self.profile_picture),
-            'bio': bool(self.bio),
-            'location': bool(self.location),
-            'phone': bool(self.phone_number),
+            **self._basic_completion_details(),
             'academic_profile': bool(hasattr(self, 'academic_profile') and self.academic_profile.kcse_grades),
             'career_interests': bool(hasattr(self, 'interests') and self.interests.career_interests),
         }
@@ -136,6 +164,9 @@ class Bookmark(models.Model):
         db_table = 'bookmarks'
         unique_together = ['user', 'bookmark_type', 'bookmark_id']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.user.username} bookmarked {self.bookmark_type}"
@@ -210,7 +241,8 @@ class UserActivity(models.Model):
     target_type = models.CharField(max_length=50, blank=True, null=True)  # Type of related object
     description = models.TextField()  # Human-readable description
     metadata = models.JSONField(default=dict, blank=True)  # Additional data
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens, not when the batch reaches the table
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     
     class Meta:
         db_table = 'user_activities'
@@ -222,3 +254,62 @@ class UserActivity(models.Model):
     
     def __str__(self):
         return f"{self.user.username} - {self.activity_type}"
+
+
+class QueuedActivity(models.Model):
+    """
+    Durable staging row for an activity that has not been written yet.
+    Deliberately narrow and index-free so enqueueing stays cheap;
+    `manage.py flush_activities` moves rows into UserActivity in batches.
+    """
+    
+    id = models.BigAutoField(primary_key=True)
+    user_id = models.UUIDField()
+    activity_type = models.CharField(max_length=30)
+    target_id = models.UUIDField(blank=True, null=True)
+    target_type = models.CharField(max_length=50, blank=True, null=True)
+    description = models.TextField()
+    metadata = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        db_table = 'activity_queue'
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.activity_type}"
+
+
+class UserStats(models.Model):
+    """Materialized activity counters backing the analytics dashboard"""
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='stats')
+    total_posts = models.IntegerField(default=0)
+    total_comments = models.IntegerField(default=0)
+    upvotes_received = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'user_stats'
+    
+    def __str__(self):
+        return f"{self.user.username}'s Stats"
+
+
+class UserDailyStats(models.Model):
+    """Per-day activity buckets used for rolling analytics windows"""
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    posts = models.IntegerField(default=0)
+    comments = models.IntegerField(default=0)
+    upvotes_received = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'user_daily_stats'
+        unique_together = ['user', 'date']
+        ordering = ['-date']
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.date}"
@@ -1,13 +1,16 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import AcademicProfile, UserInterest, Bookmark, Achievement, UserAchievement, UserActivity
+from apps.courses.models import Course, University
+from apps.hubs.models import Post
+from apps.societies.models import Society
 
 User = get_user_model()
 
 
 class UserSerializer(serializers.ModelSerializer):
-    profile_completion = serializers.SerializerMethodField()
-    profile_completion_details = serializers.SerializerMethodField()
+    profile_completion = serializers.ReadOnlyField()
+    profile_completion_details = serializers.ReadOnlyField()
     
     class Meta:
         model = User
@@ -15,12 +18,6 @@ class UserSerializer(serializers.ModelSerializer):
                   'role', 'profile_picture', 'bio', 'location', 'created_at',
                   'profile_completion', 'profile_completion_details']
         read_only_fields = ['id', 'created_at', 'profile_completion', 'profile_completion_details']
-    
-    def get_profile_completion(self, obj):
-        return obj.get_profile_completion_percentage()
-    
-    def get_profile_completion_details(self, obj):
-        return obj.get_profile_completion_details()
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -64,6 +61,44 @@ class BookmarkSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'created_at']
 
 
+class BookmarkedCourseSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Course
+        fields = ['id', 'name', 'category', 'duration', 'cluster_points']
+
+
+class BookmarkedUniversitySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = University
+        fields = ['id', 'name', 'short_name', 'type', 'location', 'logo', 'ranking']
+
+
+class BookmarkedPostSerializer(serializers.ModelSerializer):
+    hub_name = serializers.CharField(source='hub.name', read_only=True)
+    
+    class Meta:
+        model = Post
+        fields = ['id', 'title', 'slug', 'hub', 'hub_name', 'post_type', 'score', 'comment_count', 'created_at']
+
+
+class BookmarkedSocietySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Society
+        fields = ['id', 'name', 'acronym', 'logo', 'type']
+
+
+class HydratedBookmarkSerializer(serializers.ModelSerializer):
+    """Bookmark with a summary of the bookmarked object, resolved by `hydrate_bookmarks`"""
+    item = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Bookmark
+        fields = ['id', 'bookmark_type', 'bookmark_id', 'created_at', 'item']
+    
+    def get_item(self, obj):
+        return obj.item
+
+
 class AchievementSerializer(serializers.ModelSerializer):
     class Meta:
         model = Achievement
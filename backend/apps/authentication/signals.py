@@ -0,0 +1,91 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_cached_token, invalidate_cached_user
+from .models import User, AcademicProfile, UserInterest
+from .stats import record_stats
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Password changes, deactivation and profile edits all go through a user save"""
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    """Logout deletes the token"""
+    invalidate_cached_token(instance.key)
+
+
+def _update_completion(user_id, **related_flags):
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        return
+    user.update_profile_completion(**related_flags)
+    user.save(update_fields=['profile_completion', 'profile_completion_details'])
+
+
+@receiver(post_save, sender=AcademicProfile)
+def academic_profile_saved(sender, instance, **kwargs):
+    _update_completion(instance.user_id, academic_profile=bool(instance.kcse_grades))
+
+
+@receiver(post_delete, sender=AcademicProfile)
+def academic_profile_deleted(sender, instance, **kwargs):
+    _update_completion(instance.user_id, academic_profile=False)
+
+
+@receiver(post_save, sender=UserInterest)
+def interests_saved(sender, instance, **kwargs):
+    _update_completion(instance.user_id, career_interests=bool(instance.career_interests))
+
+
+@receiver(post_delete, sender=UserInterest)
+def interests_deleted(sender, instance, **kwargs):
+    _update_completion(instance.user_id, career_interests=False)
+
+
+@receiver(post_save, sender='hubs.Post')
+def post_saved(sender, instance, created, **kwargs):
+    if created:
+        record_stats(instance.author_id, instance.created_at, total_posts=1)
+
+
+@receiver(post_delete, sender='hubs.Post')
+def post_deleted(sender, instance, **kwargs):
+    record_stats(instance.author_id, instance.created_at, total_posts=-1)
+    if instance.upvotes:
+        # Upvotes are bucketed by the day they were cast, so only the total moves
+        record_stats(instance.author_id, None, daily=False, upvotes_received=-instance.upvotes)
+
+
+@receiver(post_save, sender='hubs.Comment')
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        record_stats(instance.author_id, instance.created_at, total_comments=1)
+
+
+@receiver(post_delete, sender='hubs.Comment')
+def comment_deleted(sender, instance, **kwargs):
+    record_stats(instance.author_id, instance.created_at, total_comments=-1)
+
+
+def _post_upvote_author(vote):
+    if vote.votable_type != 'post' or vote.vote_type != 'upvote':
+        return None
+    from apps.hubs.models import Post
+    return Post.objects.filter(pk=vote.votable_id).values_list('author_id', flat=True).first()
+
+
+@receiver(post_save, sender='hubs.Vote')
+def vote_saved(sender, instance, created, **kwargs):
+    if created:
+        record_stats(_post_upvote_author(instance), instance.created_at, upvotes_received=1)
+
+
+@receiver(post_delete, sender='hubs.Vote')
+def vote_deleted(sender, instance, **kwargs):
+    record_stats(_post_upvote_author(instance), instance.created_at, upvotes_received=-1)
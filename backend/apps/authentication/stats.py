@@ -0,0 +1,151 @@
+"""
+Materialized per-user analytics.
+
+`UserStats` holds lifetime totals and `UserDailyStats` holds one bucket per
+user and day. A user's rows are built from history the first time they are
+needed (or in bulk by `manage.py rebuild_user_stats`); after that, post,
+comment and vote signals apply incremental F() updates, so the analytics
+endpoint is a single-row read no matter how long the user's history is.
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum, UUIDField
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import UserStats, UserDailyStats
+
+
+ANALYTICS_RECENT_DAYS = 30
+
+# Counter names on UserStats and their UserDailyStats counterpart
+STAT_FIELDS = {
+    'total_posts': 'posts',
+    'total_comments': 'comments',
+    'upvotes_received': 'upvotes_received',
+}
+
+
+def record_stats(user_id, when, daily=True, **deltas):
+    """
+    Apply counter deltas for an event that happened at `when`.
+    Users whose stats have not been materialized yet are skipped; their
+    history is picked up in full when the stats are built. Pass
+    `daily=False` to adjust only the lifetime totals.
+    """
+    if not user_id or not deltas:
+        return
+    day = timezone.localdate(when) if when else timezone.localdate()
+
+    with transaction.atomic():
+        updated = UserStats.objects.filter(user_id=user_id).update(
+            updated_at=timezone.now(),
+            **{field: F(field) + delta for field, delta in deltas.items()},
+        )
+        if not updated or not daily:
+            return
+
+        daily_deltas = {STAT_FIELDS[field]: delta for field, delta in deltas.items()}
+        daily_update = {field: F(field) + delta for field, delta in daily_deltas.items()}
+        if UserDailyStats.objects.filter(user_id=user_id, date=day).update(**daily_update):
+            return
+        try:
+            with transaction.atomic():
+                UserDailyStats.objects.create(user_id=user_id, date=day, **daily_deltas)
+        except IntegrityError:
+            # Another request created today's bucket first
+            UserDailyStats.objects.filter(user_id=user_id, date=day).update(**daily_update)
+
+
+def _grouped(queryset, user_field, value=Count('pk')):
+    return queryset.order_by().values(user_field).annotate(total=value).values_list(user_field, 'total')
+
+
+def _grouped_daily(queryset, user_field, date_field='created_at'):
+    return (
+        queryset.order_by()
+        .annotate(day=TruncDate(date_field))
+        .values(user_field, 'day')
+        .annotate(total=Count('pk'))
+        .values_list(user_field, 'day', 'total')
+    )
+
+
+def rebuild_user_stats(user_ids=None, batch_size=1000):
+    """
+    Recompute stats from posts, comments and votes with grouped queries.
+    Rebuilds everyone when `user_ids` is None.
+    """
+    from apps.authentication.models import User
+    from apps.hubs.models import Post, Comment, Vote
+
+    posts = Post.objects.all()
+    comments = Comment.objects.all()
+    upvotes = Vote.objects.filter(votable_type='post', vote_type='upvote').annotate(
+        post_author=Subquery(
+            Post.objects.filter(pk=OuterRef('votable_id')).values('author_id')[:1],
+            output_field=UUIDField(),
+        )
+    ).filter(post_author__isnull=False)
+    users = User.objects.all()
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        posts = posts.filter(author_id__in=user_ids)
+        comments = comments.filter(author_id__in=user_ids)
+        upvotes = upvotes.filter(post_author__in=user_ids)
+        users = users.filter(pk__in=user_ids)
+
+    totals = {}
+    for field, rows in (
+        ('total_posts', _grouped(posts, 'author_id')),
+        ('total_comments', _grouped(comments, 'author_id')),
+        ('upvotes_received', _grouped(upvotes, 'post_author')),
+    ):
+        for user_id, total in rows:
+            totals.setdefault(user_id, {})[field] = total
+
+    daily = {}
+    for field, rows in (
+        ('posts', _grouped_daily(posts, 'author_id')),
+        ('comments', _grouped_daily(comments, 'author_id')),
+        ('upvotes_received', _grouped_daily(upvotes, 'post_author')),
+    ):
+        for user_id, day, total in rows:
+            daily.setdefault((user_id, day), {})[field] = total
+
+    all_user_ids = list(users.values_list('pk', flat=True))
+    with transaction.atomic():
+        UserStats.objects.filter(user_id__in=all_user_ids).delete()
+        UserDailyStats.objects.filter(user_id__in=all_user_ids).delete()
+        UserStats.objects.bulk_create(
+            [UserStats(user_id=user_id, **totals.get(user_id, {})) for user_id in all_user_ids],
+            batch_size=batch_size,
+        )
+        UserDailyStats.objects.bulk_create(
+            [UserDailyStats(user_id=user_id, date=day, **values) for (user_id, day), values in daily.items()],
+            batch_size=batch_size,
+        )
+    return len(all_user_ids)
+
+
+def get_user_analytics(user, days=ANALYTICS_RECENT_DAYS):
+    """Lifetime totals plus rolling-window sums, read in a single query"""
+    since = timezone.localdate() - timedelta(days=days - 1)
+
+    def recent(field):
+        window = (
+            UserDailyStats.objects.filter(user=OuterRef('user'), date__gte=since)
+            .order_by().values('user').annotate(total=Sum(field)).values('total')
+        )
+        return Coalesce(Subquery(window, output_field=IntegerField()), 0)
+
+    queryset = UserStats.objects.filter(user=user).annotate(
+        recent_posts=recent('posts'),
+        recent_comments=recent('comments'),
+    )
+    stats = queryset.first()
+    if stats is None:
+        rebuild_user_stats(user_ids=[user.pk])
+        stats = queryset.first()
+    return stats
@@ -8,8 +8,12 @@ from .models import AcademicProfile, UserInterest, Bookmark, Achievement, UserAc
 from .serializers import (
     UserSerializer, UserRegistrationSerializer, AcademicProfileSerializer,
     UserInterestSerializer, BookmarkSerializer, AchievementSerializer,
-    UserAchievementSerializer, UserActivitySerializer
+    UserAchievementSerializer, UserActivitySerializer, HydratedBookmarkSerializer
 )
+from apps.hubs.pagination import FeedCursorPagination
+from .activity import record_activity
+from .bookmarks import hydrate_bookmarks
+from .stats import get_user_analytics
 
 User = get_user_model()
 
@@ -58,6 +62,13 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return User.objects.filter(id=self.request.user.id)
     
+    def _paginated_feed(self, queryset, serializer_class):
+        """Serve a per-user feed as a count-free cursor page"""
+        paginator = FeedCursorPagination()
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        serializer = serializer_class(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    
     @action(detail=False, methods=['get', 'put'])
     def me(self, request):
         """Get or update current user profile"""
@@ -68,6 +79,7 @@ class UserProfileViewSet(viewsets.ModelViewSet):
             serializer = self.get_serializer(request.user, data=request.data, partial=True)
             if serializer.is_valid():
                 serializer.save()
+                record_activity(request.user, 'profile_updated', 'Updated profile')
                 return Response(serializer.data)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
@@ -126,15 +138,33 @@ class UserProfileViewSet(viewsets.ModelViewSet):
         """Manage bookmarks"""
         if request.method == 'GET':
             bookmarks = Bookmark.objects.filter(user=request.user)
+            if FeedCursorPagination.is_requested(request):
+                return self._paginated_feed(bookmarks, BookmarkSerializer)
             serializer = BookmarkSerializer(bookmarks, many=True)
             return Response(serializer.data)
         elif request.method == 'POST':
             serializer = BookmarkSerializer(data=request.data)
             if serializer.is_valid():
-                serializer.save(user=request.user)
+                bookmark = serializer.save(user=request.user)
+                record_activity(
+                    request.user, 'bookmark_added', f"Bookmarked a {bookmark.get_bookmark_type_display().lower()}",
+                    target=bookmark.bookmark_id, target_type=bookmark.bookmark_type,
+                )
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=False, methods=['get'], url_path='bookmarks/hydrated')
+    def bookmarks_hydrated(self, request):
+        """Bookmarks with a summary of each bookmarked item, loaded with one query per type"""
+        bookmarks = Bookmark.objects.filter(user=request.user)
+        if FeedCursorPagination.is_requested(request):
+            paginator = FeedCursorPagination()
+            page = paginator.paginate_queryset(bookmarks, request, view=self)
+            serializer = HydratedBookmarkSerializer(hydrate_bookmarks(page), many=True)
+            return paginator.get_paginated_response(serializer.data)
+        serializer = HydratedBookmarkSerializer(hydrate_bookmarks(bookmarks), many=True)
+        return Response(serializer.data)
+    
     @action(detail=False, methods=['delete'], url_path='bookmarks/(?P<bookmark_id>[^/.]+)')
     def delete_bookmark(self, request, bookmark_id=None):
         """Delete a bookmark"""
@@ -155,35 +185,23 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def activities(self, request):
         """Get user's activity feed"""
-        activities = UserActivity.objects.filter(user=request.user)[:50]  # Last 50 activities
-        serializer = UserActivitySerializer(activities, many=True)
+        activities = UserActivity.objects.filter(user=request.user)
+        if FeedCursorPagination.is_requested(request):
+            return self._paginated_feed(activities, UserActivitySerializer)
+        serializer = UserActivitySerializer(activities[:50], many=True)  # Last 50 activities
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def analytics(self, request):
         """Get user analytics"""
-        from django.db.models import Count, Q
-        from apps.hubs.models import Post, Comment
-        
-        # Basic stats
-        posts_count = Post.objects.filter(author=request.user).count()
-        comments_count = Comment.objects.filter(author=request.user).count()
-        upvotes_received = Post.objects.filter(author=request.user).aggregate(
-            total_upvotes=models.Sum('upvotes')
-        )['total_upvotes'] or 0
-        
-        # Recent activity (last 30 days)
-        from datetime import datetime, timedelta
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        recent_posts = Post.objects.filter(author=request.user, created_at__gte=thirty_days_ago).count()
-        recent_comments = Comment.objects.filter(author=request.user, created_at__gte=thirty_days_ago).count()
+        stats = get_user_analytics(request.user)
         
         return Response({
-            'total_posts': posts_count,
-            'total_comments': comments_count,
-            'upvotes_received': upvotes_received,
-            'recent_posts': recent_posts,
-            'recent_comments': recent_comments,
-            'profile_completion': request.user.get_profile_completion_percentage(),
+            'total_posts': stats.total_posts,
+            'total_comments': stats.total_comments,
+            'upvotes_received': stats.upvotes_received,
+            'recent_posts': stats.recent_posts,
+            'recent_comments': stats.recent_comments,
+            'profile_completion': request.user.profile_completion,
             'member_since': request.user.created_at,
         })
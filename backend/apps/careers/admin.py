@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Career, CareerProsCons
+from .models import Career, CareerProsCons, CourseCareer
 
 
 class CareerProsConsInline(admin.TabularInline):
@@ -21,3 +21,11 @@ class CareerProsConsAdmin(admin.ModelAdmin):
     list_display = ['career', 'type']
     list_filter = ['type']
     search_fields = ['career__name']
+
+
+@admin.register(CourseCareer)
+class CourseCareerAdmin(admin.ModelAdmin):
+    list_display = ['course', 'career', 'match_type', 'confidence']
+    list_filter = ['match_type']
+    search_fields = ['course__name', 'career__name', 'matched_name']
+    raw_id_fields = ['course', 'career']
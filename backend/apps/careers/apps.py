@@ -5,3 +5,6 @@ class CareersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.careers'
     label = 'careers'
+
+    def ready(self):
+        from . import signals  # noqa: F401
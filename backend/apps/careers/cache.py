@@ -0,0 +1,19 @@
+import uuid
+
+from django.core.cache import cache
+
+
+CAREERS_VERSION_KEY = 'careers:version'
+
+
+def get_careers_version():
+    """Opaque token that changes whenever a career is saved or deleted"""
+    version = cache.get(CAREERS_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(CAREERS_VERSION_KEY, version, None)
+    return version
+
+
+def bump_careers_version():
+    cache.set(CAREERS_VERSION_KEY, uuid.uuid4().hex, None)
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from apps.careers.matching import DEFAULT_MATCH_THRESHOLD, build_course_careers
+
+
+class Command(BaseCommand):
+    help = "Rebuild the course-to-career mapping by matching each course's career_paths against career names"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=DEFAULT_MATCH_THRESHOLD,
+            help=f'Minimum token overlap score for a fuzzy match (default: {DEFAULT_MATCH_THRESHOLD})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report matches, do not write anything',
+        )
+        parser.add_argument(
+            '--show-unmatched',
+            type=int,
+            default=10,
+            help='How many of the most common unmatched names to list (default: 10)',
+        )
+
+    def handle(self, *args, **options):
+        links, unmatched = build_course_careers(options['threshold'], dry_run=options['dry_run'])
+
+        exact = sum(1 for link in links if link.match_type == 'exact')
+        action = 'Would link' if options['dry_run'] else 'Linked'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {len(links)} course-career pairs ({exact} exact, {len(links) - exact} fuzzy)'
+        ))
+        if unmatched:
+            self.stdout.write(self.style.WARNING(
+                f'{sum(unmatched.values())} career path entries ({len(unmatched)} distinct names) matched no career'
+            ))
+            for name, count in unmatched.most_common(options['show_unmatched']):
+                self.stdout.write(f'  - {name} ({count})')
@@ -0,0 +1,91 @@
+"""
+Matching free-text `Course.career_paths` entries to Career rows.
+
+Names are reduced to token sets (see `recommender.tokenize`). An entry whose
+token set equals a career's is an exact match; otherwise careers sharing a
+token are found through an inverted index and scored by the Dice coefficient
+of the two token sets, keeping the best one above the threshold.
+"""
+from collections import Counter
+
+from django.db import transaction
+
+from apps.courses.models import Course
+
+from .models import Career, CourseCareer
+from .recommender import tokenize
+
+
+DEFAULT_MATCH_THRESHOLD = 0.67
+
+
+def name_key(name):
+    return frozenset(tokenize(name))
+
+
+class CareerMatcher:
+    def __init__(self, careers, threshold=DEFAULT_MATCH_THRESHOLD):
+        self.threshold = threshold
+        self.exact = {}
+        self.tokens = {}
+        self.by_token = {}
+        for career_id, name in careers:
+            key = name_key(name)
+            if not key:
+                continue
+            self.exact.setdefault(key, career_id)
+            self.tokens[career_id] = key
+            for token in key:
+                self.by_token.setdefault(token, []).append(career_id)
+
+    def match(self, name):
+        """Return `(career_id, match_type, confidence)` or None"""
+        key = name_key(name)
+        if not key:
+            return None
+        if key in self.exact:
+            return self.exact[key], 'exact', 1.0
+
+        shared = Counter()
+        for token in key:
+            shared.update(self.by_token.get(token, ()))
+        best = None
+        for career_id, common in shared.items():
+            score = 2 * common / (len(key) + len(self.tokens[career_id]))
+            if score >= self.threshold and (best is None or score > best[2]):
+                best = (career_id, 'fuzzy', round(score, 3))
+        return best
+
+
+def build_course_careers(threshold=DEFAULT_MATCH_THRESHOLD, dry_run=False, batch_size=1000):
+    """
+    Rebuild the course-career mapping from every course's `career_paths`.
+    Returns `(links, unmatched)` where `unmatched` counts names without a career.
+    """
+    matcher = CareerMatcher(Career.objects.values_list('id', 'name'), threshold)
+    links = {}
+    unmatched = Counter()
+    for course_id, career_paths in Course.objects.values_list('id', 'career_paths').iterator(chunk_size=batch_size):
+        for name in career_paths or []:
+            if not isinstance(name, str):
+                continue
+            match = matcher.match(name)
+            if match is None:
+                unmatched[name.strip()] += 1
+                continue
+            career_id, match_type, confidence = match
+            current = links.get((course_id, career_id))
+            if current is None or confidence > current.confidence:
+                links[(course_id, career_id)] = CourseCareer(
+                    course_id=course_id,
+                    career_id=career_id,
+                    matched_name=name.strip()[:300],
+                    match_type=match_type,
+                    confidence=confidence,
+                )
+
+    if not dry_run:
+        with transaction.atomic():
+            CourseCareer.objects.all().delete()
+            CourseCareer.objects.bulk_create(links.values(), batch_size=batch_size)
+    return list(links.values()), unmatched
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:07
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('careers', '0001_initial'),
+        ('courses', '0002_alter_courseuniversity_unique_together_programtag'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseCareer',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('matched_name', models.CharField(max_length=300)),
+                ('match_type', models.CharField(choices=[('exact', 'Exact'), ('fuzzy', 'Fuzzy')], max_length=10)),
+                ('confidence', models.FloatField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('career', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_links', to='careers.career')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='career_links', to='courses.course')),
+            ],
+            options={
+                'db_table': 'course_careers',
+                'ordering': ['-confidence'],
+                'indexes': [models.Index(fields=['career', '-confidence'], name='course_care_career__4b2478_idx'), models.Index(fields=['course', '-confidence'], name='course_care_course__d6ad86_idx')],
+                'unique_together': {('course', 'career')},
+            },
+        ),
+    ]
@@ -71,3 +71,32 @@ class CareerProsCons(models.Model):
     
     def __str__(self):
         return f"{self.career.name} - {self.type}"
+
+
+class CourseCareer(models.Model):
+    """Normalized link between a course and a career named in its `career_paths`"""
+    
+    MATCH_TYPES = [
+        ('exact', 'Exact'),
+        ('fuzzy', 'Fuzzy'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    course = models.ForeignKey('courses.Course', on_delete=models.CASCADE, related_name='career_links')
+    career = models.ForeignKey(Career, on_delete=models.CASCADE, related_name='course_links')
+    matched_name = models.CharField(max_length=300)  # The career_paths entry that matched
+    match_type = models.CharField(max_length=10, choices=MATCH_TYPES)
+    confidence = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'course_careers'
+        unique_together = ['course', 'career']
+        ordering = ['-confidence']
+        indexes = [
+            models.Index(fields=['career', '-confidence']),
+            models.Index(fields=['course', '-confidence']),
+        ]
+    
+    def __str__(self):
+        return f"{self.course_id} -> {self.career.name}"
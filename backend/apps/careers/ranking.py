@@ -0,0 +1,89 @@
+"""
+Weighted career ranking.
+
+The six career metrics are kept as a min-max normalized column matrix in the
+cache, next to the list representation of every career. Ranking a user's
+weights is then a single pass per column over that matrix, with no queries.
+The matrix is dropped whenever a career is saved or deleted.
+"""
+from django.core.cache import cache
+
+from .models import Career
+from .serializers import CareerListSerializer
+
+
+RANKING_METRICS = [
+    'avg_salary_ksh',
+    'job_demand_score',
+    'growth_rate',
+    'work_life_balance_score',
+    'entry_requirements_score',
+    'job_satisfaction_score',
+]
+
+METRICS_MATRIX_CACHE_KEY = 'careers:metrics_matrix'
+METRICS_MATRIX_CACHE_TIMEOUT = 60 * 60  # seconds
+
+
+def _normalize(values):
+    low, high = min(values), max(values)
+    if high == low:
+        return [1.0] * len(values)
+    return [(value - low) / (high - low) for value in values]
+
+
+def build_metrics_matrix():
+    careers = list(Career.objects.all())
+    return {
+        'careers': CareerListSerializer(careers, many=True).data,
+        'categories': [career.category for career in careers],
+        'columns': {
+            metric: _normalize([float(getattr(career, metric)) for career in careers]) if careers else []
+            for metric in RANKING_METRICS
+        },
+    }
+
+
+def get_metrics_matrix():
+    matrix = cache.get(METRICS_MATRIX_CACHE_KEY)
+    if matrix is None:
+        matrix = build_metrics_matrix()
+        cache.set(METRICS_MATRIX_CACHE_KEY, matrix, METRICS_MATRIX_CACHE_TIMEOUT)
+    return matrix
+
+
+def invalidate_metrics_matrix():
+    cache.delete(METRICS_MATRIX_CACHE_KEY)
+
+
+def rank_careers(weights, category=None, limit=10):
+    """
+    Score every career as the weighted sum of its normalized metrics.
+    Weights are scaled by their total magnitude, so scores fall between -100
+    and 100; a negative weight penalizes a metric.
+    """
+    matrix = get_metrics_matrix()
+    total_weight = sum(abs(weight) for weight in weights.values())
+    size = len(matrix['careers'])
+    scores = [0.0] * size
+    contributions = {}
+    if total_weight:
+        for metric, weight in weights.items():
+            factor = 100.0 * weight / total_weight
+            column = [factor * value for value in matrix['columns'][metric]]
+            contributions[metric] = column
+            scores = [score + value for score, value in zip(scores, column)]
+
+    indexes = range(size)
+    if category:
+        indexes = [index for index in indexes if matrix['categories'][index] == category]
+    top = sorted(indexes, key=lambda index: scores[index], reverse=True)[:limit]
+
+    return [
+        {
+            **matrix['careers'][index],
+            'score': round(scores[index], 2),
+            'breakdown': {metric: round(column[index], 2) for metric, column in contributions.items()},
+        }
+        for index in top
+    ]
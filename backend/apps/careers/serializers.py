@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Career, CareerProsCons
+from .models import Career, CareerProsCons, CourseCareer
+from apps.courses.serializers import CourseListSerializer
 
 
 class CareerProsConsSerializer(serializers.ModelSerializer):
@@ -24,6 +25,24 @@ class CareerListSerializer(serializers.ModelSerializer):
                   'job_demand_score', 'growth_rate']
 
 
+class CareerCourseSerializer(serializers.ModelSerializer):
+    """A course leading to a career, with how the link was matched"""
+    course = CourseListSerializer(read_only=True)
+    
+    class Meta:
+        model = CourseCareer
+        fields = ['course', 'matched_name', 'match_type', 'confidence']
+
+
+class CourseCareerSerializer(serializers.ModelSerializer):
+    """A career a course leads to, with how the link was matched"""
+    career = CareerListSerializer(read_only=True)
+    
+    class Meta:
+        model = CourseCareer
+        fields = ['career', 'matched_name', 'match_type', 'confidence']
+
+
 class CareerComparisonSerializer(serializers.Serializer):
     """Serializer for career comparison endpoint"""
     career_ids = serializers.ListField(
@@ -31,3 +50,22 @@ class CareerComparisonSerializer(serializers.Serializer):
         min_length=2,
         max_length=4
     )
+
+
+class CareerRankingSerializer(serializers.Serializer):
+    """User priorities for the career ranking endpoint"""
+    weights = serializers.DictField(
+        child=serializers.FloatField(min_value=-10, max_value=10),
+        allow_empty=False,
+    )
+    category = serializers.ChoiceField(choices=Career.CATEGORY_CHOICES, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+    
+    def validate_weights(self, value):
+        from .ranking import RANKING_METRICS
+        unknown = set(value) - set(RANKING_METRICS)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown metrics: {', '.join(sorted(unknown))}. Use: {', '.join(RANKING_METRICS)}"
+            )
+        return value
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_careers_version
+from .models import Career
+from .ranking import invalidate_metrics_matrix
+
+
+@receiver(post_save, sender=Career)
+@receiver(post_delete, sender=Career)
+def career_changed(sender, **kwargs):
+    invalidate_metrics_matrix()
+    # Recommender indexes in every process resync the changed careers on their next query
+    bump_careers_version()
@@ -1,11 +1,17 @@
-from rest_framework import viewsets, filters
+import uuid
+
+from rest_framework import viewsets, filters, permissions
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Career, CareerProsCons
+from .models import Career, CourseCareer
+from apps.authentication.models import User
 from .serializers import (
-    CareerSerializer, CareerListSerializer, CareerComparisonSerializer
+    CareerSerializer, CareerListSerializer, CareerComparisonSerializer, CareerRankingSerializer,
+    CareerCourseSerializer,
 )
+from .ranking import rank_careers
+from .recommender import DEFAULT_RECOMMENDATION_LIMIT, recommend_careers
 
 
 class CareerViewSet(viewsets.ReadOnlyModelViewSet):
@@ -17,6 +23,12 @@ class CareerViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ['name', 'description']
     ordering_fields = ['avg_salary_ksh', 'job_demand_score', 'growth_rate']
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            queryset = queryset.prefetch_related('pros_cons')
+        return queryset
+    
     def get_serializer_class(self):
         if self.action == 'list':
             return CareerListSerializer
@@ -30,19 +42,53 @@ class CareerViewSet(viewsets.ReadOnlyModelViewSet):
             return Response(serializer.errors, status=400)
         
         career_ids = serializer.validated_data['career_ids']
-        careers = Career.objects.filter(id__in=career_ids)
+        careers = Career.objects.filter(id__in=career_ids).prefetch_related('pros_cons').in_bulk()
         
-        if careers.count() != len(career_ids):
+        if len(careers) != len(set(career_ids)):
             return Response({'error': 'One or more career IDs not found'}, status=404)
         
-        # Get pros/cons for each career
+        # Pros/cons come from the prefetch, in the order the careers were requested
         careers_data = []
-        for career in careers:
+        for career_id in dict.fromkeys(career_ids):
+            career = careers[career_id]
             career_dict = CareerSerializer(career).data
-            pros = CareerProsCons.objects.filter(career=career, type='pros').first()
-            cons = CareerProsCons.objects.filter(career=career, type='cons').first()
-            career_dict['pros'] = pros.items if pros else []
-            career_dict['cons'] = cons.items if cons else []
+            pros_cons = {entry.type: entry.items for entry in career.pros_cons.all()}
+            career_dict['pros'] = pros_cons.get('pros', [])
+            career_dict['cons'] = pros_cons.get('cons', [])
             careers_data.append(career_dict)
         
         return Response(careers_data)
+    
+    @action(detail=False, methods=['post'])
+    def rank(self, request):
+        """Rank careers by the user's weights over the career metrics"""
+        serializer = CareerRankingSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+        
+        data = serializer.validated_data
+        return Response(rank_careers(data['weights'], category=data.get('category'), limit=data['limit']))
+    
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def recommendations(self, request):
+        """Careers that best match the user's profile interests, strengths and goals"""
+        try:
+            limit = min(max(int(request.query_params.get('limit', DEFAULT_RECOMMENDATION_LIMIT)), 1), 50)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=400)
+        
+        user = User.objects.select_related('academic_profile', 'interests').get(pk=request.user.pk)
+        return Response([
+            {**career, 'score': round(score, 4), 'matched_terms': terms}
+            for career, score, terms in recommend_careers(user, limit=limit)
+        ])
+    
+    @action(detail=True, methods=['get'])
+    def courses(self, request, pk=None):
+        """Courses leading to this career, best matches first"""
+        try:
+            pk = uuid.UUID(str(pk))
+        except ValueError:
+            return Response({'error': 'Not found'}, status=404)
+        links = CourseCareer.objects.filter(career_id=pk).select_related('course').order_by('-confidence')
+        return Response(CareerCourseSerializer(links, many=True).data)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ChatConversation, ChatMessage, CareerProsCons, ChatbotSettings
+from .models import ChatConversation, ChatMessage, CareerProsCons, ChatbotSettings, ChatResponseCache, ChatJob
 
 
 @admin.register(ChatConversation)
@@ -42,6 +42,24 @@ class CareerProsConsAdmin(admin.ModelAdmin):
 
 @admin.register(ChatbotSettings)
 class ChatbotSettingsAdmin(admin.ModelAdmin):
-    list_display = ['id', 'ai_provider', 'ai_model', 'is_active', 'created_at']
+    list_display = ['id', 'ai_provider', 'ai_model', 'fallback_providers', 'hedge_after_ms', 'is_active', 'created_at']
     list_filter = ['ai_provider', 'is_active']
     readonly_fields = ['id', 'created_at', 'updated_at']
+
+
+@admin.register(ChatResponseCache)
+class ChatResponseCacheAdmin(admin.ModelAdmin):
+    list_display = ['id', 'question', 'context_type', 'hub', 'hits', 'last_hit_at', 'expires_at']
+    list_filter = ['context_type', 'expires_at']
+    search_fields = ['question', 'content']
+    readonly_fields = ['id', 'key', 'fingerprint', 'hits', 'last_hit_at', 'created_at', 'updated_at']
+    raw_id_fields = ['hub']
+
+
+@admin.register(ChatJob)
+class ChatJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'user', 'attempts', 'run_after', 'created_at', 'finished_at']
+    list_filter = ['kind', 'status', 'created_at']
+    search_fields = ['last_error', 'locked_by']
+    readonly_fields = ['id', 'created_at', 'finished_at', 'locked_by', 'locked_at']
+    raw_id_fields = ['user']
@@ -0,0 +1,156 @@
+"""
+Answer cache for repeated chatbot questions.
+
+Answers are stored in `chat_response_cache` under a key built from the
+normalized question, the conversation's context type and hub, and a
+fingerprint of the provider settings and catalog version, so changing the
+model or prompt, or importing new cutoffs and fees, never serves stale
+answers. Normalization drops filler words and plural endings, so "what are
+the cluster points for medicine?" and "cluster points needed for medicine"
+share a key and a lookup is one indexed query. Word order and every content
+word count: a question about nursing never gets the answer about medicine.
+
+Only the opening question of a conversation is cached. Later answers are
+generated with the conversation's history and summary (a student's grades,
+county, earlier choices), so they must never be served to anyone else;
+follow-ups such as "tell me more" are skipped even as an opening message.
+"""
+import hashlib
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ChatMessage, ChatResponseCache
+from .retrieval import get_catalog_version
+
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+FILLER_WORDS = frozenset(
+    'a an the is are was were be do does did can could would should will please kindly hi hello hey'
+    ' thanks thank you me my i what whats which when where how for of to in on about tell know want'
+    ' need needed required much many get like with at from some any'.split()
+)
+# Questions leaning on earlier turns can't be answered from the cache
+FOLLOW_UP_WORDS = frozenset('it that this those these them they he she more else again above previous'.split())
+MIN_QUESTION_TOKENS = 2
+
+
+def question_tokens(text):
+    raw = TOKEN_RE.findall(str(text).lower())
+    tokens = []
+    for token in raw:
+        if token in FILLER_WORDS:
+            continue
+        if len(token) > 4 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return raw, tokens
+
+
+def is_cacheable(raw_tokens, tokens):
+    return len(tokens) >= MIN_QUESTION_TOKENS and not FOLLOW_UP_WORDS.intersection(raw_tokens)
+
+
+def settings_fingerprint(chatbot_settings):
+    parts = [
+        chatbot_settings.ai_provider,
+        chatbot_settings.ai_model,
+        chatbot_settings.max_tokens,
+        chatbot_settings.temperature,
+        chatbot_settings.system_prompt,
+        # Answers quote retrieved catalog facts, which change with every import
+        get_catalog_version(),
+    ]
+    return hashlib.sha256('\x1f'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _scope(context_type, hub_id, fingerprint):
+    return (context_type, str(hub_id) if hub_id else '', fingerprint)
+
+
+def cache_key(question, scope):
+    return hashlib.sha256('\x1f'.join((question, *scope)).encode()).hexdigest()
+
+
+class CachedQuestion:
+    """A question prepared for cache lookup and storage"""
+
+    def __init__(self, text, context_type, hub_id, chatbot_settings):
+        raw_tokens, tokens = question_tokens(text)
+        self.cacheable = settings.CHATBOT_CACHE_ENABLED and is_cacheable(raw_tokens, tokens)
+        self.question = ' '.join(tokens)
+        self.scope = _scope(context_type, hub_id, settings_fingerprint(chatbot_settings))
+        self.key = cache_key(self.question, self.scope)
+        self.hub_id = hub_id
+
+
+def is_first_turn(conversation, user_message):
+    """True when nothing but the new message (stored by the view before generating) precedes the answer"""
+    if conversation.summary:
+        return False
+    latest = list(
+        ChatMessage.objects.filter(conversation=conversation)
+        .order_by('-created_at')
+        .values_list('sender_type', 'content')[:2]
+    )
+    return not latest or latest == [('user', user_message)]
+
+
+def wants_bypass(data):
+    """True when the request asks for a fresh answer (`"bypass_cache": true`)"""
+    value = data.get('bypass_cache', False)
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+def lookup(cached_question):
+    """Cached `{'content', 'metadata'}` for the question, counting the hit; None on a miss"""
+    if not cached_question.cacheable:
+        return None
+    now = timezone.now()
+    entry = ChatResponseCache.objects.filter(key=cached_question.key, expires_at__gt=now).first()
+    if entry is None:
+        return None
+
+    ChatResponseCache.objects.filter(pk=entry.pk).update(hits=F('hits') + 1, last_hit_at=now)
+    return {
+        'content': entry.content,
+        'metadata': dict(entry.metadata, cached=True, cache_match='exact', cache_entry=str(entry.pk)),
+    }
+
+
+def store(cached_question, response):
+    """Remember a provider answer; fallback, failed and cached answers are not stored"""
+    metadata = response.get('metadata') or {}
+    if (
+        not cached_question.cacheable
+        or not response.get('content')
+        or metadata.get('provider') == 'fallback'
+        or metadata.get('error')
+        or metadata.get('cached')
+    ):
+        return None
+    context_type, _, fingerprint = cached_question.scope
+    entry, _ = ChatResponseCache.objects.update_or_create(
+        key=cached_question.key,
+        defaults={
+            'question': cached_question.question,
+            'context_type': context_type,
+            'hub_id': cached_question.hub_id,
+            'fingerprint': fingerprint,
+            'content': response['content'],
+            'metadata': metadata,
+            'hits': 0,
+            'expires_at': timezone.now() + timedelta(seconds=settings.CHATBOT_CACHE_TTL),
+        },
+    )
+    return entry
+
+
+def prune_expired():
+    deleted, _ = ChatResponseCache.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
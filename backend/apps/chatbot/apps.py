@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ChatbotConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.chatbot'
+    label = 'chatbot'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,161 @@
+"""
+Async chat endpoints for the ASGI app (config/asgi.py).
+
+While the provider call is in flight these views await on the pooled async
+HTTP clients instead of holding a worker thread, so one process can serve
+many concurrent chats. DRF views are synchronous, so authentication reuses
+the configured DRF authentication classes in a thread.
+
+`job_events` streams the progress of a queued (background) generation job,
+polling the job row without tying up a worker.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .answer_cache import wants_bypass
+from .jobs import FINISHED, enqueue, wants_background
+from .models import ChatConversation, ChatJob, ChatMessage
+from .serializers import ChatJobSerializer, ChatMessageSerializer
+from .services import get_chatbot_service
+from .streaming import astream_reply, sse_event
+
+
+def _authenticate(request):
+    drf_request = Request(
+        request,
+        authenticators=[authentication() for authentication in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    try:
+        user = drf_request.user
+    except exceptions.APIException:
+        return None
+    return user if user.is_authenticated else None
+
+
+async def _start_chat(request, pk):
+    """Authenticate, load the conversation and store the user message; returns (chat, error response)"""
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return None, JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    try:
+        payload = json.loads(request.body or b'{}')
+    except ValueError:
+        return None, JsonResponse({'error': 'Invalid JSON body'}, status=400)
+    content = payload.get('content', '')
+    if not content:
+        return None, JsonResponse({'error': 'content is required'}, status=400)
+
+    try:
+        conversation = await ChatConversation.objects.select_related('hub').aget(pk=pk, user=user)
+    except ChatConversation.DoesNotExist:
+        return None, JsonResponse({'detail': 'Not found.'}, status=404)
+
+    user_message = await ChatMessage.objects.acreate(
+        conversation=conversation,
+        sender_type='user',
+        content=content,
+        metadata=payload.get('metadata', {})
+    )
+    service = await sync_to_async(get_chatbot_service)()
+    return (service, conversation, user_message, payload), None
+
+
+@csrf_exempt
+@require_POST
+async def send_message(request, pk):
+    """Async variant of ChatConversationViewSet.send_message"""
+    chat, error = await _start_chat(request, pk)
+    if error:
+        return error
+    service, conversation, user_message, payload = chat
+
+    if wants_background(payload):
+        job = await sync_to_async(enqueue)('chat_reply', {
+            'conversation_id': str(conversation.pk),
+            'user_message_id': str(user_message.pk),
+            'use_cache': not wants_bypass(payload)
+        }, user_id=conversation.user_id)
+        return JsonResponse({
+            'user_message': ChatMessageSerializer(user_message).data,
+            'job': ChatJobSerializer(job).data
+        }, status=202)
+
+    ai_response = await service.agenerate_response(
+        conversation=conversation,
+        user_message=user_message.content,
+        context_type=conversation.context_type,
+        use_cache=not wants_bypass(payload)
+    )
+    ai_message = await ChatMessage.objects.acreate(
+        conversation=conversation,
+        sender_type='ai',
+        content=ai_response['content'],
+        metadata=ai_response.get('metadata', {})
+    )
+    await conversation.asave()
+
+    return JsonResponse({
+        'user_message': ChatMessageSerializer(user_message).data,
+        'ai_message': ChatMessageSerializer(ai_message).data
+    })
+
+
+@csrf_exempt
+@require_POST
+async def send_message_stream(request, pk):
+    """Async variant of ChatConversationViewSet.send_message_stream"""
+    chat, error = await _start_chat(request, pk)
+    if error:
+        return error
+    service, conversation, user_message, payload = chat
+
+    response = StreamingHttpResponse(
+        astream_reply(service, conversation, user_message, use_cache=not wants_bypass(payload)),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def _job_events(pk):
+    seen = None
+    while True:
+        try:
+            job = await ChatJob.objects.aget(pk=pk)
+        except ChatJob.DoesNotExist:
+            # Pruned (or deleted) while the client was still listening
+            yield sse_event('error', {'detail': 'Job no longer exists.'})
+            return
+        if job.status in FINISHED:
+            yield sse_event('done', ChatJobSerializer(job).data)
+            return
+        if (job.status, job.attempts) != seen:
+            seen = (job.status, job.attempts)
+            yield sse_event('status', {'status': job.status, 'attempts': job.attempts, 'last_error': job.last_error})
+        await asyncio.sleep(settings.CHATBOT_JOB_POLL_INTERVAL)
+
+
+@require_GET
+async def job_events(request, pk):
+    """Server-sent `status` events for a queued job while it waits or runs, then `done` with its result"""
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    if not await ChatJob.objects.filter(pk=pk, user=user).aexists():
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+
+    response = StreamingHttpResponse(_job_events(pk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,96 @@
+"""
+Process-wide chatbot configuration.
+
+The active ChatbotSettings row is read once per process and kept as an
+immutable `ChatbotConfig` snapshot. Saving or deleting a settings row bumps a
+version token in the shared cache, so every process reloads on its next
+message. Without an active row the built-in defaults are used.
+"""
+import logging
+import threading
+import uuid
+from dataclasses import dataclass, fields
+
+from django.core.cache import cache
+from django.db import DatabaseError
+
+from .models import ChatbotSettings, DEFAULT_SYSTEM_PROMPT
+
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_VERSION_KEY = 'chatbot:settings-version'
+
+
+@dataclass(frozen=True)
+class ChatbotConfig:
+    ai_provider: str = 'openai'
+    ai_model: str = 'gpt-3.5-turbo'
+    max_tokens: int = 1000
+    temperature: float = 0.7
+    system_prompt: str = DEFAULT_SYSTEM_PROMPT
+    fallback_providers: tuple = ()
+    attempt_timeout: float = 10.0
+    response_timeout: float = 20.0
+    hedge_after_ms: int = 0
+    breaker_failure_threshold: int = 5
+    breaker_reset_seconds: int = 30
+
+    @classmethod
+    def from_model(cls, chatbot_settings):
+        values = {field.name: getattr(chatbot_settings, field.name) for field in fields(cls)}
+        values['fallback_providers'] = tuple(values['fallback_providers'] or ())
+        return cls(**values)
+
+
+DEFAULT_CONFIG = ChatbotConfig()
+
+
+def get_settings_version():
+    version = cache.get(SETTINGS_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(SETTINGS_VERSION_KEY, version, None)
+    return version
+
+
+def bump_settings_version():
+    cache.set(SETTINGS_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def load_chatbot_config():
+    try:
+        chatbot_settings = ChatbotSettings.objects.filter(is_active=True).order_by('-updated_at').first()
+    except DatabaseError:
+        logger.exception('Could not load chatbot settings, using defaults')
+        return DEFAULT_CONFIG
+    if chatbot_settings is None:
+        return DEFAULT_CONFIG
+    return ChatbotConfig.from_model(chatbot_settings)
+
+
+class _Cached:
+    """A value rebuilt whenever the settings version changes"""
+
+    def __init__(self, build):
+        self.build = build
+        self.value = None
+        self.version = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        version = get_settings_version()
+        if version != self.version:
+            with self._lock:
+                if version != self.version:
+                    self.value = self.build()
+                    self.version = version
+        return self.value
+
+
+_config = _Cached(load_chatbot_config)
+
+
+def get_chatbot_config():
+    """Current `ChatbotConfig` (no query unless the settings changed)"""
+    return _config.get()
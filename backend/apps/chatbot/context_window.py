@@ -0,0 +1,144 @@
+"""
+Token-budgeted conversation context.
+
+Instead of a fixed number of past messages, `build_context_messages` fills
+CHATBOT_CONTEXT_TOKEN_BUDGET with the newest turns that fit (long pastes are
+clipped to CHATBOT_MAX_MESSAGE_TOKENS). Turns that no longer fit are folded
+into the conversation's stored rolling summary, which is sent in the system
+message. Folding is incremental: only messages newer than `summary_until` are
+read, each turn condenses just the messages that fell out of the window, and
+the summary keeps its newest lines within CHATBOT_SUMMARY_TOKEN_BUDGET. A
+conversation with more unsummarized messages than MAX_HISTORY_MESSAGES (an
+import, or history from before summaries existed) is caught up oldest first
+in chunks of SUMMARY_CHUNK_MESSAGES, a few chunks per turn. Room for the
+summary is only reserved once there is one.
+
+Token counts are estimates (about four characters per token), which is close
+enough for budgeting without a tokenizer dependency.
+"""
+import re
+
+from django.conf import settings
+
+from .models import ChatConversation, ChatMessage
+
+
+MESSAGE_OVERHEAD_TOKENS = 4  # role and separators
+MAX_HISTORY_MESSAGES = 50
+SUMMARY_CHUNK_MESSAGES = 200
+MAX_SUMMARY_CHUNKS = 5  # per turn; a longer backlog catches up over the following turns
+SUMMARY_LINE_CHARS = 200
+SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s')
+
+
+def estimate_tokens(text):
+    return (len(text) + 3) // 4
+
+
+def clip_to_tokens(text, max_tokens):
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rstrip() + ' …[truncated]'
+
+
+def condense(message):
+    """One summary line for a message: its first sentence, clipped"""
+    text = ' '.join(message['content'].split())
+    first = SENTENCE_END_RE.split(text, 1)[0]
+    if len(first) > SUMMARY_LINE_CHARS:
+        first = first[:SUMMARY_LINE_CHARS].rstrip() + '…'
+    speaker = 'Student' if message['sender_type'] == 'user' else 'Assistant'
+    return f"- {speaker}: {first}"
+
+
+def roll_summary(summary, messages):
+    """Append condensed lines for `messages` (oldest first), dropping the oldest lines over budget"""
+    lines = [line for line in summary.splitlines() if line] + [condense(message) for message in messages]
+    budget = settings.CHATBOT_SUMMARY_TOKEN_BUDGET
+    total = sum(estimate_tokens(line) for line in lines)
+    while lines and total > budget:
+        total -= estimate_tokens(lines.pop(0))
+    return '\n'.join(lines)
+
+
+def fold_backlog(conversation, before):
+    """
+    Fold unsummarized messages older than `before` into the summary, oldest
+    first and a chunk at a time; True once none are left.
+    """
+    for _ in range(MAX_SUMMARY_CHUNKS):
+        backlog = ChatMessage.objects.filter(conversation=conversation, created_at__lt=before)
+        if conversation.summary_until:
+            backlog = backlog.filter(created_at__gt=conversation.summary_until)
+        chunk = list(backlog.order_by('created_at').values('sender_type', 'content', 'created_at')[:SUMMARY_CHUNK_MESSAGES])
+        if not chunk:
+            return True
+        conversation.summary = roll_summary(conversation.summary, chunk)
+        conversation.summary_until = chunk[-1]['created_at']
+    return False
+
+
+def fit_history(history, budget, max_message_tokens):
+    """Provider messages for the newest turns of `history` (newest first) within `budget`, and how many fit"""
+    included = []
+    for index, message in enumerate(history):
+        content = clip_to_tokens(message['content'], max_message_tokens)
+        cost = estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+        if cost > budget:
+            return included, index
+        budget -= cost
+        included.append({'role': 'user' if message['sender_type'] == 'user' else 'assistant', 'content': content})
+    return included, len(history)
+
+
+def build_context_messages(conversation, system_content, user_message):
+    """Provider messages within the token budget; updates the conversation's summary if turns fell out"""
+    history = ChatMessage.objects.filter(conversation=conversation)
+    if conversation.summary_until:
+        history = history.filter(created_at__gt=conversation.summary_until)
+    history = list(
+        history.order_by('-created_at').values('sender_type', 'content', 'created_at')[:MAX_HISTORY_MESSAGES]
+    )
+    summary_before = (conversation.summary, conversation.summary_until)
+    # Older unsummarized messages than the ones loaded must reach the summary first
+    caught_up = len(history) < MAX_HISTORY_MESSAGES or fold_backlog(conversation, history[-1]['created_at'])
+    # The view stores the new message before generating; don't send it twice
+    if history and history[0]['sender_type'] == 'user' and history[0]['content'] == user_message:
+        history = history[1:]
+
+    max_message_tokens = settings.CHATBOT_MAX_MESSAGE_TOKENS
+    user_content = clip_to_tokens(user_message, max_message_tokens)
+    remaining = (
+        settings.CHATBOT_CONTEXT_TOKEN_BUDGET
+        - estimate_tokens(system_content)
+        - estimate_tokens(user_content)
+        - 2 * MESSAGE_OVERHEAD_TOKENS
+    )
+    with_summary = remaining - settings.CHATBOT_SUMMARY_TOKEN_BUDGET
+    if conversation.summary:
+        included, count = fit_history(history, with_summary, max_message_tokens)
+    else:
+        included, count = fit_history(history, remaining, max_message_tokens)
+        if count < len(history):
+            # The turns that don't fit are about to start a summary: leave room for it
+            included, count = fit_history(history, with_summary, max_message_tokens)
+
+    overflow = history[count:]
+    if overflow and caught_up:
+        conversation.summary = roll_summary(conversation.summary, list(reversed(overflow)))
+        conversation.summary_until = overflow[0]['created_at']
+    if (conversation.summary, conversation.summary_until) != summary_before:
+        # Plain UPDATE so the conversation's updated_at (and list ordering) is left alone
+        ChatConversation.objects.filter(pk=conversation.pk).update(
+            summary=conversation.summary,
+            summary_until=conversation.summary_until,
+        )
+
+    if conversation.summary:
+        system_content = f"{system_content}\n\nEarlier in this conversation:\n{conversation.summary}"
+    return [
+        {'role': 'system', 'content': system_content},
+        *reversed(included),
+        {'role': 'user', 'content': user_content},
+    ]
@@ -0,0 +1,124 @@
+"""
+Stand-alone fake LLM server speaking the OpenAI chat completions API.
+
+Used for offline development, tests and load benchmarks: select the `local`
+provider (LOCAL_LLM_BASE_URL defaults to http://127.0.0.1:8765/v1), or point
+OPENAI_BASE_URL at it with any API key. Latency before the first token (with
+optional exponential jitter for a realistic tail), delay between tokens,
+answer length and an error rate are configurable, and connections are kept
+alive like a real provider's.
+"""
+import json
+import random
+import sys
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, chunked streaming
+    server_version = 'FakeLLM/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/models'):
+            self._send_json(200, {'object': 'list', 'data': [{'id': 'fake-model', 'object': 'model'}]})
+        else:
+            self._send_json(404, {'error': {'message': 'Not found'}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send_json(400, {'error': {'message': 'Invalid JSON'}})
+            return
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'Not found'}})
+            return
+
+        time.sleep(self.server.first_token_delay())
+        if self.server.error_rate and random.random() < self.server.error_rate:
+            self._send_json(503, {'error': {'message': 'Injected failure'}})
+            return
+
+        messages = payload.get('messages') or [{}]
+        words = self.server.answer(messages[-1].get('content', '')).split(' ')
+        model = payload.get('model', 'fake-model')
+        completion_id = f'chatcmpl-{uuid.uuid4().hex[:12]}'
+
+        if not payload.get('stream'):
+            time.sleep(self.server.token_delay * len(words))
+            self._send_json(200, {
+                'id': completion_id,
+                'object': 'chat.completion',
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': ' '.join(words)},
+                    'finish_reason': 'stop',
+                }],
+                'usage': {'prompt_tokens': 0, 'completion_tokens': len(words), 'total_tokens': len(words)},
+            })
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for index, word in enumerate(words):
+            time.sleep(self.server.token_delay)
+            event = {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'model': model,
+                'choices': [{'index': 0, 'delta': {'content': word if index == 0 else f' {word}'}}],
+            }
+            self._write_chunk(f'data: {json.dumps(event)}\n\n'.encode())
+        self._write_chunk(b'data: [DONE]\n\n')
+        self.wfile.write(b'0\r\n\r\n')
+        self.wfile.flush()
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, token_delay=0.0, error_rate=0.0, jitter=0.0, answer_words=0, verbose=False):
+        super().__init__(address, FakeLLMHandler)
+        self.latency = latency
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.jitter = jitter
+        self.answer_words = answer_words
+        self.verbose = verbose
+
+    def handle_error(self, request, client_address):
+        # Clients dropping idle keep-alive connections is normal; don't print tracebacks for it
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def first_token_delay(self):
+        return self.latency + (random.expovariate(1 / self.jitter) if self.jitter else 0.0)
+
+    def answer(self, question):
+        answer = f'[fake-server] You asked: "{question.strip()[:200]}". Here is a placeholder answer from the local test server.'
+        padding = self.answer_words - len(answer.split(' '))
+        if padding > 0:
+            answer += ' ' + ' '.join(f'word{index}' for index in range(padding))
+        return answer
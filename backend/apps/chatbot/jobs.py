@@ -0,0 +1,185 @@
+"""
+Durable background queue for AI generation.
+
+Chat replies and pros/cons can be queued as ChatJob rows instead of being
+generated inside the HTTP request; `manage.py chat_worker` runs them. Workers
+claim due jobs with SELECT ... FOR UPDATE SKIP LOCKED where the database
+supports it, behind a status-guarded UPDATE, so any number of workers can
+share the table.
+
+A job that raises, or whose answer is only the static fallback, is retried
+with exponential backoff until it runs out of attempts; the last attempt
+keeps the fallback so the student always gets a reply. Jobs left `running`
+by a worker that died are picked up again after CHATBOT_JOB_LEASE seconds.
+
+Clients poll GET /api/chatbot/jobs/<id>/ or, under ASGI, stream
+/api/chatbot/jobs/<id>/events/ for the result.
+"""
+import logging
+import os
+import random
+import socket
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ChatConversation, ChatJob, ChatMessage
+from .pros_cons import get_or_generate
+from .serializers import AICareerProsConsSerializer, ChatMessageSerializer
+from .services import get_chatbot_service
+
+
+logger = logging.getLogger(__name__)
+
+FINISHED = ('succeeded', 'failed')
+
+
+class RetryJob(Exception):
+    """The job has no usable result yet; run it again later"""
+
+
+def wants_background(data):
+    """True when the request asks to be queued (`"background": true`), or queuing is the default"""
+    value = data.get('background', settings.CHATBOT_BACKGROUND_DEFAULT)
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+def enqueue(kind, payload, user_id=None):
+    return ChatJob.objects.create(
+        kind=kind,
+        payload=payload,
+        user_id=user_id,
+        run_after=timezone.now(),
+        max_attempts=settings.CHATBOT_JOB_MAX_ATTEMPTS,
+    )
+
+
+def backoff(attempts):
+    """Seconds before the next try after `attempts` failed ones: exponential, capped, jittered"""
+    delay = min(settings.CHATBOT_JOB_BACKOFF * 2 ** (attempts - 1), settings.CHATBOT_JOB_BACKOFF_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def release_stale():
+    """Requeue jobs whose worker died mid-run (or fail them when out of attempts)"""
+    now = timezone.now()
+    stale = ChatJob.objects.filter(
+        status='running', locked_at__lt=now - timedelta(seconds=settings.CHATBOT_JOB_LEASE)
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', last_error='Worker stopped before finishing', finished_at=now, locked_by=''
+    )
+    requeued = stale.update(status='queued', run_after=now, locked_by='')
+    return requeued + failed
+
+
+def claim(worker, limit, kinds=None):
+    """Mark up to `limit` due jobs as running for `worker` and return them"""
+    now = timezone.now()
+    token = f'{worker}/{uuid.uuid4().hex[:8]}'[-100:]
+    with transaction.atomic():
+        due = ChatJob.objects.select_for_update(skip_locked=True).filter(status='queued', run_after__lte=now)
+        if kinds:
+            due = due.filter(kind__in=kinds)
+        ids = list(due.order_by('run_after').values_list('id', flat=True)[:limit])
+        if not ids:
+            return []
+        # The status check keeps two workers from taking the same row where SKIP LOCKED is unavailable
+        ChatJob.objects.filter(id__in=ids, status='queued').update(
+            status='running', locked_by=token, locked_at=now, attempts=F('attempts') + 1
+        )
+    return list(ChatJob.objects.filter(locked_by=token, status='running'))
+
+
+def run_job(job):
+    """Run a claimed job and record the outcome; True on success"""
+    owned = ChatJob.objects.filter(pk=job.pk, locked_by=job.locked_by)
+    try:
+        result = HANDLERS[job.kind](job)
+    except Exception as e:
+        error = str(e) or e.__class__.__name__
+        logger.warning('%s job %s failed (attempt %s of %s): %s', job.kind, job.pk, job.attempts, job.max_attempts, error)
+        if job.attempts < job.max_attempts:
+            owned.update(
+                status='queued',
+                run_after=timezone.now() + timedelta(seconds=backoff(job.attempts)),
+                last_error=error,
+                locked_by='',
+            )
+        else:
+            owned.update(status='failed', last_error=error, finished_at=timezone.now(), locked_by='')
+        return False
+    owned.update(status='succeeded', result=result, last_error='', finished_at=timezone.now(), locked_by='')
+    return True
+
+
+def _chat_result(user_message, ai_message):
+    return {'user_message': ChatMessageSerializer(user_message).data, 'ai_message': ChatMessageSerializer(ai_message).data}
+
+
+def _chat_reply(job):
+    payload = job.payload
+    conversation = ChatConversation.objects.select_related('hub').get(pk=payload['conversation_id'])
+    user_message = ChatMessage.objects.get(pk=payload['user_message_id'], conversation=conversation)
+    # A retry or re-claim after the reply was saved returns that reply instead of writing a second one
+    ai_message = ChatMessage.objects.filter(
+        conversation=conversation, sender_type='ai', metadata__job_id=str(job.pk)
+    ).first()
+    if ai_message is not None:
+        return _chat_result(user_message, ai_message)
+
+    ai_response = get_chatbot_service().generate_response(
+        conversation=conversation,
+        user_message=user_message.content,
+        context_type=conversation.context_type,
+        use_cache=payload.get('use_cache', True)
+    )
+    metadata = ai_response.get('metadata', {})
+    if metadata.get('provider') == 'fallback' and job.attempts < job.max_attempts:
+        raise RetryJob('AI service unavailable')
+
+    ai_message = ChatMessage.objects.create(
+        conversation=conversation,
+        sender_type='ai',
+        content=ai_response['content'],
+        metadata=dict(metadata, background=True, job_id=str(job.pk))
+    )
+    conversation.save()
+    return _chat_result(user_message, ai_message)
+
+
+def _pros_cons(job):
+    payload = job.payload
+    # A retry must not be answered with the fallback row the previous attempt stored
+    pros_cons, _ = get_or_generate(
+        career_name=payload['career_name'],
+        course_name=payload.get('course_name'),
+        context=payload.get('context', ''),
+        force=job.attempts > 1
+    )
+    if pros_cons.generated_by == 'fallback' and job.attempts < job.max_attempts:
+        raise RetryJob('AI service unavailable')
+    return {'pros_cons': AICareerProsConsSerializer(pros_cons).data}
+
+
+HANDLERS = {
+    'chat_reply': _chat_reply,
+    'pros_cons': _pros_cons,
+}
+
+
+def prune_finished():
+    """Delete finished jobs older than CHATBOT_JOB_RETENTION_DAYS"""
+    cutoff = timezone.now() - timedelta(days=settings.CHATBOT_JOB_RETENTION_DAYS)
+    deleted, _ = ChatJob.objects.filter(status__in=FINISHED, finished_at__lt=cutoff).delete()
+    return deleted
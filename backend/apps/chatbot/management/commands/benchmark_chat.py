@@ -0,0 +1,160 @@
+import asyncio
+import dataclasses
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from apps.authentication.models import User
+from apps.chatbot.config import get_chatbot_config
+from apps.chatbot.fake_server import FakeLLMServer
+from apps.chatbot.models import ChatConversation
+from apps.chatbot.resilience import provider_health
+from apps.chatbot.services import ChatbotService
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Command(BaseCommand):
+    help = 'Measure chat pipeline throughput and latency, optionally against an in-process stub LLM server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Total chat requests (default: 200)')
+        parser.add_argument('--concurrency', type=int, default=20, help='Requests in flight at once (default: 20)')
+        parser.add_argument('--stream', action='store_true', help='Stream responses and report time to first token')
+        parser.add_argument('--async', dest='use_async', action='store_true', help='Use the async pipeline (as the ASGI views do)')
+        parser.add_argument('--question', default='What are the cluster points for medicine?')
+        parser.add_argument(
+            '--stub',
+            action='store_true',
+            help="Start the fake LLM server in-process and benchmark the 'local' provider against it",
+        )
+        parser.add_argument('--latency', type=float, default=0.2, help='Stub: seconds before the first token')
+        parser.add_argument('--token-delay', type=float, default=0.01, help='Stub: seconds between words')
+        parser.add_argument('--jitter', type=float, default=0.0, help='Stub: mean extra first-token delay')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Stub: fraction of requests answered with a 503')
+        parser.add_argument(
+            '--fallback',
+            action='append',
+            default=[],
+            help='Provider to fail over to, e.g. "fake" or "local:llama3" (repeatable; replaces the configured chain)',
+        )
+        parser.add_argument('--hedge-after-ms', type=int, help='Override the configured hedging delay')
+
+    def handle(self, *args, **options):
+        chatbot_config = get_chatbot_config()
+        server = None
+        if options['stub']:
+            server = FakeLLMServer(
+                ('127.0.0.1', 0),
+                latency=options['latency'],
+                token_delay=options['token_delay'],
+                jitter=options['jitter'],
+                error_rate=options['error_rate'],
+            )
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            os.environ['LOCAL_LLM_BASE_URL'] = f'http://127.0.0.1:{server.server_address[1]}/v1'
+            chatbot_config = dataclasses.replace(chatbot_config, ai_provider='local', ai_model='stub')
+        if options['fallback']:
+            chatbot_config = dataclasses.replace(chatbot_config, fallback_providers=tuple(options['fallback']))
+        if options['hedge_after_ms'] is not None:
+            chatbot_config = dataclasses.replace(chatbot_config, hedge_after_ms=options['hedge_after_ms'])
+
+        service = ChatbotService(chatbot_config)
+        suffix = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(
+            email=f'chat-benchmark-{suffix}@example.invalid',
+            username=f'chat-benchmark-{suffix}',
+            password=uuid.uuid4().hex,
+        )
+        conversation = ChatConversation.objects.create(user=user, context_type='course_comparison')
+        try:
+            self.stdout.write(
+                f"Benchmarking {options['requests']} requests, concurrency {options['concurrency']}, "
+                f"provider {chatbot_config.ai_provider}, "
+                f"{'async' if options['use_async'] else 'threaded'}{' streaming' if options['stream'] else ''}"
+            )
+            started = time.perf_counter()
+            if options['use_async']:
+                results = asyncio.run(self.run_async(service, conversation, options))
+            else:
+                results = self.run_threaded(service, conversation, options)
+            elapsed = time.perf_counter() - started
+        finally:
+            user.delete()
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+
+        self.report(results, elapsed, options['stream'])
+
+    def run_threaded(self, service, conversation, options):
+        def one(index):
+            question = f"{options['question']} #{index}"
+            started = time.perf_counter()
+            first = None
+            if options['stream']:
+                metadata = {}
+                for _ in service.stream_response(conversation, question, conversation.context_type, use_cache=False, metadata=metadata):
+                    if first is None:
+                        first = time.perf_counter() - started
+            else:
+                metadata = service.generate_response(conversation, question, conversation.context_type, use_cache=False)['metadata']
+            return time.perf_counter() - started, first, metadata.get('provider') == 'fallback'
+
+        with ThreadPoolExecutor(max_workers=max(1, options['concurrency'])) as executor:
+            return list(executor.map(one, range(options['requests'])))
+
+    async def run_async(self, service, conversation, options):
+        semaphore = asyncio.Semaphore(max(1, options['concurrency']))
+
+        async def one(index):
+            question = f"{options['question']} #{index}"
+            async with semaphore:
+                started = time.perf_counter()
+                first = None
+                if options['stream']:
+                    metadata = {}
+                    async for _ in service.astream_response(conversation, question, conversation.context_type, use_cache=False, metadata=metadata):
+                        if first is None:
+                            first = time.perf_counter() - started
+                else:
+                    response = await service.agenerate_response(conversation, question, conversation.context_type, use_cache=False)
+                    metadata = response['metadata']
+                return time.perf_counter() - started, first, metadata.get('provider') == 'fallback'
+
+        return await asyncio.gather(*(one(index) for index in range(options['requests'])))
+
+    def report(self, results, elapsed, stream):
+        latencies = [latency for latency, _, _ in results]
+        failures = sum(1 for _, _, failed in results if failed)
+        style = self.style.WARNING if failures else self.style.SUCCESS
+        self.stdout.write(style(
+            f'{len(results)} requests in {elapsed:.2f}s: {len(results) / elapsed:.1f} req/s, {failures} fell back'
+        ))
+
+        def line(label, values):
+            self.stdout.write(
+                f'  {label}: p50 {_percentile(values, 0.5) * 1000:.0f} ms, p95 {_percentile(values, 0.95) * 1000:.0f} ms, '
+                f'p99 {_percentile(values, 0.99) * 1000:.0f} ms, max {max(values) * 1000:.0f} ms'
+            )
+
+        line('latency', latencies)
+        first_tokens = [first for _, first, _ in results if first is not None]
+        if stream and first_tokens:
+            line('first token', first_tokens)
+
+        for health in provider_health.snapshot():
+            latency = health['latency_ms']
+            self.stdout.write(
+                f"  {health['provider']}: {health['state']}, {health.get('successes', 0)} ok, "
+                f"{health.get('errors', 0)} errors, {health.get('timeouts', 0)} timeouts, "
+                f"{health.get('short_circuited', 0)} skipped, {health.get('hedge_wins', 0)}/{health.get('hedges', 0)} hedges won"
+                + (f", p50 {latency['p50']} ms, p99 {latency['p99']} ms" if latency else '')
+            )
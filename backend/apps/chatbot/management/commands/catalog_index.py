@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.chatbot.retrieval import bump_catalog_version, catalog_index, retrieve_facts
+
+
+class Command(BaseCommand):
+    help = 'Mark the chatbot catalog index stale in every process, rebuild it here and optionally run a query'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--query', help='Show the facts retrieved for this text')
+
+    def handle(self, *args, **options):
+        bump_catalog_version()
+        started = time.perf_counter()
+        catalog_index.sync()
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {len(catalog_index.facts)} facts, {len(catalog_index.postings)} terms '
+            f'in {(time.perf_counter() - started) * 1000:.0f} ms'
+        ))
+
+        if options['query']:
+            started = time.perf_counter()
+            facts = retrieve_facts(options['query'])
+            self.stdout.write(f'{len(facts)} facts in {(time.perf_counter() - started) * 1000:.1f} ms')
+            for fact in facts:
+                self.stdout.write(f'  - {fact}')
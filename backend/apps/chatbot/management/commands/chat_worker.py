@@ -0,0 +1,103 @@
+import signal
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.chatbot.jobs import claim, release_stale, run_job, worker_name
+from apps.chatbot.models import ChatJob
+
+
+STALE_CHECK_INTERVAL = 60.0
+
+
+class Command(BaseCommand):
+    help = 'Run queued chatbot jobs (chat replies, pros/cons) with retries and backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.CHATBOT_JOB_CONCURRENCY,
+            help='Jobs run at once by this worker (default: CHATBOT_JOB_CONCURRENCY)',
+        )
+        parser.add_argument(
+            '--kind',
+            action='append',
+            choices=[kind for kind, _ in ChatJob.KIND_CHOICES],
+            help='Only run jobs of this kind (repeatable; default: all)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.CHATBOT_JOB_POLL_INTERVAL,
+            help='Seconds between polls when the queue is empty (default: CHATBOT_JOB_POLL_INTERVAL)',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once no job is due instead of waiting for more',
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        worker = worker_name()
+        stopping = threading.Event()
+
+        def stop(signum, frame):
+            self.stdout.write('Stopping after running jobs finish...')
+            stopping.set()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        self.stdout.write(f'Worker {worker} running up to {concurrency} jobs at once')
+        outcomes = Counter()
+        running = set()
+        next_stale_check = 0.0
+
+        def collect(done):
+            for future in done:
+                running.discard(future)
+                outcomes['succeeded' if future.result() else 'failed'] += 1
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='chat-job') as executor:
+            while not stopping.is_set():
+                collect({future for future in running if future.done()})
+                if time.monotonic() >= next_stale_check:
+                    released = release_stale()
+                    if released:
+                        self.stdout.write(self.style.WARNING(f'Released {released} abandoned jobs'))
+                    next_stale_check = time.monotonic() + STALE_CHECK_INTERVAL
+
+                jobs = claim(worker, concurrency - len(running), options['kind']) if len(running) < concurrency else []
+                for job in jobs:
+                    running.add(executor.submit(self.run_job, job))
+                if jobs and len(running) < concurrency:
+                    continue  # there may be more due jobs
+                if options['burst'] and not running and not jobs:
+                    break
+                if running:
+                    collect(wait(running, timeout=options['interval'], return_when=FIRST_COMPLETED).done)
+                else:
+                    stopping.wait(options['interval'])
+            collect(wait(running).done)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Ran {outcomes['succeeded'] + outcomes['failed']} jobs: "
+            f"{outcomes['succeeded']} succeeded, {outcomes['failed']} failed or rescheduled"
+        ))
+
+    def run_job(self, job):
+        try:
+            return run_job(job)
+        except Exception as e:
+            # Recording the outcome failed; the lease expiry will hand the job out again
+            self.stderr.write(f'Could not record {job.kind} job {job.pk}: {e}')
+            return False
+        finally:
+            close_old_connections()
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+
+from apps.chatbot.fake_server import FakeLLMServer
+
+
+class Command(BaseCommand):
+    help = 'Run a fake OpenAI-compatible LLM server for offline development, tests and benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.2,
+            help='Seconds before the first token (default: 0.2)',
+        )
+        parser.add_argument(
+            '--token-delay',
+            type=float,
+            default=0.02,
+            help='Seconds between streamed words (default: 0.02)',
+        )
+        parser.add_argument(
+            '--jitter',
+            type=float,
+            default=0.0,
+            help='Mean of an exponential extra delay before the first token, for tail latency (default: 0)',
+        )
+        parser.add_argument(
+            '--answer-words',
+            type=int,
+            default=0,
+            help='Pad answers to at least this many words (default: no padding)',
+        )
+        parser.add_argument(
+            '--error-rate',
+            type=float,
+            default=0.0,
+            help='Fraction of requests answered with HTTP 503 (default: 0)',
+        )
+        parser.add_argument('--verbose', action='store_true', help='Log every request')
+
+    def handle(self, *args, **options):
+        server = FakeLLMServer(
+            (options['host'], options['port']),
+            latency=options['latency'],
+            token_delay=options['token_delay'],
+            error_rate=options['error_rate'],
+            jitter=options['jitter'],
+            answer_words=options['answer_words'],
+            verbose=options['verbose'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Fake LLM server on http://{options['host']}:{options['port']}/v1 "
+            f"(use the 'local' provider with LOCAL_LLM_BASE_URL set to this)"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
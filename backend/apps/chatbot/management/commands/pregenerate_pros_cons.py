@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import OuterRef, Subquery
+
+from apps.careers.models import Career, CourseCareer
+from apps.chatbot.pros_cons import get_or_generate, get_fresh, pros_cons_key
+from apps.courses.models import Course
+
+
+def _targets(kinds):
+    """(career_name, course_name) pairs for every career and course"""
+    if 'careers' in kinds:
+        for name in Career.objects.order_by('name').values_list('name', flat=True):
+            yield name, None
+    if 'courses' in kinds:
+        # Pair each course with its best-matching career when one is linked
+        best_career = CourseCareer.objects.filter(course=OuterRef('pk')).order_by('-confidence').values('career__name')[:1]
+        courses = Course.objects.order_by('name').annotate(career_name=Subquery(best_career))
+        for name, career_name in courses.values_list('name', 'career_name'):
+            yield career_name or name, name
+
+
+def _generate(career_name, course_name, force):
+    try:
+        _, created = get_or_generate(career_name, course_name, force=force)
+        return created
+    finally:
+        # Worker threads open their own connections
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Pre-generate AI pros and cons for every career and course, reusing fresh results'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only',
+            choices=['careers', 'courses'],
+            help='Only generate for careers or for courses',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Provider calls in flight at once (default: 4)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate even when a fresh result exists',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count what would be generated',
+        )
+
+    def handle(self, *args, **options):
+        kinds = [options['only']] if options['only'] else ['careers', 'courses']
+        # The same pair can come from several courses; generate it once
+        targets = list(dict.fromkeys(_targets(kinds)))
+        if not options['force']:
+            targets = [target for target in targets if get_fresh(pros_cons_key(*target)) is None]
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'{len(targets)} pros/cons would be generated'))
+            return
+
+        generated = reused = failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, options['concurrency'])) as executor:
+            futures = {
+                executor.submit(_generate, career_name, course_name, options['force']): (career_name, course_name)
+                for career_name, course_name in targets
+            }
+            for future in as_completed(futures):
+                career_name, course_name = futures[future]
+                try:
+                    if future.result():
+                        generated += 1
+                    else:
+                        reused += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f'{career_name} / {course_name or "-"}: {e}')
+
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(f'Generated {generated}, reused {reused}, failed {failed}'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.chatbot.answer_cache import prune_expired
+from apps.chatbot.jobs import prune_finished
+
+
+class Command(BaseCommand):
+    help = 'Delete expired chatbot answer cache entries and finished background jobs past retention'
+
+    def handle(self, *args, **options):
+        deleted = prune_expired()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired cache entries'))
+        deleted = prune_finished()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} finished jobs'))
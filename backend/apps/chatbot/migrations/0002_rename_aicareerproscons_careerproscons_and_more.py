@@ -0,0 +1,21 @@
+# Generated by Django 5.0.14 on 2026-10-19 17:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RenameModel(
+            old_name='AICareerProsCons',
+            new_name='CareerProsCons',
+        ),
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['conversation', 'created_at'], name='chat_messag_convers_0a903c_idx'),
+        ),
+    ]
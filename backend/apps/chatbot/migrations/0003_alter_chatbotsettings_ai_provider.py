@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0002_rename_aicareerproscons_careerproscons_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='chatbotsettings',
+            name='ai_provider',
+            field=models.CharField(choices=[('openai', 'OpenAI'), ('anthropic', 'Anthropic Claude'), ('google', 'Google Gemini'), ('local', 'Local LLM'), ('fake', 'Fake (offline testing)')], default='openai', max_length=50),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:14
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0003_alter_chatbotsettings_ai_provider'),
+        ('hubs', '0007_careerhub_related_societies'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatResponseCache',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('key', models.CharField(help_text='Hash of question, context, hub and settings fingerprint', max_length=64, unique=True)),
+                ('question', models.TextField(help_text='Normalized question text')),
+                ('context_type', models.CharField(max_length=50)),
+                ('fingerprint', models.CharField(help_text='Provider, model and prompt settings the answer was generated with', max_length=64)),
+                ('content', models.TextField()),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+                ('hub', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='cached_responses', to='hubs.careerhub')),
+            ],
+            options={
+                'db_table': 'chat_response_cache',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
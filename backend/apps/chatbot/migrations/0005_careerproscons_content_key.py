@@ -0,0 +1,34 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:16
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_content_key(apps, schema_editor):
+    CareerProsCons = apps.get_model('chatbot', 'CareerProsCons')
+    rows = list(CareerProsCons.objects.only('career_name', 'course_name', 'context'))
+    for row in rows:
+        parts = [' '.join(str(value or '').lower().split()) for value in (row.career_name, row.course_name, row.context)]
+        row.content_key = hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()
+    CareerProsCons.objects.bulk_update(rows, ['content_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0004_chatresponsecache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='careerproscons',
+            name='content_key',
+            field=models.CharField(blank=True, default='', help_text='Hash of the normalized career, course and context', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='careerproscons',
+            index=models.Index(fields=['content_key', '-created_at'], name='ai_career_p_content_b4aa7f_idx'),
+        ),
+        migrations.RunPython(backfill_content_key, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0005_careerproscons_content_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatconversation',
+            name='summary',
+            field=models.TextField(blank=True, help_text='Rolling summary of turns too old to send verbatim'),
+        ),
+        migrations.AddField(
+            model_name='chatconversation',
+            name='summary_until',
+            field=models.DateTimeField(blank=True, help_text='Messages up to this time are covered by the summary', null=True),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chatbot', '0006_chatconversation_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatbotsettings',
+            name='attempt_timeout',
+            field=models.FloatField(default=10.0, help_text='Seconds one provider gets before failing over'),
+        ),
+        migrations.AddField(
+            model_name='chatbotsettings',
+            name='breaker_failure_threshold',
+            field=models.PositiveIntegerField(default=5),
+        ),
+        migrations.AddField(
+            model_name='chatbotsettings',
+            name='breaker_reset_seconds',
+            field=models.PositiveIntegerField(default=30),
+        ),
+        migrations.AddField(
+            model_name='chatbotsettings',
+            name='fallback_providers',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='chatbotsettings',
+            name='hedge_after_ms',
+            field=models.PositiveIntegerField(default=0, help_text='Also ask the next provider after this long; 0 disables'),
+        ),
+        migrations.AddField(
+            model_name='chatbotsettings',
+            name='response_timeout',
+            field=models.FloatField(default=20.0, help_text='Seconds before the static fallback answer is used'),
+        ),
+    ]
@@ -4,6 +4,9 @@ from apps.hubs.models import CareerHub
 import uuid
 
 
+DEFAULT_SYSTEM_PROMPT = "You are EduPath AI, a helpful assistant for students exploring career paths and educational opportunities in Kenya. Provide accurate, helpful information about careers, courses, universities, and professional societies."
+
+
 class ChatConversation(models.Model):
     """Chat conversations between users and AI chatbot"""
     
@@ -22,6 +25,8 @@ class ChatConversation(models.Model):
         default='hub_general'
     )
     is_active = models.BooleanField(default=True)
+    summary = models.TextField(blank=True, help_text='Rolling summary of turns too old to send verbatim')
+    summary_until = models.DateTimeField(null=True, blank=True, help_text='Messages up to this time are covered by the summary')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -52,6 +57,9 @@ class ChatMessage(models.Model):
     class Meta:
         db_table = 'chat_messages'
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['conversation', 'created_at']),
+        ]
     
     def __str__(self):
         return f"{self.sender_type}: {self.content[:50]}..."
@@ -67,11 +75,15 @@ class CareerProsCons(models.Model):
     cons = models.JSONField(default=list, help_text='List of disadvantages')
     context = models.TextField(blank=True, help_text='Additional context or notes')
     generated_by = models.CharField(max_length=50, default='ai_chatbot')
+    content_key = models.CharField(max_length=64, blank=True, default='', help_text='Hash of the normalized career, course and context')
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         db_table = 'ai_career_pros_cons'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['content_key', '-created_at']),
+        ]
     
     def __str__(self):
         return f"Pros/Cons: {self.career_name}"
@@ -88,15 +100,21 @@ class ChatbotSettings(models.Model):
             ('anthropic', 'Anthropic Claude'),
             ('google', 'Google Gemini'),
             ('local', 'Local LLM'),
+            ('fake', 'Fake (offline testing)'),
         ],
         default='openai'
     )
     ai_model = models.CharField(max_length=100, default='gpt-3.5-turbo')
     max_tokens = models.IntegerField(default=1000)
     temperature = models.FloatField(default=0.7)
-    system_prompt = models.TextField(
-        default="You are EduPath AI, a helpful assistant for students exploring career paths and educational opportunities in Kenya. Provide accurate, helpful information about careers, courses, universities, and professional societies."
-    )
+    system_prompt = models.TextField(default=DEFAULT_SYSTEM_PROMPT)
+    # Failover and hedging (see apps.chatbot.resilience)
+    fallback_providers = models.JSONField(default=list, blank=True)  # ["anthropic", "local:llama3"]
+    attempt_timeout = models.FloatField(default=10.0, help_text="Seconds one provider gets before failing over")
+    response_timeout = models.FloatField(default=20.0, help_text="Seconds before the static fallback answer is used")
+    hedge_after_ms = models.PositiveIntegerField(default=0, help_text="Also ask the next provider after this long; 0 disables")
+    breaker_failure_threshold = models.PositiveIntegerField(default=5)
+    breaker_reset_seconds = models.PositiveIntegerField(default=30)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -106,3 +124,68 @@ class ChatbotSettings(models.Model):
     
     def __str__(self):
         return f"Chatbot Settings: {self.ai_provider}"
+
+
+class ChatResponseCache(models.Model):
+    """Cached AI answers to opening questions, reused when the normalized question repeats"""
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    key = models.CharField(max_length=64, unique=True, help_text='Hash of question, context, hub and settings fingerprint')
+    question = models.TextField(help_text='Normalized question text')
+    context_type = models.CharField(max_length=50)
+    hub = models.ForeignKey(CareerHub, on_delete=models.CASCADE, null=True, blank=True, related_name='cached_responses')
+    fingerprint = models.CharField(max_length=64, help_text='Provider, model and prompt settings the answer was generated with')
+    content = models.TextField()
+    metadata = models.JSONField(default=dict, blank=True)
+    hits = models.PositiveIntegerField(default=0)
+    last_hit_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    
+    class Meta:
+        db_table = 'chat_response_cache'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Cached: {self.question[:50]}"
+
+
+class ChatJob(models.Model):
+    """Queued AI generation (a chat reply or pros/cons), run by `manage.py chat_worker`"""
+    
+    KIND_CHOICES = [
+        ('chat_reply', 'Chat reply'),
+        ('pros_cons', 'Pros and cons'),
+    ]
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='chat_jobs')
+    payload = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(default=dict, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(help_text='Not picked up before this time (retry backoff)')
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'chat_jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} job ({self.status})"
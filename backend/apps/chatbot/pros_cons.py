@@ -0,0 +1,138 @@
+"""
+Content-addressed pros/cons generation.
+
+Each CareerProsCons row carries a `content_key`: a hash of the normalized
+career name, course name and context. `get_or_generate` returns the newest
+fresh row for that key and only calls the provider when there is none.
+Concurrent identical requests are coalesced: within a process they wait on
+one in-flight generation, and across processes a short cache lock lets the
+first worker generate while the others poll for its row.
+
+AI results stay fresh for CHATBOT_PROS_CONS_TTL seconds. Static fallback
+results (provider unavailable) are reused only for
+CHATBOT_PROS_CONS_FALLBACK_TTL, so real content replaces them soon.
+"""
+import hashlib
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import CareerProsCons
+from .services import AIProsConsService
+
+
+LOCK_TIMEOUT = 120  # seconds; longer than a provider call may take
+POLL_INTERVAL = 0.25
+
+_service = AIProsConsService()
+
+
+def _normalize(value):
+    return ' '.join(str(value or '').lower().split())
+
+
+def pros_cons_key(career_name, course_name=None, context=None):
+    parts = [_normalize(value) for value in (career_name, course_name, context)]
+    return hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()
+
+
+def get_fresh(key):
+    now = timezone.now()
+    fresh_ai = Q(created_at__gte=now - timedelta(seconds=settings.CHATBOT_PROS_CONS_TTL)) & ~Q(generated_by='fallback')
+    fresh_fallback = (
+        Q(created_at__gte=now - timedelta(seconds=settings.CHATBOT_PROS_CONS_FALLBACK_TTL))
+        & Q(generated_by='fallback')
+    )
+    return (
+        CareerProsCons.objects.filter(content_key=key)
+        .filter(fresh_ai | fresh_fallback)
+        .order_by('-created_at')
+        .first()
+    )
+
+
+class _InFlight:
+    """Per-key locks for generations running in this process"""
+
+    def __init__(self):
+        self._locks = {}  # key -> [lock, number of callers using it]
+        self._guard = threading.Lock()
+
+    def acquire(self, key):
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        entry[0].acquire()
+
+    def release(self, key):
+        with self._guard:
+            entry = self._locks[key]
+            entry[0].release()
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+
+_in_flight = _InFlight()
+
+
+def _wait_for_other_process(key, lock_key):
+    """Poll for the row another process is generating; None if its lock goes away or times out"""
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while time.monotonic() < deadline and cache.get(lock_key):
+        time.sleep(POLL_INTERVAL)
+        existing = get_fresh(key)
+        if existing is not None:
+            return existing
+    return get_fresh(key)
+
+
+def get_or_generate(career_name, course_name=None, context='', force=False):
+    """
+    Fresh CareerProsCons for the inputs, generating (and storing) one if needed.
+    Returns `(pros_cons, created)`.
+    """
+    key = pros_cons_key(career_name, course_name, context)
+    if not force:
+        existing = get_fresh(key)
+        if existing is not None:
+            return existing, False
+
+    _in_flight.acquire(key)
+    try:
+        # Whoever held the lock before us may have just generated it
+        existing = get_fresh(key)
+        if existing is not None and not force:
+            return existing, False
+
+        lock_key = f'chatbot:pros-cons-lock:{key}'
+        locked = cache.add(lock_key, 1, LOCK_TIMEOUT)
+        if not locked and not force:
+            existing = _wait_for_other_process(key, lock_key)
+            if existing is not None:
+                return existing, False
+        try:
+            pros_cons = _service.generate_pros_cons(
+                career_name=career_name,
+                course_name=course_name,
+                context=context
+            )
+            return CareerProsCons.objects.create(
+                career_name=career_name,
+                course_name=course_name,
+                pros=pros_cons['pros'],
+                cons=pros_cons['cons'],
+                context=context,
+                generated_by=pros_cons['generated_by'],
+                content_key=key
+            ), True
+        finally:
+            if locked:
+                cache.delete(lock_key)
+    finally:
+        _in_flight.release(key)
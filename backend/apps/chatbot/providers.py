@@ -0,0 +1,365 @@
+"""
+LLM provider clients.
+
+Each provider knows its API's request and response formats once and offers
+both a synchronous (`complete`/`stream`) and an async (`acomplete`/`astream`)
+call. Async calls go through one shared `httpx.AsyncClient` per event loop,
+synchronous ones through a keep-alive `requests.Session` per thread, so
+connections (and TLS sessions) are pooled across chats instead of being
+opened per request. A handful of ASGI processes can then keep hundreds of
+provider calls in flight while they wait on the network.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderError(Exception):
+    """The provider could not produce a response"""
+
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Pooled keep-alive client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.CHATBOT_HTTP_TIMEOUT, connect=settings.CHATBOT_HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.CHATBOT_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.CHATBOT_HTTP_MAX_KEEPALIVE,
+            ),
+        )
+        _clients[loop] = client
+    return client
+
+
+_local = threading.local()
+
+
+def get_http_session() -> requests.Session:
+    """Keep-alive `requests` session for the synchronous code paths, one per thread"""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = _local.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=settings.CHATBOT_HTTP_MAX_KEEPALIVE)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+    return session
+
+
+def convert_messages_to_prompt(messages: List[Dict[str, str]]) -> str:
+    """Flatten a chat transcript for providers that take a single prompt"""
+    labels = {'system': 'System', 'user': 'Human', 'assistant': 'Assistant'}
+    return "\n\n".join(f"{labels[msg['role']]}: {msg['content']}" for msg in messages if msg['role'] in labels)
+
+
+def iter_sse_data(response: requests.Response) -> Iterator[str]:
+    """Yield the `data:` payloads of a server-sent events response"""
+    for line in response.iter_lines(decode_unicode=True):
+        if line and line.startswith('data:'):
+            data = line[5:].strip()
+            if data == '[DONE]':
+                return
+            yield data
+
+
+async def aiter_sse_data(response: httpx.Response) -> AsyncIterator[str]:
+    """Async counterpart of `iter_sse_data`"""
+    async for line in response.aiter_lines():
+        if line.startswith('data:'):
+            data = line[5:].strip()
+            if data == '[DONE]':
+                return
+            yield data
+
+
+class BaseProvider:
+    """
+    Subclasses describe their API with `_request` (url, headers, params and
+    JSON body), `_content` (the answer in a response) and `_delta` (the text
+    in one streamed event); the transports here do the rest.
+    """
+    name = None
+    default_model = None  # used when the configuration names no model for this provider
+    model_prefixes = ()  # how this provider's own hosted models are named
+
+    def __init__(self, chatbot_settings):
+        self.model = self.resolve_model(chatbot_settings.ai_model)
+        self.max_tokens = chatbot_settings.max_tokens
+        self.temperature = chatbot_settings.temperature
+        self.timeout = chatbot_settings.attempt_timeout
+
+    @classmethod
+    def resolve_model(cls, model):
+        """
+        The configured model, or `default_model` when none is set or it names
+        another provider's model (ChatbotSettings.ai_model defaults to an
+        OpenAI model whichever provider is picked).
+        """
+        model = (model or '').strip()
+        foreign = tuple(
+            prefix
+            for provider in PROVIDERS.values()
+            if provider.model_prefixes != cls.model_prefixes
+            for prefix in provider.model_prefixes
+        )
+        if not model or model.lower().startswith(foreign):
+            if model:
+                logger.info('%s cannot serve model %r; using %s', cls.name, model, cls.default_model)
+            return cls.default_model
+        return model
+
+    def metadata(self) -> Dict[str, Any]:
+        return {'model': self.model, 'provider': self.name}
+
+    def _request(self, messages: List[Dict[str, str]], stream=False) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def _content(self, data) -> str:
+        raise NotImplementedError
+
+    def _delta(self, event) -> str:
+        raise NotImplementedError
+
+    def _response(self, data) -> Dict[str, Any]:
+        try:
+            return {'content': self._content(data), 'metadata': self.metadata()}
+        except (KeyError, IndexError, TypeError) as e:
+            raise ProviderError(f"{self.name}: unexpected response") from e
+
+    def _text(self, event) -> str:
+        try:
+            return self._delta(event)
+        except (KeyError, IndexError, TypeError, AttributeError) as e:
+            raise ProviderError(f"{self.name}: unexpected response") from e
+
+    def complete(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        request = self._request(messages)
+        try:
+            response = get_http_session().post(
+                request.pop('url'), timeout=(settings.CHATBOT_HTTP_CONNECT_TIMEOUT, self.timeout), **request
+            )
+            response.raise_for_status()
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise ProviderError(f"{self.name}: {e}") from e
+        return self._response(data)
+
+    def stream(self, messages: List[Dict[str, str]]) -> Iterator[str]:
+        request = self._request(messages, stream=True)
+        try:
+            with get_http_session().post(
+                request.pop('url'), timeout=(settings.CHATBOT_HTTP_CONNECT_TIMEOUT, self.timeout), stream=True, **request
+            ) as response:
+                response.raise_for_status()
+                for data in iter_sse_data(response):
+                    text = self._text(json.loads(data))
+                    if text:
+                        yield text
+        except (requests.RequestException, ValueError) as e:
+            raise ProviderError(f"{self.name}: {e}") from e
+
+    async def acomplete(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        request = self._request(messages)
+        try:
+            response = await get_http_client().post(request.pop('url'), **request)
+            response.raise_for_status()
+            data = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            raise ProviderError(f"{self.name}: {e}") from e
+        return self._response(data)
+
+    async def astream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        request = self._request(messages, stream=True)
+        try:
+            async with get_http_client().stream('POST', request.pop('url'), **request) as response:
+                response.raise_for_status()
+                async for data in aiter_sse_data(response):
+                    text = self._text(json.loads(data))
+                    if text:
+                        yield text
+        except (httpx.HTTPError, ValueError) as e:
+            raise ProviderError(f"{self.name}: {e}") from e
+
+
+class OpenAIProvider(BaseProvider):
+    """OpenAI chat completions, or any server speaking the same API"""
+    name = 'openai'
+    default_model = 'gpt-3.5-turbo'
+    model_prefixes = ('gpt-', 'chatgpt-', 'o1', 'o3', 'o4')
+    api_key_env = 'OPENAI_API_KEY'
+    base_url_env = 'OPENAI_BASE_URL'
+    default_base_url = 'https://api.openai.com/v1'
+    requires_api_key = True
+
+    def __init__(self, chatbot_settings):
+        super().__init__(chatbot_settings)
+        self.api_key = os.getenv(self.api_key_env)
+        self.base_url = (os.getenv(self.base_url_env) or self.default_base_url).rstrip('/')
+
+    def _request(self, messages, stream=False):
+        if self.requires_api_key and not self.api_key:
+            raise ProviderError(f"{self.name}: {self.api_key_env} is not set")
+        payload = {
+            'model': self.model,
+            'messages': messages,
+            'max_tokens': self.max_tokens,
+            'temperature': self.temperature,
+        }
+        if stream:
+            payload['stream'] = True
+        return {
+            'url': f'{self.base_url}/chat/completions',
+            'headers': {'Authorization': f'Bearer {self.api_key}'} if self.api_key else {},
+            'json': payload,
+        }
+
+    def _content(self, data):
+        return data['choices'][0]['message']['content']
+
+    def _delta(self, event):
+        choices = event.get('choices') or [{}]
+        return choices[0].get('delta', {}).get('content')
+
+
+class LocalProvider(OpenAIProvider):
+    """
+    OpenAI-compatible server on this machine: llama.cpp, vLLM, Ollama, or the
+    bundled `manage.py fake_llm_server` for offline development and load tests.
+    """
+    name = 'local'
+    default_model = 'local-model'  # llama.cpp and the stub server ignore it; Ollama/vLLM need a real name
+    model_prefixes = ()
+    api_key_env = 'LOCAL_LLM_API_KEY'
+    base_url_env = 'LOCAL_LLM_BASE_URL'
+    default_base_url = 'http://127.0.0.1:8765/v1'
+    requires_api_key = False
+
+
+class AnthropicProvider(BaseProvider):
+    name = 'anthropic'
+    default_model = 'claude-3-sonnet-20240229'
+    model_prefixes = ('claude',)
+    url = 'https://api.anthropic.com/v1/messages'
+
+    def __init__(self, chatbot_settings):
+        super().__init__(chatbot_settings)
+        self.api_key = os.getenv('ANTHROPIC_API_KEY')
+
+    def _request(self, messages, stream=False):
+        if not self.api_key:
+            raise ProviderError(f"{self.name}: ANTHROPIC_API_KEY is not set")
+        payload = {
+            'model': self.model,
+            'max_tokens': self.max_tokens,
+            'messages': [{'role': 'user', 'content': convert_messages_to_prompt(messages)}],
+        }
+        if stream:
+            payload['stream'] = True
+        return {
+            'url': self.url,
+            'headers': {'x-api-key': self.api_key, 'anthropic-version': '2023-06-01'},
+            'json': payload,
+        }
+
+    def _content(self, data):
+        return data['content'][0]['text']
+
+    def _delta(self, event):
+        if event.get('type') == 'content_block_delta':
+            return event.get('delta', {}).get('text')
+        return None
+
+
+class GoogleProvider(BaseProvider):
+    name = 'google'
+    default_model = 'gemini-pro'
+    model_prefixes = ('gemini',)
+
+    def __init__(self, chatbot_settings):
+        super().__init__(chatbot_settings)
+        self.api_key = os.getenv('GOOGLE_API_KEY')
+        self.base_url = f'https://generativelanguage.googleapis.com/v1beta/models/{self.model}'
+
+    def _request(self, messages, stream=False):
+        if not self.api_key:
+            raise ProviderError(f"{self.name}: GOOGLE_API_KEY is not set")
+        params = {'key': self.api_key}
+        if stream:
+            params['alt'] = 'sse'
+        return {
+            'url': f"{self.base_url}:{'streamGenerateContent' if stream else 'generateContent'}",
+            'params': params,
+            'json': {
+                'contents': [{'parts': [{'text': convert_messages_to_prompt(messages)}]}],
+                'generationConfig': {'maxOutputTokens': self.max_tokens, 'temperature': self.temperature},
+            },
+        }
+
+    def _content(self, data):
+        return ''.join(part.get('text', '') for part in data['candidates'][0]['content']['parts'])
+
+    _delta = _content
+
+
+class FakeProvider(BaseProvider):
+    """In-process provider for tests: a canned answer, streamed word by word"""
+    name = 'fake'
+    default_model = 'fake-1'
+
+    def answer(self, messages):
+        question = messages[-1]['content'].strip()
+        return f'[fake] You asked: "{question[:200]}". Here is a placeholder answer from the offline provider.'
+
+    def _words(self, messages):
+        words = self.answer(messages).split(' ')
+        return [word if index == 0 else f' {word}' for index, word in enumerate(words)]
+
+    def complete(self, messages):
+        words = self._words(messages)
+        time.sleep(settings.CHATBOT_FAKE_TOKEN_DELAY * len(words))
+        return {'content': ''.join(words), 'metadata': self.metadata()}
+
+    def stream(self, messages):
+        for word in self._words(messages):
+            time.sleep(settings.CHATBOT_FAKE_TOKEN_DELAY)
+            yield word
+
+    async def acomplete(self, messages):
+        words = self._words(messages)
+        await asyncio.sleep(settings.CHATBOT_FAKE_TOKEN_DELAY * len(words))
+        return {'content': ''.join(words), 'metadata': self.metadata()}
+
+    async def astream(self, messages):
+        for word in self._words(messages):
+            await asyncio.sleep(settings.CHATBOT_FAKE_TOKEN_DELAY)
+            yield word
+
+
+PROVIDERS = {
+    provider.name: provider
+    for provider in (OpenAIProvider, LocalProvider, AnthropicProvider, GoogleProvider, FakeProvider)
+}
+
+
+def get_provider(chatbot_settings):
+    """Provider client for the configured `ai_provider`, or None for an unknown name"""
+    provider_class = PROVIDERS.get(chatbot_settings.ai_provider)
+    return provider_class(chatbot_settings) if provider_class else None
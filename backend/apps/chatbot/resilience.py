@@ -0,0 +1,442 @@
+"""
+Provider health, failover and hedged requests.
+
+An answer can come from the primary provider (`ai_provider`/`ai_model`) or,
+in order, from the ChatbotSettings `fallback_providers` chain. Entries are a
+provider name, optionally with a model: "anthropic", "local:llama3". A bare
+name uses that provider's default model, never the primary's.
+
+- Each provider has a circuit breaker. After `breaker_failure_threshold`
+  consecutive failures (0 disables it) the provider is skipped for
+  `breaker_reset_seconds`, then a single trial request decides whether it
+  closes again.
+- An attempt that errors, or has not answered within `attempt_timeout`,
+  fails over to the next provider in the chain.
+- With `hedge_after_ms` set, a provider that has not answered by then (when
+  streaming: has not sent its first token) gets a parallel request to the
+  next provider, and whichever answers first is used.
+- Nothing waits past `response_timeout`; callers then use the static
+  fallback answer.
+
+Synchronous callers run attempts on a shared thread pool (so the thread-local
+HTTP sessions stay warm), async callers as tasks; the bookkeeping is shared.
+Health, error counts and latency percentiles are tracked per process and
+shown to staff at /api/chatbot/settings/provider-health/ and by
+`benchmark_chat`.
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+from django.conf import settings
+
+from .providers import PROVIDERS, ProviderError, get_provider
+
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 500  # recent latencies kept per provider for percentiles
+
+
+def provider_chain(chatbot_config):
+    """Provider clients to try, primary first; unknown names and repeats are skipped"""
+    entries = [f'{chatbot_config.ai_provider}:{chatbot_config.ai_model}', *chatbot_config.fallback_providers]
+    chain, seen = [], set()
+    for entry in entries:
+        name, _, model = str(entry).partition(':')
+        name = name.strip()
+        if name not in PROVIDERS:
+            continue
+        model = model.strip() or PROVIDERS[name].default_model
+        if (name, model) in seen:
+            continue
+        seen.add((name, model))
+        chain.append(get_provider(replace(chatbot_config, ai_provider=name, ai_model=model)))
+    return chain
+
+
+class ProviderHealth:
+    """Circuit breaker state plus error counts and recent latencies for one provider"""
+
+    def __init__(self, name):
+        self.name = name
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_running = False
+        self.counts = Counter()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.last_error = ''
+        self._lock = threading.Lock()
+
+    def allow(self, chatbot_config):
+        """Whether a request may be sent now; counts it if so"""
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self.opened_at >= chatbot_config.breaker_reset_seconds:
+                self.state = 'half_open'
+            if self.state == 'closed' or (self.state == 'half_open' and not self.trial_running):
+                self.trial_running = self.state == 'half_open'
+                self.counts['requests'] += 1
+                return True
+            self.counts['short_circuited'] += 1
+            return False
+
+    def count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def succeeded(self, latency):
+        with self._lock:
+            self.state = 'closed'
+            self.consecutive_failures = 0
+            self.trial_running = False
+            self.counts['successes'] += 1
+            self.latencies.append(latency)
+
+    def failed(self, error, chatbot_config, timed_out=False):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.trial_running = False
+            self.counts['timeouts' if timed_out else 'errors'] += 1
+            self.last_error = str(error)[:200]
+            threshold = chatbot_config.breaker_failure_threshold
+            if threshold and (self.state == 'half_open' or self.consecutive_failures >= threshold):
+                if self.state != 'open':
+                    self.counts['circuit_opened'] += 1
+                    logger.warning('Circuit for %s opened: %s', self.name, self.last_error)
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+    def abandoned(self):
+        """The request was cancelled because another provider answered first"""
+        with self._lock:
+            self.trial_running = False
+            self.counts['cancelled'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            latencies = sorted(self.latencies)
+            data = {
+                'provider': self.name,
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                **self.counts,
+                'last_error': self.last_error,
+            }
+        data['latency_ms'] = {
+            label: round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000)
+            for label, fraction in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))
+        } if latencies else {}
+        data['latency_samples'] = len(latencies)
+        return data
+
+
+class _HealthRegistry:
+    def __init__(self):
+        self._health = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            if name not in self._health:
+                self._health[name] = ProviderHealth(name)
+            return self._health[name]
+
+    def snapshot(self):
+        with self._lock:
+            health = sorted(self._health.values(), key=lambda item: item.name)
+        return [item.snapshot() for item in health]
+
+
+provider_health = _HealthRegistry()
+
+
+class _Attempt:
+    def __init__(self, provider, health, hedge):
+        self.provider = provider
+        self.health = health
+        self.hedge = hedge
+        self.started = time.monotonic()
+        self.stopped = threading.Event()
+        self.handle = None
+
+
+class _Race:
+    """Which attempts are running, when to fail over or hedge, and when to give up"""
+
+    def __init__(self, chatbot_config, providers, work, streaming):
+        self.config = chatbot_config
+        self.waiting = list(providers)
+        self.work = work
+        self.streaming = streaming
+        self.running = []
+        self.failed = []
+        self.winner = None
+        self.hedge_after = chatbot_config.hedge_after_ms / 1000
+        self.deadline = time.monotonic() + chatbot_config.response_timeout
+
+    def start(self, attempt):
+        raise NotImplementedError
+
+    def stop(self, attempt):
+        raise NotImplementedError
+
+    def launch(self, hedge=False):
+        while self.waiting:
+            provider = self.waiting.pop(0)
+            health = provider_health.get(provider.name)
+            if not health.allow(self.config):
+                continue
+            if hedge:
+                health.count('hedges')
+            attempt = _Attempt(provider, health, hedge)
+            self.running.append(attempt)
+            self.start(attempt)
+            return True
+        return False
+
+    def fail(self, attempt, error, timed_out=False):
+        self.running.remove(attempt)
+        attempt.health.failed(error, self.config, timed_out)
+        self.failed.append(attempt.provider.name)
+        logger.warning('%s attempt failed: %s', attempt.provider.name, error)
+
+    def handle(self, attempt, kind, value):
+        """Apply an event from an attempt; returns the answer (or first chunk) once there is one"""
+        if attempt not in self.running:
+            return None  # already timed out or cancelled
+        if kind not in ('result', 'chunk'):
+            self.fail(attempt, value if kind == 'error' else 'empty response')
+            return None
+        self.winner = attempt
+        self.running.remove(attempt)
+        attempt.health.succeeded(time.monotonic() - attempt.started)
+        if attempt.hedge:
+            attempt.health.count('hedge_wins')
+        for other in self.running:
+            other.health.abandoned()
+            self.stop(other)
+        self.running = []
+        return value
+
+    def step(self):
+        """Time out, fail over and hedge; seconds to wait for the next event, or None once there is nothing left to wait for"""
+        now = time.monotonic()
+        for attempt in list(self.running):
+            if now >= min(attempt.started + self.config.attempt_timeout, self.deadline):
+                self.fail(attempt, f'no answer after {now - attempt.started:.1f}s', timed_out=True)
+                self.stop(attempt)
+        if now >= self.deadline:
+            return None
+        if not self.running and not self.launch():
+            return None
+        if self.hedge_after and len(self.running) == 1 and now >= self.running[0].started + self.hedge_after:
+            self.launch(hedge=True)
+
+        due = [self.deadline] + [attempt.started + self.config.attempt_timeout for attempt in self.running]
+        if self.hedge_after and len(self.running) == 1 and self.waiting:
+            due.append(self.running[0].started + self.hedge_after)
+        return max(0.0, min(due) - time.monotonic())
+
+    def annotations(self):
+        """Metadata noting failovers and hedge wins for the stored message"""
+        notes = {}
+        if self.failed:
+            notes['failed_over'] = self.failed
+        if self.winner.hedge:
+            notes['hedged'] = True
+        return notes
+
+    def stream_failed(self, error):
+        self.winner.health.failed(error, self.config)
+        return ProviderError(f"{self.winner.provider.name}: {error}")
+
+    def close(self):
+        for attempt in [*self.running, *([self.winner] if self.winner else [])]:
+            self.stop(attempt)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.CHATBOT_PROVIDER_THREADS, thread_name_prefix='chatbot-provider'
+                )
+    return _executor
+
+
+class _ThreadRace(_Race):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.events = queue.Queue()
+
+    def start(self, attempt):
+        _get_executor().submit(self._run, attempt)
+
+    def stop(self, attempt):
+        attempt.stopped.set()
+
+    def _run(self, attempt):
+        if attempt.stopped.is_set():
+            return
+        try:
+            if not self.streaming:
+                self.events.put((attempt, 'result', self.work(attempt.provider)))
+                return
+            chunks = iter(self.work(attempt.provider))
+            try:
+                for chunk in chunks:
+                    if attempt.stopped.is_set():
+                        return
+                    if chunk:
+                        self.events.put((attempt, 'chunk', chunk))
+            finally:
+                if hasattr(chunks, 'close'):
+                    chunks.close()
+            self.events.put((attempt, 'end', None))
+        except Exception as e:
+            self.events.put((attempt, 'error', e))
+
+    def first(self):
+        while True:
+            timeout = self.step()
+            if timeout is None:
+                return None
+            try:
+                event = self.events.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            value = self.handle(*event)
+            if value is not None:
+                return value
+
+    def rest(self):
+        """Remaining chunks of the winning stream"""
+        while True:
+            try:
+                attempt, kind, value = self.events.get(timeout=self.config.attempt_timeout)
+            except queue.Empty:
+                raise self.stream_failed('stream stalled')
+            if attempt is not self.winner:
+                continue
+            if kind == 'end':
+                return
+            if kind == 'error':
+                raise self.stream_failed(value)
+            yield value
+
+
+class _TaskRace(_Race):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.events = asyncio.Queue()
+
+    def start(self, attempt):
+        attempt.handle = asyncio.ensure_future(self._run(attempt))
+
+    def stop(self, attempt):
+        attempt.handle.cancel()
+
+    async def _run(self, attempt):
+        try:
+            if not self.streaming:
+                self.events.put_nowait((attempt, 'result', await self.work(attempt.provider)))
+                return
+            async for chunk in self.work(attempt.provider):
+                if chunk:
+                    self.events.put_nowait((attempt, 'chunk', chunk))
+            self.events.put_nowait((attempt, 'end', None))
+        except Exception as e:
+            self.events.put_nowait((attempt, 'error', e))
+
+    async def first(self):
+        while True:
+            timeout = self.step()
+            if timeout is None:
+                return None
+            try:
+                event = await asyncio.wait_for(self.events.get(), timeout)
+            except asyncio.TimeoutError:
+                continue
+            value = self.handle(*event)
+            if value is not None:
+                return value
+
+    async def rest(self):
+        while True:
+            try:
+                attempt, kind, value = await asyncio.wait_for(self.events.get(), self.config.attempt_timeout)
+            except asyncio.TimeoutError:
+                raise self.stream_failed('stream stalled')
+            if attempt is not self.winner:
+                continue
+            if kind == 'end':
+                return
+            if kind == 'error':
+                raise self.stream_failed(value)
+            yield value
+
+
+def complete(chatbot_config, providers, call):
+    """First answer from `call(provider)` along the chain; None if no provider answered in time"""
+    race = _ThreadRace(chatbot_config, providers, call, streaming=False)
+    response = race.first()
+    if response is None:
+        return None
+    return {**response, 'metadata': {**response['metadata'], **race.annotations()}}
+
+
+def stream(chatbot_config, providers, open_stream, metadata):
+    """
+    Chunks from the first provider along the chain to start streaming, filling
+    `metadata` with its details. Yields nothing if no provider started in time;
+    raises ProviderError if the stream breaks after it started.
+    """
+    race = _ThreadRace(chatbot_config, providers, open_stream, streaming=True)
+    try:
+        first = race.first()
+        if first is None:
+            return
+        metadata.update(race.winner.provider.metadata(), **race.annotations())
+        yield first
+        yield from race.rest()
+    finally:
+        race.close()
+
+
+async def acomplete(chatbot_config, providers, call):
+    """Async counterpart of `complete`; `call(provider)` returns an awaitable"""
+    race = _TaskRace(chatbot_config, providers, call, streaming=False)
+    try:
+        response = await race.first()
+    finally:
+        race.close()
+    if response is None:
+        return None
+    return {**response, 'metadata': {**response['metadata'], **race.annotations()}}
+
+
+async def astream(chatbot_config, providers, open_stream, metadata):
+    """Async counterpart of `stream`; `open_stream(provider)` returns an async iterator"""
+    race = _TaskRace(chatbot_config, providers, open_stream, streaming=True)
+    try:
+        first = await race.first()
+        if first is None:
+            return
+        metadata.update(race.winner.provider.metadata(), **race.annotations())
+        yield first
+        async for chunk in race.rest():
+            yield chunk
+    finally:
+        race.close()
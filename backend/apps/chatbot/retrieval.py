@@ -0,0 +1,244 @@
+"""
+Catalog retrieval for grounding chatbot answers.
+
+Courses, course offerings (cutoffs, fees, deadlines per university),
+universities, careers and societies are turned into short fact sentences and
+kept in an in-process BM25 index. `retrieve_facts` returns the best-scoring
+facts for a message within a token budget; `_build_context` adds them to the
+system prompt so answers quote real numbers instead of guessing.
+
+Saving or deleting any catalog row bumps a version token in the shared
+cache; the import commands run inside `catalog_update()` and bump it once
+when they finish. Each process rebuilds its index on the next query after a
+bump: one thread builds and swaps the new index in while concurrent queries
+keep using the old one. A query walks only the postings of its terms, so
+retrieval stays in the low milliseconds.
+"""
+import heapq
+import math
+import re
+import threading
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .context_window import estimate_tokens
+
+
+CATALOG_VERSION_KEY = 'chatbot:catalog-version'
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+STOP_WORDS = frozenset(
+    'a an and are as at be by can do does for from how i in is it me my of on or the to what when where which'
+    ' who why will with you your please tell about'.split()
+)
+BM25_K1 = 1.2
+BM25_B = 0.75
+FACT_MAX_CHARS = 320
+# Facts scoring below this share of the best match are left out
+MIN_RELATIVE_SCORE = 0.35
+
+
+def tokenize(text):
+    tokens = []
+    for token in TOKEN_RE.findall(str(text).lower()):
+        if token in STOP_WORDS:
+            continue
+        if len(token) > 4 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(CATALOG_VERSION_KEY, version, None)
+    return version
+
+
+def bump_catalog_version():
+    cache.set(CATALOG_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+_updates = threading.local()
+
+
+def in_catalog_update():
+    return getattr(_updates, 'depth', 0) > 0
+
+
+@contextmanager
+def catalog_update():
+    """
+    Bump the catalog version once when the block (or decorated command)
+    exits, instead of on every row it saves; bulk writes that send no
+    signals are covered too.
+    """
+    _updates.depth = getattr(_updates, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _updates.depth -= 1
+        if not _updates.depth:
+            bump_catalog_version()
+
+
+def _clip(text, limit=FACT_MAX_CHARS):
+    text = ' '.join(str(text or '').split())
+    return text if len(text) <= limit else text[:limit].rstrip() + '…'
+
+
+def _join(values):
+    return ', '.join(str(value) for value in values or [] if value)
+
+
+def catalog_facts():
+    """`(title, fact)` pairs for every catalog row; titles are weighted higher when indexing"""
+    from apps.careers.models import Career
+    from apps.courses.models import Course, CourseUniversity, University
+    from apps.societies.models import Society
+
+    for course in Course.objects.only(
+        'name', 'category', 'duration', 'cluster_points', 'career_paths', 'cluster_subjects', 'description'
+    ):
+        yield course.name, _clip(
+            f"Course: {course.name} ({course.category}, {course.duration}). "
+            f"Minimum cluster points: {course.cluster_points}. "
+            f"Cluster subjects: {_join(course.cluster_subjects) or 'not listed'}. "
+            f"Career paths: {_join(course.career_paths) or 'not listed'}. {course.description}"
+        )
+
+    offerings = CourseUniversity.objects.select_related('course', 'university').only(
+        'fees_ksh', 'cutoff_points', 'cutoff_2022', 'application_deadline', 'program_code',
+        'course__name', 'university__name', 'university__short_name',
+    )
+    for offering in offerings:
+        details = [f"cutoff {offering.cutoff_points} points"]
+        if offering.cutoff_2022 is not None:
+            details.append(f"2022 cutoff {offering.cutoff_2022}")
+        details.append(f"fees KSh {offering.fees_ksh:,.0f} per year")
+        if offering.program_code:
+            details.append(f"KUCCPS code {offering.program_code}")
+        if offering.application_deadline:
+            details.append(f"application deadline {offering.application_deadline:%d %b %Y}")
+        university = offering.university
+        yield f"{offering.course.name} {university.name} {university.short_name}", _clip(
+            f"{offering.course.name} at {university.name} ({university.short_name}): {', '.join(details)}."
+        )
+
+    for university in University.objects.only(
+        'name', 'short_name', 'type', 'location', 'ranking', 'established', 'description'
+    ):
+        yield f"{university.name} {university.short_name}", _clip(
+            f"University: {university.name} ({university.short_name}), {university.type}, {university.location}. "
+            f"Ranked {university.ranking}, established {university.established}. {university.description}"
+        )
+
+    for career in Career.objects.only(
+        'name', 'category', 'avg_salary_ksh', 'job_demand_score', 'growth_rate', 'description'
+    ):
+        yield career.name, _clip(
+            f"Career: {career.name} ({career.category}). Average salary KSh {career.avg_salary_ksh:,.0f}, "
+            f"job demand {career.job_demand_score}/100, growth {career.growth_rate}%. {career.description}"
+        )
+
+    for society in Society.objects.only('name', 'acronym', 'type', 'description'):
+        yield f"{society.name} {society.acronym}", _clip(
+            f"Society: {society.acronym} - {society.name} ({society.type}). {society.description}"
+        )
+
+
+class CatalogIndex:
+    """BM25 over catalog facts, rebuilt lazily when the catalog version changes"""
+
+    TITLE_WEIGHT = 2
+
+    def __init__(self):
+        self.facts = []
+        self.postings = {}  # term -> [(fact index, term frequency)]
+        self.lengths = []
+        self.average_length = 0.0
+        self.idf = {}
+        self.version = None
+        self._lock = threading.Lock()
+
+    def sync(self):
+        version = get_catalog_version()
+        if version == self.version:
+            return
+        # Only the first build makes queries wait; later ones keep serving the old index
+        if not self._lock.acquire(blocking=self.version is None):
+            return
+        try:
+            if version != self.version:
+                self._build()
+                self.version = version
+        finally:
+            self._lock.release()
+
+    def _build(self):
+        facts, lengths, postings = [], [], {}
+        for title, fact in catalog_facts():
+            terms = Counter(tokenize(fact))
+            for token in tokenize(title):
+                terms[token] += self.TITLE_WEIGHT
+            index = len(facts)
+            facts.append(fact)
+            lengths.append(sum(terms.values()))
+            for term, frequency in terms.items():
+                postings.setdefault(term, []).append((index, frequency))
+
+        count = len(facts)
+        idf = {
+            term: math.log(1 + (count - len(entries) + 0.5) / (len(entries) + 0.5))
+            for term, entries in postings.items()
+        }
+        # Swap everything in at once so concurrent searches never see a half-built index
+        self.facts, self.lengths, self.postings, self.idf = facts, lengths, postings, idf
+        self.average_length = (sum(lengths) / count) if count else 0.0
+
+    def search(self, text, limit):
+        """`[(score, fact)]` for the best `limit` facts"""
+        self.sync()
+        facts, lengths, postings, idf = self.facts, self.lengths, self.postings, self.idf
+        if not facts:
+            return []
+        scores = Counter()
+        for term in set(tokenize(text)):
+            entries = postings.get(term)
+            if not entries:
+                continue
+            weight = idf[term]
+            for index, frequency in entries:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[index] / self.average_length)
+                scores[index] += weight * frequency * (BM25_K1 + 1) / (frequency + norm)
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(score, facts[index]) for index, score in top]
+
+
+catalog_index = CatalogIndex()
+
+
+def retrieve_facts(text, token_budget=None, limit=None):
+    """Most relevant catalog facts for `text` that fit in `token_budget`"""
+    token_budget = settings.CHATBOT_RETRIEVAL_TOKEN_BUDGET if token_budget is None else token_budget
+    limit = limit or settings.CHATBOT_RETRIEVAL_TOP_K
+    results = catalog_index.search(text, limit)
+    if not results:
+        return []
+    threshold = results[0][0] * MIN_RELATIVE_SCORE
+    facts = []
+    for score, fact in results:
+        if score < threshold:
+            break
+        cost = estimate_tokens(fact) + 1
+        if cost > token_budget:
+            continue
+        token_budget -= cost
+        facts.append(fact)
+    return facts
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import ChatConversation, ChatMessage, CareerProsCons, ChatbotSettings
+from .models import ChatConversation, ChatMessage, CareerProsCons, ChatbotSettings, ChatJob
 
 
 class ChatMessageSerializer(serializers.ModelSerializer):
@@ -76,6 +76,20 @@ class ChatbotSettingsSerializer(serializers.ModelSerializer):
         model = ChatbotSettings
         fields = [
             'id', 'ai_provider', 'ai_model', 'max_tokens', 
-            'temperature', 'system_prompt', 'is_active'
+            'temperature', 'system_prompt', 'fallback_providers',
+            'attempt_timeout', 'response_timeout', 'hedge_after_ms',
+            'breaker_failure_threshold', 'breaker_reset_seconds', 'is_active'
         ]
         read_only_fields = ['id']
+
+
+class ChatJobSerializer(serializers.ModelSerializer):
+    """Serializer for queued AI generation jobs"""
+    
+    class Meta:
+        model = ChatJob
+        fields = [
+            'id', 'kind', 'status', 'result', 'attempts', 'max_attempts',
+            'last_error', 'run_after', 'created_at', 'finished_at'
+        ]
+        read_only_fields = fields
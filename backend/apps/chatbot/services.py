@@ -1,57 +1,146 @@
-import os
-import json
-import requests
-from typing import Dict, List, Any
-from django.conf import settings
-from .models import ChatConversation, ChatMessage, ChatbotSettings
+import logging
+from dataclasses import replace
+from typing import AsyncIterator, Dict, Iterator, List, Any
+from asgiref.sync import sync_to_async
+from . import answer_cache, resilience
+from .config import ChatbotConfig, get_chatbot_config
+from .context_window import build_context_messages
+from .models import ChatConversation
+from .providers import ProviderError
+from .retrieval import retrieve_facts
+
+
+logger = logging.getLogger(__name__)
+
+PROS_CONS_MAX_TOKENS = 1000
 
 
 class ChatbotService:
     """Service for handling AI chatbot interactions"""
     
-    def __init__(self):
-        self.settings = self._get_chatbot_settings()
+    def __init__(self, chatbot_config: ChatbotConfig = None):
+        self.settings = chatbot_config or get_chatbot_config()
+        self.providers = resilience.provider_chain(self.settings)
     
-    def _get_chatbot_settings(self):
-        """Get active chatbot settings"""
-        try:
-            return ChatbotSettings.objects.filter(is_active=True).first()
-        except:
-            # Return default settings if none exist
-            return type('Settings', (), {
-                'ai_provider': 'openai',
-                'ai_model': 'gpt-3.5-turbo',
-                'max_tokens': 1000,
-                'temperature': 0.7,
-                'system_prompt': "You are EduPath AI, a helpful assistant for students exploring career paths and educational opportunities in Kenya. Provide accurate, helpful information about careers, courses, universities, and professional societies."
-            })()
+    def build_messages(self, conversation: ChatConversation, user_message: str, context_type: str) -> List[Dict[str, str]]:
+        """Provider-ready transcript: system prompt with context and summary, recent history within the token budget, and the new message"""
+        context = self._build_context(conversation, context_type, user_message)
+        system_content = f"{self.settings.system_prompt}\n\nContext: {context}"
+        return build_context_messages(conversation, system_content, user_message)
+    
+    def cached_question(self, conversation: ChatConversation, user_message: str, context_type: str):
+        """Cache handle for the question; falsy when the cache should not be used for it (e.g. the conversation has history)"""
+        question = answer_cache.CachedQuestion(user_message, context_type, conversation.hub_id, self.settings)
+        if question.cacheable and answer_cache.is_first_turn(conversation, user_message):
+            return question
+        return None
     
-    def generate_response(self, conversation: ChatConversation, user_message: str, context_type: str) -> Dict[str, Any]:
-        """Generate AI response based on conversation context"""
+    def generate_response(self, conversation: ChatConversation, user_message: str, context_type: str, use_cache: bool = True) -> Dict[str, Any]:
+        """Generate AI response based on conversation context, failing over between the configured providers"""
+        cached_question = use_cache and self.cached_question(conversation, user_message, context_type)
+        if cached_question:
+            cached = answer_cache.lookup(cached_question)
+            if cached:
+                return cached
         
-        # Get conversation history
-        recent_messages = ChatMessage.objects.filter(
-            conversation=conversation
-        ).order_by('-created_at')[:10]  # Last 10 messages
+        messages = self.build_messages(conversation, user_message, context_type)
+        response = resilience.complete(self.settings, self.providers, lambda provider: provider.complete(messages))
+        if response is None:
+            return self._generate_fallback_response(user_message)
+        
+        if cached_question:
+            answer_cache.store(cached_question, response)
+        return response
+    
+    def stream_response(self, conversation: ChatConversation, user_message: str, context_type: str, use_cache: bool = True, metadata: Dict[str, Any] = None) -> Iterator[str]:
+        """
+        Generate the AI response as a stream of text chunks, filling `metadata` as it goes.
+        If no provider starts streaming in time, the fallback response is streamed instead.
+        """
+        metadata = {} if metadata is None else metadata
+        cached_question = use_cache and self.cached_question(conversation, user_message, context_type)
+        if cached_question:
+            cached = answer_cache.lookup(cached_question)
+            if cached:
+                metadata.update(cached['metadata'])
+                yield cached['content']
+                return
         
-        # Build context
-        context = self._build_context(conversation, context_type)
+        messages = self.build_messages(conversation, user_message, context_type)
+        chunks = []
+        try:
+            for chunk in resilience.stream(
+                self.settings, self.providers, lambda provider: provider.stream(messages), metadata
+            ):
+                chunks.append(chunk)
+                yield chunk
+        except ProviderError as e:
+            logger.warning('%s streaming error: %s', metadata.get('provider'), e)
+            metadata['error'] = str(e)
+            return
         
-        # Prepare messages for AI
-        messages = self._prepare_messages(recent_messages, user_message, context)
+        if chunks and cached_question:
+            answer_cache.store(cached_question, {'content': ''.join(chunks), 'metadata': metadata})
+        if not chunks:
+            fallback = self._generate_fallback_response(user_message)
+            metadata.clear()
+            metadata.update(fallback['metadata'])
+            yield fallback['content']
+    
+    async def agenerate_response(self, conversation: ChatConversation, user_message: str, context_type: str, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Async counterpart of `generate_response` for async views: the provider
+        call goes through the pooled async clients instead of blocking a thread.
+        """
+        cached_question = use_cache and await sync_to_async(self.cached_question)(conversation, user_message, context_type)
+        if cached_question:
+            cached = await sync_to_async(answer_cache.lookup)(cached_question)
+            if cached:
+                return cached
         
-        # Generate response based on AI provider
-        if self.settings.ai_provider == 'openai':
-            return self._generate_openai_response(messages)
-        elif self.settings.ai_provider == 'anthropic':
-            return self._generate_anthropic_response(messages)
-        elif self.settings.ai_provider == 'google':
-            return self._generate_google_response(messages)
-        else:
+        messages = await sync_to_async(self.build_messages)(conversation, user_message, context_type)
+        response = await resilience.acomplete(self.settings, self.providers, lambda provider: provider.acomplete(messages))
+        if response is None:
             return self._generate_fallback_response(user_message)
+        
+        if cached_question:
+            await sync_to_async(answer_cache.store)(cached_question, response)
+        return response
+    
+    async def astream_response(self, conversation: ChatConversation, user_message: str, context_type: str, use_cache: bool = True, metadata: Dict[str, Any] = None) -> AsyncIterator[str]:
+        """Async counterpart of `stream_response`"""
+        metadata = {} if metadata is None else metadata
+        cached_question = use_cache and await sync_to_async(self.cached_question)(conversation, user_message, context_type)
+        if cached_question:
+            cached = await sync_to_async(answer_cache.lookup)(cached_question)
+            if cached:
+                metadata.update(cached['metadata'])
+                yield cached['content']
+                return
+        
+        messages = await sync_to_async(self.build_messages)(conversation, user_message, context_type)
+        chunks = []
+        try:
+            async for chunk in resilience.astream(
+                self.settings, self.providers, lambda provider: provider.astream(messages), metadata
+            ):
+                chunks.append(chunk)
+                yield chunk
+        except ProviderError as e:
+            logger.warning('%s streaming error: %s', metadata.get('provider'), e)
+            metadata['error'] = str(e)
+            return
+        
+        if chunks and cached_question:
+            await sync_to_async(answer_cache.store)(cached_question, {'content': ''.join(chunks), 'metadata': metadata})
+        if not chunks:
+            fallback = self._generate_fallback_response(user_message)
+            metadata.clear()
+            metadata.update(fallback['metadata'])
+            yield fallback['content']
     
-    def _build_context(self, conversation: ChatConversation, context_type: str) -> str:
-        """Build context string based on conversation type"""
+    def _build_context(self, conversation: ChatConversation, context_type: str, user_message: str = '') -> str:
+        """Build context string based on conversation type, with catalog facts relevant to the message"""
         context_parts = []
         
         if conversation.hub:
@@ -66,144 +155,11 @@ class ChatbotService:
         elif context_type == 'society_info':
             context_parts.append("Focus on professional societies, membership benefits, and networking.")
         
-        return " | ".join(context_parts)
-    
-    def _prepare_messages(self, recent_messages: List[ChatMessage], user_message: str, context: str) -> List[Dict[str, str]]:
-        """Prepare messages for AI API"""
-        messages = [
-            {"role": "system", "content": f"{self.settings.system_prompt}\n\nContext: {context}"}
-        ]
-        
-        # Add recent conversation history
-        for msg in reversed(recent_messages):
-            role = "user" if msg.sender_type == "user" else "assistant"
-            messages.append({"role": role, "content": msg.content})
-        
-        # Add current user message
-        messages.append({"role": "user", "content": user_message})
-        
-        return messages
-    
-    def _generate_openai_response(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
-        """Generate response using OpenAI API"""
-        try:
-            api_key = os.getenv('OPENAI_API_KEY')
-            if not api_key:
-                return self._generate_fallback_response(messages[-1]['content'])
-            
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers={
-                    'Authorization': f'Bearer {api_key}',
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': self.settings.ai_model,
-                    'messages': messages,
-                    'max_tokens': self.settings.max_tokens,
-                    'temperature': self.settings.temperature
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    'content': data['choices'][0]['message']['content'],
-                    'metadata': {'model': self.settings.ai_model, 'provider': 'openai'}
-                }
-            else:
-                return self._generate_fallback_response(messages[-1]['content'])
-                
-        except Exception as e:
-            print(f"OpenAI API error: {e}")
-            return self._generate_fallback_response(messages[-1]['content'])
-    
-    def _generate_anthropic_response(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
-        """Generate response using Anthropic Claude API"""
-        try:
-            api_key = os.getenv('ANTHROPIC_API_KEY')
-            if not api_key:
-                return self._generate_fallback_response(messages[-1]['content'])
-            
-            # Convert messages to Claude format
-            prompt = self._convert_messages_to_prompt(messages)
-            
-            response = requests.post(
-                'https://api.anthropic.com/v1/messages',
-                headers={
-                    'x-api-key': api_key,
-                    'Content-Type': 'application/json',
-                    'anthropic-version': '2023-06-01'
-                },
-                json={
-                    'model': 'claude-3-sonnet-20240229',
-                    'max_tokens': self.settings.max_tokens,
-                    'messages': [{'role': 'user', 'content': prompt}]
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    'content': data['content'][0]['text'],
-                    'metadata': {'model': 'claude-3-sonnet', 'provider': 'anthropic'}
-                }
-            else:
-                return self._generate_fallback_response(messages[-1]['content'])
-                
-        except Exception as e:
-            print(f"Anthropic API error: {e}")
-            return self._generate_fallback_response(messages[-1]['content'])
-    
-    def _generate_google_response(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
-        """Generate response using Google Gemini API"""
-        try:
-            api_key = os.getenv('GOOGLE_API_KEY')
-            if not api_key:
-                return self._generate_fallback_response(messages[-1]['content'])
-            
-            # Convert messages to Gemini format
-            prompt = self._convert_messages_to_prompt(messages)
-            
-            response = requests.post(
-                f'https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent?key={api_key}',
-                json={
-                    'contents': [{'parts': [{'text': prompt}]}],
-                    'generationConfig': {
-                        'maxOutputTokens': self.settings.max_tokens,
-                        'temperature': self.settings.temperature
-                    }
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {
-                    'content': data['candidates'][0]['content']['parts'][0]['text'],
-                    'metadata': {'model': 'gemini-pro', 'provider': 'google'}
-                }
-            else:
-                return self._generate_fallback_response(messages[-1]['content'])
-                
-        except Exception as e:
-            print(f"Google API error: {e}")
-            return self._generate_fallback_response(messages[-1]['content'])
-    
-    def _convert_messages_to_prompt(self, messages: List[Dict[str, str]]) -> str:
-        """Convert message list to single prompt string"""
-        prompt_parts = []
-        for msg in messages:
-            if msg['role'] == 'system':
-                prompt_parts.append(f"System: {msg['content']}")
-            elif msg['role'] == 'user':
-                prompt_parts.append(f"Human: {msg['content']}")
-            elif msg['role'] == 'assistant':
-                prompt_parts.append(f"Assistant: {msg['content']}")
-        
-        return "\n\n".join(prompt_parts)
+        context = " | ".join(context_parts)
+        facts = retrieve_facts(user_message) if user_message else []
+        if facts:
+            context += "\n\nRelevant EduPath catalog facts (prefer these over memory):\n" + "\n".join(f"- {fact}" for fact in facts)
+        return context
     
     def _generate_fallback_response(self, user_message: str) -> Dict[str, Any]:
         """Generate fallback response when AI services are unavailable"""
@@ -234,19 +190,24 @@ class ChatbotService:
 class AIProsConsService:
     """Service for generating pros and cons using AI"""
     
-    def generate_pros_cons(self, career_name: str, course_name: str = None, context: str = '') -> Dict[str, List[str]]:
-        """Generate pros and cons for a career or course"""
+    def generate_pros_cons(self, career_name: str, course_name: str = None, context: str = '') -> Dict[str, Any]:
+        """Generate pros and cons for a career or course; `generated_by` tells AI output from the static fallback"""
         
         # Build prompt for pros and cons generation
         prompt = self._build_pros_cons_prompt(career_name, course_name, context)
+        messages = [{'role': 'user', 'content': prompt}]
         
-        try:
-            # Try OpenAI first
-            response = self._call_openai_api(prompt)
-            if response:
-                return self._parse_pros_cons_response(response)
-        except Exception as e:
-            print(f"OpenAI API error: {e}")
+        # Same providers, failover and breakers as the chatbot, with room for a full list
+        chatbot_config = get_chatbot_config()
+        chatbot_config = replace(chatbot_config, max_tokens=max(chatbot_config.max_tokens, PROS_CONS_MAX_TOKENS))
+        response = resilience.complete(
+            chatbot_config, resilience.provider_chain(chatbot_config), lambda provider: provider.complete(messages)
+        )
+        if response:
+            pros_cons = self._parse_pros_cons_response(response['content'])
+            if pros_cons['pros'] or pros_cons['cons']:
+                return dict(pros_cons, generated_by='ai_chatbot')
+            logger.warning('%s returned no pros/cons list for %s', response['metadata'].get('provider'), career_name)
         
         # Fallback to static pros/cons
         return self._get_fallback_pros_cons(career_name, course_name)
@@ -284,38 +245,6 @@ class AIProsConsService:
         
         return prompt
     
-    def _call_openai_api(self, prompt: str) -> str:
-        """Call OpenAI API for pros and cons generation"""
-        try:
-            api_key = os.getenv('OPENAI_API_KEY')
-            if not api_key:
-                return None
-            
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers={
-                    'Authorization': f'Bearer {api_key}',
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': 'gpt-3.5-turbo',
-                    'messages': [{'role': 'user', 'content': prompt}],
-                    'max_tokens': 1000,
-                    'temperature': 0.7
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data['choices'][0]['message']['content']
-            else:
-                return None
-                
-        except Exception as e:
-            print(f"OpenAI API error: {e}")
-            return None
-    
     def _parse_pros_cons_response(self, response: str) -> Dict[str, List[str]]:
         """Parse AI response to extract pros and cons"""
         lines = response.split('\n')
@@ -344,6 +273,7 @@ class AIProsConsService:
         """Get fallback pros and cons when AI is unavailable"""
         # This could be expanded with a database of pre-generated pros/cons
         return {
+            'generated_by': 'fallback',
             'pros': [
                 f"Good career prospects in {career_name}",
                 "Opportunities for professional growth",
@@ -359,3 +289,16 @@ class AIProsConsService:
                 "Continuous learning required"
             ]
         }
+
+
+_service = None
+
+
+def get_chatbot_service() -> ChatbotService:
+    """Shared ChatbotService for the current chatbot settings, rebuilt when they change"""
+    global _service
+    chatbot_config = get_chatbot_config()
+    service = _service
+    if service is None or service.settings is not chatbot_config:
+        service = _service = ChatbotService(chatbot_config)
+    return service
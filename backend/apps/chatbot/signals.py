@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .config import bump_settings_version
+from .models import ChatbotSettings
+from .retrieval import bump_catalog_version, in_catalog_update
+
+
+CATALOG_MODELS = ['courses.Course', 'courses.CourseUniversity', 'courses.University', 'careers.Career', 'societies.Society']
+
+
+@receiver(post_save, sender=ChatbotSettings)
+@receiver(post_delete, sender=ChatbotSettings)
+def chatbot_settings_changed(sender, **kwargs):
+    # Every process reloads its settings snapshot (and chatbot service) on next use
+    bump_settings_version()
+
+
+def catalog_changed(sender, **kwargs):
+    # Retrieval indexes rebuild on their next query; imports bump once when they finish
+    if not in_catalog_update():
+        bump_catalog_version()
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(catalog_changed, sender=model, dispatch_uid=f'chatbot_catalog_saved_{model}')
+    post_delete.connect(catalog_changed, sender=model, dispatch_uid=f'chatbot_catalog_deleted_{model}')
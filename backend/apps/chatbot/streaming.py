@@ -0,0 +1,95 @@
+"""
+Server-sent events for streamed chat replies.
+
+`stream_reply` relays provider chunks to the client as `token` events while
+accumulating them, persists the AI ChatMessage once the stream ends (or the
+client goes away), and finishes with a `done` event carrying both messages.
+"""
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+from .models import ChatMessage
+from .serializers import ChatMessageSerializer
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets views accept `Accept: text/event-stream`; non-streamed replies (errors) are sent as JSON"""
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode(self.charset)
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream_reply(service, conversation, user_message, use_cache=True):
+    chunks = []
+    metadata = {}
+    finished = False
+    try:
+        yield sse_event('start', {'user_message': ChatMessageSerializer(user_message).data})
+        for chunk in service.stream_response(
+            conversation=conversation,
+            user_message=user_message.content,
+            context_type=conversation.context_type,
+            use_cache=use_cache,
+            metadata=metadata
+        ):
+            chunks.append(chunk)
+            yield sse_event('token', {'content': chunk})
+        finished = True
+    finally:
+        # Runs on normal completion and when the client disconnects mid-stream
+        metadata['streamed'] = True
+        if not finished:
+            metadata['incomplete'] = True
+        ai_message = ChatMessage.objects.create(
+            conversation=conversation,
+            sender_type='ai',
+            content=''.join(chunks),
+            metadata=metadata
+        )
+        conversation.save()
+    yield sse_event('done', {
+        'user_message': ChatMessageSerializer(user_message).data,
+        'ai_message': ChatMessageSerializer(ai_message).data
+    })
+
+
+async def astream_reply(service, conversation, user_message, use_cache=True):
+    """Async counterpart of `stream_reply` for ASGI views"""
+    chunks = []
+    metadata = {}
+    finished = False
+    try:
+        yield sse_event('start', {'user_message': ChatMessageSerializer(user_message).data})
+        async for chunk in service.astream_response(
+            conversation=conversation,
+            user_message=user_message.content,
+            context_type=conversation.context_type,
+            use_cache=use_cache,
+            metadata=metadata
+        ):
+            chunks.append(chunk)
+            yield sse_event('token', {'content': chunk})
+        finished = True
+    finally:
+        metadata['streamed'] = True
+        if not finished:
+            metadata['incomplete'] = True
+        ai_message = await ChatMessage.objects.acreate(
+            conversation=conversation,
+            sender_type='ai',
+            content=''.join(chunks),
+            metadata=metadata
+        )
+        await conversation.asave()
+    yield sse_event('done', {
+        'user_message': ChatMessageSerializer(user_message).data,
+        'ai_message': ChatMessageSerializer(ai_message).data
+    })
@@ -0,0 +1,54 @@
+from django.test import SimpleTestCase, TestCase
+
+from apps.authentication.models import User
+
+from .answer_cache import cache_key, is_first_turn, question_tokens
+from .models import ChatConversation, ChatMessage
+
+
+def _key(text):
+    return cache_key(' '.join(question_tokens(text)[1]), ('career_guidance', '', 'fingerprint'))
+
+
+class QuestionKeyTests(SimpleTestCase):
+    def assertSameKey(self, first, second):
+        self.assertEqual(_key(first), _key(second), f'{first!r} vs {second!r}')
+
+    def assertDifferentKey(self, first, second):
+        self.assertNotEqual(_key(first), _key(second), f'{first!r} vs {second!r}')
+
+    def test_rephrased_question_shares_key(self):
+        self.assertSameKey('What are the cluster points for medicine?', 'cluster points needed for medicine')
+        self.assertSameKey('How much are the fees for nursing at Moi University?', 'fees for nursing at moi university')
+
+    def test_entity_swaps_miss(self):
+        self.assertDifferentKey('What are the cluster points for medicine?', 'What are the cluster points for nursing?')
+        self.assertDifferentKey(
+            'Fees for computer science at University of Nairobi',
+            'Fees for computer science at Kenyatta University',
+        )
+        self.assertDifferentKey('What does a software engineer earn?', 'What does a civil engineer earn?')
+        self.assertDifferentKey('Courses I can do with 40 cluster points', 'Courses I can do with 30 cluster points')
+
+    def test_word_order_swaps_miss(self):
+        self.assertDifferentKey('switch from medicine to nursing', 'switch from nursing to medicine')
+
+
+class FirstTurnTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(email='student@example.com', username='student', password='pw12345678')
+        self.conversation = ChatConversation.objects.create(user=user, context_type='career_guidance')
+
+    def test_opening_question_is_first_turn(self):
+        ChatMessage.objects.create(conversation=self.conversation, sender_type='user', content='KUCCPS deadline')
+        self.assertTrue(is_first_turn(self.conversation, 'KUCCPS deadline'))
+
+    def test_conversation_with_history_is_not_first_turn(self):
+        ChatMessage.objects.create(conversation=self.conversation, sender_type='user', content='I scored B+ in Kisumu')
+        ChatMessage.objects.create(conversation=self.conversation, sender_type='ai', content='Noted.')
+        ChatMessage.objects.create(conversation=self.conversation, sender_type='user', content='KUCCPS deadline')
+        self.assertFalse(is_first_turn(self.conversation, 'KUCCPS deadline'))
+
+    def test_summarized_conversation_is_not_first_turn(self):
+        self.conversation.summary = '- Student: I live in Kisumu'
+        self.assertFalse(is_first_turn(self.conversation, 'KUCCPS deadline'))
@@ -1,8 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import (
     ChatConversationViewSet, ChatMessageViewSet, 
-    AICareerProsConsViewSet, ChatbotSettingsViewSet
+    AICareerProsConsViewSet, ChatbotSettingsViewSet, ChatJobViewSet
 )
 
 router = DefaultRouter()
@@ -10,7 +11,12 @@ router.register(r'conversations', ChatConversationViewSet, basename='chatbot-con
 router.register(r'messages', ChatMessageViewSet, basename='chatbot-messages')
 router.register(r'pros-cons', AICareerProsConsViewSet, basename='ai-career-pros-cons')
 router.register(r'settings', ChatbotSettingsViewSet, basename='chatbot-settings')
+router.register(r'jobs', ChatJobViewSet, basename='chatbot-jobs')
 
 urlpatterns = [
+    # Async endpoints, served without blocking a worker when running under ASGI
+    path('conversations/<uuid:pk>/send_message_async/', async_views.send_message, name='chatbot-send-message-async'),
+    path('conversations/<uuid:pk>/send_message_stream_async/', async_views.send_message_stream, name='chatbot-send-message-stream-async'),
+    path('jobs/<uuid:pk>/events/', async_views.job_events, name='chatbot-job-events'),
     path('', include(router.urls)),
 ]
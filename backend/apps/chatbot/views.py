@@ -1,16 +1,25 @@
+import os
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from .models import ChatConversation, ChatMessage, CareerProsCons, ChatbotSettings
+from .models import ChatConversation, ChatMessage, CareerProsCons, ChatbotSettings, ChatJob
 from .serializers import (
     ChatConversationSerializer, ChatConversationCreateSerializer,
     ChatMessageSerializer, ChatMessageCreateSerializer,
     AICareerProsConsSerializer, AICareerProsConsCreateSerializer,
-    ChatbotSettingsSerializer
+    ChatbotSettingsSerializer, ChatJobSerializer
 )
-from .services import ChatbotService, AIProsConsService
+from .answer_cache import wants_bypass
+from .jobs import enqueue, wants_background
+from .pros_cons import get_or_generate, pros_cons_key
+from .resilience import provider_health
+from .services import get_chatbot_service
+from .streaming import EventStreamRenderer, stream_reply
+from apps.hubs.pagination import ChronologicalCursorPagination
 
 
 class ChatConversationViewSet(viewsets.ModelViewSet):
@@ -42,13 +51,25 @@ class ChatConversationViewSet(viewsets.ModelViewSet):
             metadata=request.data.get('metadata', {})
         )
         
+        if wants_background(request.data):
+            job = enqueue('chat_reply', {
+                'conversation_id': str(conversation.pk),
+                'user_message_id': str(user_message.pk),
+                'use_cache': not wants_bypass(request.data)
+            }, user_id=request.user.pk)
+            return Response({
+                'user_message': ChatMessageSerializer(user_message).data,
+                'job': ChatJobSerializer(job).data
+            }, status=status.HTTP_202_ACCEPTED)
+        
         # Get AI response
         try:
-            chatbot_service = ChatbotService()
+            chatbot_service = get_chatbot_service()
             ai_response = chatbot_service.generate_response(
                 conversation=conversation,
                 user_message=user_message.content,
-                context_type=conversation.context_type
+                context_type=conversation.context_type,
+                use_cache=not wants_bypass(request.data)
             )
             
             # Create AI message
@@ -73,6 +94,29 @@ class ChatConversationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    @action(detail=True, methods=['post'], renderer_classes=[JSONRenderer, EventStreamRenderer])
+    def send_message_stream(self, request, pk=None):
+        """Send a message and stream the AI response back as server-sent events"""
+        conversation = self.get_object()
+        content = request.data.get('content', '')
+        if not content:
+            return Response({'error': 'content is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        user_message = ChatMessage.objects.create(
+            conversation=conversation,
+            sender_type='user',
+            content=content,
+            metadata=request.data.get('metadata', {})
+        )
+        
+        response = StreamingHttpResponse(
+            stream_reply(get_chatbot_service(), conversation, user_message, use_cache=not wants_bypass(request.data)),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer the stream
+        return response
+    
     @action(detail=False, methods=['post'])
     def start_new_conversation(self, request):
         """Start a new conversation"""
@@ -93,6 +137,7 @@ class ChatMessageViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for reading chat messages"""
     serializer_class = ChatMessageSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ChronologicalCursorPagination
     
     def get_queryset(self):
         conversation_id = self.request.query_params.get('conversation')
@@ -112,31 +157,36 @@ class AICareerProsConsViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return CareerProsCons.objects.all()
     
+    def _save_with_key(self, serializer):
+        fields = {
+            field: serializer.validated_data.get(field, getattr(serializer.instance, field, None))
+            for field in ('career_name', 'course_name', 'context')
+        }
+        serializer.save(content_key=pros_cons_key(**fields))
+    
+    def perform_create(self, serializer):
+        self._save_with_key(serializer)
+    
+    def perform_update(self, serializer):
+        self._save_with_key(serializer)
+    
     @action(detail=False, methods=['post'])
     def generate_pros_cons(self, request):
-        """Generate pros and cons for a career or course"""
+        """Generate pros and cons for a career or course, reusing a fresh identical result"""
         serializer = AICareerProsConsCreateSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
+        if wants_background(request.data):
+            job = enqueue('pros_cons', dict(serializer.validated_data), user_id=request.user.pk)
+            return Response({'job': ChatJobSerializer(job).data}, status=status.HTTP_202_ACCEPTED)
+        
         try:
-            ai_service = AIProsConsService()
-            pros_cons = ai_service.generate_pros_cons(
+            career_pros_cons, _ = get_or_generate(
                 career_name=serializer.validated_data['career_name'],
                 course_name=serializer.validated_data.get('course_name'),
                 context=serializer.validated_data.get('context', '')
             )
-            
-            # Save to database
-            career_pros_cons = CareerProsCons.objects.create(
-                career_name=serializer.validated_data['career_name'],
-                course_name=serializer.validated_data.get('course_name'),
-                pros=pros_cons['pros'],
-                cons=pros_cons['cons'],
-                context=serializer.validated_data.get('context', ''),
-                generated_by='ai_chatbot'
-            )
-            
             return Response(AICareerProsConsSerializer(career_pros_cons).data)
             
         except Exception as e:
@@ -153,3 +203,17 @@ class ChatbotSettingsViewSet(viewsets.ReadOnlyModelViewSet):
     
     def get_queryset(self):
         return ChatbotSettings.objects.filter(is_active=True)
+    
+    @action(detail=False, methods=['get'], url_path='provider-health', permission_classes=[IsAdminUser])
+    def provider_health(self, request):
+        """Circuit state, error counts and latency percentiles per provider (this worker process)"""
+        return Response({'pid': os.getpid(), 'providers': provider_health.snapshot()})
+
+
+class ChatJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Status and result of the current user's queued AI generation jobs"""
+    serializer_class = ChatJobSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return ChatJob.objects.filter(user=self.request.user)
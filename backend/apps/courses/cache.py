@@ -0,0 +1,23 @@
+import uuid
+
+from django.core.cache import cache
+
+
+CATALOG_VERSION_KEY = 'catalog:version'
+
+
+def get_catalog_version():
+    """
+    Opaque token that changes whenever the course catalog changes.
+    Include it in cache keys of anything derived from courses or universities.
+    """
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(CATALOG_VERSION_KEY, version, None)
+    return version
+
+
+def bump_catalog_version():
+    """Invalidate every cache entry keyed on the current catalog version"""
+    cache.set(CATALOG_VERSION_KEY, uuid.uuid4().hex, None)
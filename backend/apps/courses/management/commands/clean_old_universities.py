@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from apps.courses.models import University
+from apps.chatbot.retrieval import catalog_update
 
 
 class Command(BaseCommand):
@@ -12,6 +13,7 @@ class Command(BaseCommand):
             help='Show what would be deleted without actually deleting',
         )
 
+    @catalog_update()
     def handle(self, *args, **options):
         # Find universities without codes (the old generic ones)
         old_universities = University.objects.filter(code__isnull=True)
@@ -2,6 +2,7 @@ import pandas as pd
 import os
 from django.core.management.base import BaseCommand
 from apps.courses.models import CourseUniversity, Course, University
+from apps.chatbot.retrieval import catalog_update
 
 
 class Command(BaseCommand):
@@ -14,6 +15,7 @@ class Command(BaseCommand):
             help='Perform a dry run without actually updating any records.',
         )
 
+    @catalog_update()
     def handle(self, *args, **kwargs):
         # Path to the Excel file
         excel_path = os.path.join("kuccps data", "DEGREE_UNI_CLUSTER EDUPATH.xlsx")
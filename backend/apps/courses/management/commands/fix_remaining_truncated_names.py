@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from apps.courses.models import Course
+from apps.chatbot.retrieval import catalog_update
 
 
 class Command(BaseCommand):
@@ -12,6 +13,7 @@ class Command(BaseCommand):
             help='Show what would be updated without actually updating',
         )
 
+    @catalog_update()
     def handle(self, *args, **options):
         # Specific mappings for remaining truncated names
         name_fixes = {
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from apps.courses.models import Course
+from apps.chatbot.retrieval import catalog_update
 import pandas as pd
 import os
 
@@ -7,6 +8,7 @@ import os
 class Command(BaseCommand):
     help = 'Import course categories from Excel sheet names'
 
+    @catalog_update()
     def handle(self, *args, **kwargs):
         # Path to the Excel file - try multiple possible locations
         possible_paths = [
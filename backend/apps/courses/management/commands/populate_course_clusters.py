@@ -1,10 +1,12 @@
 from django.core.management.base import BaseCommand
 from apps.courses.models import Course
+from apps.chatbot.retrieval import catalog_update
 
 
 class Command(BaseCommand):
     help = 'Populate missing cluster subjects and points for courses'
 
+    @catalog_update()
     def handle(self, *args, **kwargs):
         # Sample cluster data for different course types
         cluster_data = {
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from apps.courses.models import Course, University, CourseUniversity
+from apps.chatbot.retrieval import catalog_update
 import random
 from decimal import Decimal
 
@@ -7,6 +8,7 @@ from decimal import Decimal
 class Command(BaseCommand):
     help = 'Populate sample course-university relationships with realistic data'
 
+    @catalog_update()
     def handle(self, *args, **options):
         courses = Course.objects.all()
         universities = University.objects.all()
@@ -2,6 +2,7 @@ import pandas as pd
 import os
 from django.core.management.base import BaseCommand
 from apps.courses.models import Course, CourseUniversity
+from apps.chatbot.retrieval import catalog_update
 from django.db import transaction
 
 
@@ -20,6 +21,7 @@ class Command(BaseCommand):
             help='Keep existing CourseUniversity relationships (not recommended).',
         )
 
+    @catalog_update()
     def handle(self, *args, **kwargs):
         # Path to the Excel file
         excel_path = os.path.join("kuccps data", "COURSE NAME AND CODE.xlsx")
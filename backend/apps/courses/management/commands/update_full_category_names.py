@@ -2,6 +2,7 @@ import os
 import pandas as pd
 from django.core.management.base import BaseCommand
 from apps.courses.models import Course
+from apps.chatbot.retrieval import catalog_update
 
 
 class Command(BaseCommand):
@@ -14,6 +15,7 @@ class Command(BaseCommand):
             help='Show what would be updated without actually updating',
         )
 
+    @catalog_update()
     def handle(self, *args, **options):
         # Path to the CSV file - try multiple possible locations
         possible_paths = [
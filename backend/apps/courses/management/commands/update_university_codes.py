@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from apps.courses.models import University
+from apps.chatbot.retrieval import catalog_update
 import pandas as pd
 import os
 
@@ -7,6 +8,7 @@ import os
 class Command(BaseCommand):
     help = 'Update university names and codes from KUCCPS data CSV file'
 
+    @catalog_update()
     def handle(self, *args, **kwargs):
         # Path to the CSV file - try multiple possible locations
         possible_paths = [
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_catalog_version
+from .models import Course, CourseUniversity, University
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=University)
+@receiver(post_delete, sender=University)
+@receiver(post_save, sender=CourseUniversity)
+@receiver(post_delete, sender=CourseUniversity)
+def catalog_changed(sender, **kwargs):
+    """Catalog imports save row by row, so every write bumps the catalog version"""
+    bump_catalog_version()
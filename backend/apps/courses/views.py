@@ -1,3 +1,5 @@
+import uuid
+
 from rest_framework import viewsets, filters, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -16,6 +18,8 @@ from .utils import (
     calculate_cluster_points,
 )
 from apps.authentication.models import AcademicProfile
+from apps.careers.models import CourseCareer
+from apps.careers.serializers import CourseCareerSerializer
 
 
 class UniversityViewSet(viewsets.ReadOnlyModelViewSet):
@@ -106,6 +110,16 @@ class CourseViewSet(viewsets.ReadOnlyModelViewSet):
         except (ValueError, TypeError):
             return Response({'error': 'Invalid cluster_points value'}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=['get'])
+    def careers(self, request, pk=None):
+        """Careers this course leads to, best matches first"""
+        try:
+            pk = uuid.UUID(str(pk))
+        except ValueError:
+            return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
+        links = CourseCareer.objects.filter(course_id=pk).select_related('career').order_by('-confidence')
+        return Response(CourseCareerSerializer(links, many=True).data)
+
 
 class CourseUniversityViewSet(viewsets.ReadOnlyModelViewSet):
     """Course-University relationships"""
@@ -5,3 +5,6 @@ class HubsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.hubs'
     label = 'hubs'
+
+    def ready(self):
+        from . import signals  # noqa: F401
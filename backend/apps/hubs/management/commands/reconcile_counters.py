@@ -0,0 +1,131 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from apps.hubs.models import CareerHub, Post, Comment, Vote
+from apps.societies.models import SocietyPost
+
+
+def _count(queryset, group_field):
+    """Correlated COUNT(*) subquery grouped on `group_field`, 0 when there are no rows"""
+    subquery = queryset.order_by().values(group_field).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(subquery, output_field=IntegerField()), 0)
+
+
+def _votes(votable_type, vote_type):
+    return _count(
+        Vote.objects.filter(votable_type=votable_type, votable_id=OuterRef('pk'), vote_type=vote_type),
+        'votable_id',
+    )
+
+
+def _vote_counters(votable_type, with_score=True):
+    upvotes = _votes(votable_type, 'upvote')
+    downvotes = _votes(votable_type, 'downvote')
+    counters = {'upvotes': upvotes, 'downvotes': downvotes}
+    if with_score:
+        counters['score'] = upvotes - downvotes
+    return counters
+
+
+def get_counter_groups():
+    """(label, model, {field: expression computing its true value})"""
+    return [
+        ('hubs', CareerHub, {
+            'member_count': _count(CareerHub.members.through.objects.filter(careerhub_id=OuterRef('pk')), 'careerhub_id'),
+            'active_posts': _count(Post.objects.filter(hub=OuterRef('pk'), is_deleted=False), 'hub'),
+        }),
+        ('posts', Post, {
+            'comment_count': _count(Comment.objects.filter(post=OuterRef('pk'), is_deleted=False), 'post'),
+            **_vote_counters('post'),
+        }),
+        ('comments', Comment, {
+            'reply_count': _count(Comment.objects.filter(parent_comment=OuterRef('pk'), is_deleted=False), 'parent_comment'),
+            **_vote_counters('comment'),
+        }),
+        ('society posts', SocietyPost, _vote_counters('society_post', with_score=False)),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized counters (members, posts, comments, replies, votes) and report drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Rows checked per batch; each batch is its own short statement (default: 2000)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report drift, do not write anything',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        dry_run = options['dry_run']
+
+        for label, model, counters in get_counter_groups():
+            stats = self.reconcile(model, counters, batch_size, dry_run)
+            self.report(label, stats, dry_run)
+
+    def reconcile(self, model, counters, batch_size, dry_run):
+        """
+        Walk the table in primary-key order and fix drifted rows batch by batch.
+        Only rows whose stored value differs are written, in one set-based UPDATE per batch.
+        """
+        actual_names = {field: f'actual_{field}' for field in counters}
+        drift_filter = Q()
+        for field, actual in actual_names.items():
+            drift_filter |= ~Q(**{field: F(actual)})
+
+        stats = {
+            'rows': 0,
+            'drifted_rows': 0,
+            'fields': {field: {'rows': 0, 'total_drift': 0} for field in counters},
+        }
+        last_pk = None
+        while True:
+            batch = model.objects.order_by('pk')
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            pks = list(batch.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            last_pk = pks[-1]
+            stats['rows'] += len(pks)
+
+            drifted = (
+                model.objects.filter(pk__in=pks)
+                .annotate(**{actual_names[field]: expression for field, expression in counters.items()})
+                .filter(drift_filter)
+                .values('pk', *counters, *actual_names.values())
+            )
+            drifted_pks = []
+            for row in drifted:
+                drifted_pks.append(row['pk'])
+                for field, actual in actual_names.items():
+                    difference = abs(row[field] - row[actual])
+                    if difference:
+                        stats['fields'][field]['rows'] += 1
+                        stats['fields'][field]['total_drift'] += difference
+
+            stats['drifted_rows'] += len(drifted_pks)
+            if drifted_pks and not dry_run:
+                model.objects.filter(pk__in=drifted_pks).update(**counters)
+
+        return stats
+
+    def report(self, label, stats, dry_run):
+        style = self.style.WARNING if stats['drifted_rows'] else self.style.SUCCESS
+        action = 'would fix' if dry_run else 'fixed'
+        self.stdout.write(style(
+            f"{label}: {stats['drifted_rows']} of {stats['rows']} rows drifted ({action})"
+        ))
+        for field, field_stats in stats['fields'].items():
+            if field_stats['rows']:
+                self.stdout.write(
+                    f"  - {field}: {field_stats['rows']} rows, total drift {field_stats['total_drift']}"
+                )
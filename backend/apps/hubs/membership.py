@@ -0,0 +1,33 @@
+from django.core.cache import cache
+
+from .models import CareerHub
+
+
+JOINED_HUBS_CACHE_TIMEOUT = 60 * 60  # seconds; membership changes invalidate explicitly
+
+
+def _cache_key(user_id):
+    return f'joined_hubs:{user_id}'
+
+
+def get_joined_hub_ids(user):
+    """
+    Return the set of hub ids a user has joined, served from cache when possible.
+    For display only: membership writes and permission checks query the table.
+    """
+    if not user or not user.is_authenticated:
+        return set()
+
+    key = _cache_key(user.pk)
+    hub_ids = cache.get(key)
+    if hub_ids is None:
+        hub_ids = set(
+            CareerHub.members.through.objects.filter(user_id=user.pk).values_list('careerhub_id', flat=True)
+        )
+        cache.set(key, hub_ids, JOINED_HUBS_CACHE_TIMEOUT)
+    return hub_ids
+
+
+def invalidate_joined_hubs(*user_ids):
+    """Forget the cached joined hub ids of the given users"""
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
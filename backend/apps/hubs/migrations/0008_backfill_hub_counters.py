@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:40
+
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count(queryset, group_field):
+    subquery = queryset.order_by().values(group_field).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(subquery, output_field=IntegerField()), 0)
+
+
+def backfill_hub_counters(apps, schema_editor):
+    # active_posts and member_count are served straight from the columns now,
+    # so replace the seeded placeholder values with the real counts
+    CareerHub = apps.get_model('hubs', 'CareerHub')
+    Post = apps.get_model('hubs', 'Post')
+    CareerHub.objects.update(
+        member_count=_count(CareerHub.members.through.objects.filter(careerhub_id=OuterRef('pk')), 'careerhub_id'),
+        active_posts=_count(Post.objects.filter(hub=OuterRef('pk'), is_deleted=False), 'hub'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hubs', '0007_careerhub_related_societies'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_hub_counters, migrations.RunPython.noop),
+    ]
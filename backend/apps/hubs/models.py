@@ -1,9 +1,40 @@
 from django.db import models
-from django.utils.text import slugify
+from django.utils import timezone
 from apps.authentication.models import User
+from .utils import save_with_unique_slug
 import uuid
 
 
+class TrackChangesMixin:
+    """
+    Remember the values of `tracked_fields` as they were loaded from the database,
+    so that edits can be detected on save without re-reading the row.
+    """
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_tracked_fields()
+        return instance
+
+    def _snapshot_tracked_fields(self):
+        self._loaded_values = {
+            name: self.__dict__[name] for name in self.tracked_fields if name in self.__dict__
+        }
+
+    def get_changed_fields(self):
+        """Return the tracked fields whose value differs from the loaded one"""
+        if self._state.adding:
+            return set(self.tracked_fields)
+        loaded = getattr(self, '_loaded_values', {})
+        return {
+            name for name, value in loaded.items()
+            if self.__dict__.get(name, value) != value
+        }
+
+
 class CareerHub(models.Model):
     """Career-specific community hubs"""
 
@@ -34,19 +65,13 @@ class CareerHub(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug and self.name:
-            base_slug = slugify(self.name)
-            slug_candidate = base_slug
-            counter = 1
-
-            while CareerHub.objects.filter(slug=slug_candidate).exclude(pk=self.pk).exists():
-                counter += 1
-                slug_candidate = f"{base_slug}-{counter}"
-
-            self.slug = slug_candidate
+            save_with_unique_slug(self, self.name, lambda: super(CareerHub, self).save(*args, **kwargs))
+            return
 
         super().save(*args, **kwargs)
 
     def update_member_count(self):
+        """Recount members from scratch; joins and leaves adjust the count incrementally"""
         self.member_count = self.members.count()
         self.save(update_fields=['member_count'])
 
@@ -55,11 +80,11 @@ class CareerHub(models.Model):
         return self.posts.filter(is_deleted=False).count()
 
     def update_active_posts(self):
-        self.active_posts = self.posts.count()
+        self.active_posts = self.get_active_posts_count()
         self.save(update_fields=['active_posts'])
 
 
-class Post(models.Model):
+class Post(TrackChangesMixin, models.Model):
     """Forum posts"""
     
     POST_TYPES = [
@@ -101,6 +126,8 @@ class Post(models.Model):
     edited_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='edited_posts')
     deleted_at = models.DateTimeField(null=True, blank=True)
     
+    tracked_fields = ('title', 'content')
+    
     class Meta:
         db_table = 'posts'
         ordering = ['-created_at']
@@ -116,35 +143,25 @@ class Post(models.Model):
         return self.title
     
     def save(self, *args, **kwargs):
-        from django.utils import timezone
-        
-        # Auto-generate slug from title
-        if not self.slug and self.title:
-            base_slug = slugify(self.title)[:300]
-            slug_candidate = base_slug
-            counter = 1
-            
-            while Post.objects.filter(slug=slug_candidate).exclude(pk=self.pk).exists():
-                counter += 1
-                slug_candidate = f"{base_slug}-{counter}"
-            
-            self.slug = slug_candidate
-        
         # Update score cache
         self.score = self.upvotes - self.downvotes
         
-        # Set updated_at manually on content change
-        if self.pk:
-            original = Post.objects.filter(pk=self.pk).first()
-            if original and (original.content != self.content or original.title != self.title):
-                self.updated_at = timezone.now()
-                self.is_edited = True
-            # Don't update updated_at for vote changes
-        else:
-            # New post - always set updated_at
+        # Set updated_at manually on content change; vote saves leave it alone
+        if self._state.adding:
             self.updated_at = timezone.now()
+        elif self.get_changed_fields():
+            self.updated_at = self.edited_at = timezone.now()
+            self.is_edited = True
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'updated_at', 'edited_at', 'is_edited'}
         
-        super().save(*args, **kwargs)
+        # Auto-generate slug from title
+        if not self.slug and self.title:
+            save_with_unique_slug(self, self.title, lambda: super(Post, self).save(*args, **kwargs))
+        else:
+            super().save(*args, **kwargs)
+        self._snapshot_tracked_fields()
     
     def update_score(self):
         """Recalculate score from votes table"""
@@ -159,7 +176,7 @@ class Post(models.Model):
         self.save(update_fields=['upvotes', 'downvotes', 'score'])
 
 
-class Comment(models.Model):
+class Comment(TrackChangesMixin, models.Model):
     """Threaded comments on posts"""
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -192,6 +209,8 @@ class Comment(models.Model):
     edited_at = models.DateTimeField(null=True, blank=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
     
+    tracked_fields = ('content',)
+    
     class Meta:
         db_table = 'comments'
         ordering = ['-created_at']
@@ -204,8 +223,6 @@ class Comment(models.Model):
         return f"Comment by {self.author.username if self.author else 'Deleted User'}"
     
     def save(self, *args, **kwargs):
-        from django.utils import timezone
-        
         # Update score cache
         self.score = self.upvotes - self.downvotes
         
@@ -220,18 +237,18 @@ class Comment(models.Model):
             self.depth = 0
             self.path = None
         
-        # Set updated_at manually on content change
-        if self.pk:
-            original = Comment.objects.filter(pk=self.pk).first()
-            if original and original.content != self.content:
-                self.updated_at = timezone.now()
-                self.is_edited = True
-            # Don't update updated_at for vote changes
-        else:
-            # New comment - always set updated_at
+        # Set updated_at manually on content change; vote saves leave it alone
+        if self._state.adding:
             self.updated_at = timezone.now()
+        elif self.get_changed_fields():
+            self.updated_at = self.edited_at = timezone.now()
+            self.is_edited = True
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'updated_at', 'edited_at', 'is_edited'}
         
         super().save(*args, **kwargs)
+        self._snapshot_tracked_fields()
     
     def update_score(self):
         """Recalculate score from votes table"""
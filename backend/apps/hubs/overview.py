@@ -0,0 +1,97 @@
+"""
+Cached assembly of hub landing pages.
+
+The parts of a hub overview that are the same for every visitor (hub
+details, recent posts, related courses) are cached per hub. Per-user
+fields (`is_member`, `user_vote`) are overlaid on each request from the
+cached joined-hubs set and a single vote lookup.
+"""
+import uuid
+
+from django.core.cache import cache
+
+from apps.courses.cache import get_catalog_version
+from apps.courses.models import Course
+from apps.courses.serializers import CourseListSerializer
+from .membership import get_joined_hub_ids
+from .models import Vote
+
+
+HUB_OVERVIEW_CACHE_TIMEOUT = 5 * 60  # seconds
+RELATED_COURSES_CACHE_TIMEOUT = 60 * 60  # seconds; catalog changes bump the key
+OVERVIEW_RECENT_POSTS = 5
+OVERVIEW_RELATED_COURSES = 6
+
+
+def _overview_key(hub_pk):
+    return f'hub_overview:{hub_pk}'
+
+
+def invalidate_hub_overview(*hub_pks):
+    cache.delete_many([_overview_key(pk) for pk in hub_pks])
+
+
+def get_related_courses(category, limit):
+    """Serialized courses in a hub's category, cached per catalog version"""
+    key = f'hub_related_courses:{get_catalog_version()}:{category.lower()}:{limit or "all"}'
+    courses = cache.get(key)
+    if courses is None:
+        courses_qs = Course.objects.filter(category__iexact=category).order_by('name')
+        if limit:
+            courses_qs = courses_qs[:limit]
+        courses = CourseListSerializer(courses_qs, many=True).data
+        cache.set(key, courses, RELATED_COURSES_CACHE_TIMEOUT)
+    return courses
+
+
+def get_cached_overview(hub_pk):
+    """Return the shared overview of a hub, or None when it has to be built"""
+    try:
+        hub_pk = uuid.UUID(str(hub_pk))
+    except ValueError:
+        return None
+    overview = cache.get(_overview_key(hub_pk))
+    if overview is None or overview['catalog_version'] != get_catalog_version():
+        return None
+    return overview
+
+
+def build_overview(hub):
+    """Assemble and cache the visitor-independent part of a hub overview"""
+    from .serializers import CareerHubSerializer, PostSerializer
+
+    posts_qs = hub.posts.filter(is_deleted=False).select_related('author').order_by('-created_at')[:OVERVIEW_RECENT_POSTS]
+    context = {'request': None, 'member_hub_ids': set(), 'user_votes': {}}
+    overview = {
+        'catalog_version': get_catalog_version(),
+        'hub': CareerHubSerializer(hub, context=context).data,
+        'recent_posts': PostSerializer(posts_qs, many=True, context=context).data,
+        'related_courses': get_related_courses(hub.category, OVERVIEW_RELATED_COURSES),
+    }
+    cache.set(_overview_key(hub.pk), overview, HUB_OVERVIEW_CACHE_TIMEOUT)
+    return overview
+
+
+def personalize_overview(overview, user):
+    """Overlay the requesting user's membership and votes on a shared overview"""
+    joined_hub_ids = get_joined_hub_ids(user)
+    hub_data = dict(overview['hub'])
+    hub_data['is_member'] = str(hub_data['id']) in {str(pk) for pk in joined_hub_ids}
+
+    recent_posts = [dict(post) for post in overview['recent_posts']]
+    if user and user.is_authenticated and recent_posts:
+        user_votes = {
+            str(votable_id): vote_type
+            for votable_id, vote_type in Vote.objects.filter(
+                user=user, votable_type='post', votable_id__in=[post['id'] for post in recent_posts]
+            ).values_list('votable_id', 'vote_type')
+        }
+        for post in recent_posts:
+            post['is_member'] = hub_data['is_member']
+            post['user_vote'] = user_votes.get(str(post['id']))
+
+    return {
+        'hub': hub_data,
+        'recent_posts': recent_posts,
+        'related_courses': overview['related_courses'],
+    }
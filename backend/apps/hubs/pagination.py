@@ -0,0 +1,116 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .feeds import encode_cursor
+
+
+def keyset_after(ordering, key):
+    """Condition selecting rows strictly after `key` (one value per `ordering` term)"""
+    condition = Q()
+    for index, term in enumerate(ordering):
+        field = term.lstrip('-')
+        step = Q(**{f"{field}__{'lt' if term.startswith('-') else 'gt'}": key[index]})
+        for previous, value in zip(ordering[:index], key[:index]):
+            step &= Q(**{previous.lstrip('-'): value})
+        condition |= step
+    return condition
+
+
+class FeedCursorPagination(CursorPagination):
+    """
+    Count-free keyset pagination for high-volume feeds.
+
+    Unlike PageNumberPagination there is no COUNT(*) and no growing OFFSET:
+    every page is a range scan on the `(..., created_at)` indexes, so deep
+    scrolling costs the same as the first page. Orderings requested through
+    the view's OrderingFilter get `created_at` appended as a tie-breaker.
+
+    DRF cursors only key on the first ordering field, which would page through
+    an OFFSET inside each group of equal scores. Orderings led by anything but
+    `created_at` (`-score`, `-upvotes`, `-comment_count`) therefore use a
+    composite cursor over every ordering field plus the primary key, as the
+    home feed does, so `-score` pages are range scans on `(-score, -created_at)`.
+    Those pages link forward only.
+    """
+
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at',)
+    tiebreaker = '-created_at'
+    keyset_ordering = None
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        tiebreaker_field = self.tiebreaker.lstrip('-')
+        if all(field.lstrip('-') != tiebreaker_field for field in ordering):
+            ordering += (self.tiebreaker,)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = self.get_ordering(request, queryset, view)
+        if ordering[0].lstrip('-') == self.tiebreaker.lstrip('-'):
+            self.keyset_ordering = None
+            return super().paginate_queryset(queryset, request, view)
+
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.keyset_ordering = (*ordering, '-pk' if self.tiebreaker.startswith('-') else 'pk')
+        self.display_page_controls = False
+
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            queryset = queryset.filter(keyset_after(self.keyset_ordering, self.decode_key(token, queryset.model)))
+        rows = list(queryset.order_by(*self.keyset_ordering)[:self.page_size + 1])
+        self.next_key = self.row_key(rows[self.page_size - 1]) if len(rows) > self.page_size else None
+        return rows[:self.page_size]
+
+    def row_key(self, row):
+        return tuple(getattr(row, term.lstrip('-')) for term in self.keyset_ordering)
+
+    def decode_key(self, token, model):
+        """Sort key of a composite cursor, converted back to each field's type"""
+        fields = [
+            model._meta.pk if term.lstrip('-') == 'pk' else model._meta.get_field(term.lstrip('-'))
+            for term in self.keyset_ordering
+        ]
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            if not isinstance(payload, list) or len(payload) != len(fields):
+                raise ValueError(token)
+            key = tuple(field.to_python(value) for field, value in zip(fields, payload))
+        except (ValueError, TypeError, UnicodeDecodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in key:
+            raise NotFound(self.invalid_cursor_message)
+        return key
+
+    def get_paginated_response(self, data):
+        if self.keyset_ordering is None:
+            return super().get_paginated_response(data)
+        next_url = None
+        if self.next_key is not None:
+            next_url = replace_query_param(self.base_url, self.cursor_query_param, encode_cursor(self.next_key))
+        return Response({'next': next_url, 'previous': None, 'results': data})
+
+    @classmethod
+    def is_requested(cls, request):
+        """Whether the client asked for a cursor page on an endpoint that returns a plain list by default"""
+        params = request.query_params
+        return cls.cursor_query_param in params or cls.page_size_query_param in params
+
+
+class ChronologicalCursorPagination(FeedCursorPagination):
+    """Oldest-first variant, used for chat transcripts"""
+
+    ordering = ('created_at',)
+    tiebreaker = 'created_at'
@@ -1,11 +1,20 @@
 from rest_framework import serializers
 from .models import CareerHub, Post, Comment, Vote
+from .membership import get_joined_hub_ids
 from apps.authentication.serializers import UserSerializer
 
 
+def member_hub_ids(context):
+    """Joined hub ids of the requesting user, looked up once per serialization"""
+    if 'member_hub_ids' not in context:
+        request = context.get('request')
+        context['member_hub_ids'] = get_joined_hub_ids(getattr(request, 'user', None))
+    return context['member_hub_ids']
+
+
 class CareerHubSerializer(serializers.ModelSerializer):
     member_count = serializers.ReadOnlyField()
-    active_posts = serializers.SerializerMethodField()
+    active_posts = serializers.ReadOnlyField()
     is_member = serializers.SerializerMethodField()
 
     class Meta:
@@ -37,16 +46,12 @@ class CareerHubSerializer(serializers.ModelSerializer):
             'is_member',
         ]
 
-    def get_active_posts(self, obj):
-        """Get the actual count of posts in this hub"""
-        return obj.get_active_posts_count()
-
     def get_is_member(self, obj):
         request = self.context.get('request')
         user = getattr(request, 'user', None)
         if not user or not user.is_authenticated:
             return False
-        return obj.members.filter(pk=user.pk).exists()
+        return obj.pk in member_hub_ids(self.context)
 
 
 class PostSerializer(serializers.ModelSerializer):
@@ -108,13 +113,16 @@ class PostSerializer(serializers.ModelSerializer):
         user = getattr(request, 'user', None)
         if not user or not user.is_authenticated:
             return False
-        return obj.hub.members.filter(pk=user.pk).exists()
+        return obj.hub_id in member_hub_ids(self.context)
 
     def get_user_vote(self, obj):
         request = self.context.get('request')
         user = getattr(request, 'user', None)
         if not user or not user.is_authenticated:
             return None
+        user_votes = self.context.get('user_votes')
+        if user_votes is not None:
+            return user_votes.get(obj.id)
         vote = Vote.objects.filter(user=user, votable_type='post', votable_id=obj.id).first()
         return vote.vote_type if vote else None
 
@@ -0,0 +1,80 @@
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+
+from .feeds import invalidate_home_feed
+from .membership import invalidate_joined_hubs
+from .overview import invalidate_hub_overview
+from .models import CareerHub
+
+
+HubMembership = CareerHub.members.through
+
+
+def _adjust_member_counts(hub_ids, delta):
+    if not hub_ids or not delta:
+        return
+    CareerHub.objects.filter(pk__in=hub_ids).update(member_count=F('member_count') + delta)
+    invalidate_hub_overview(*hub_ids)
+
+
+def _invalidate_members(user_ids):
+    user_ids = list(user_ids)
+    if user_ids:
+        invalidate_joined_hubs(*user_ids)
+        for user_id in user_ids:
+            invalidate_home_feed(user_id)
+
+
+@receiver(m2m_changed, sender=HubMembership)
+def sync_hub_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Keep `CareerHub.member_count` and the joined-hubs cache in step with the
+    membership table, whichever side of the relation was changed.
+    """
+    if action == 'pre_remove':
+        # remove() reports the ids it was given, not the rows it deleted
+        memberships = HubMembership.objects.filter(
+            **{'careerhub_id__in' if reverse else 'user_id__in': pk_set},
+            **{'user_id' if reverse else 'careerhub_id': instance.pk},
+        )
+        instance._removed_membership_ids = set(
+            memberships.values_list('careerhub_id' if reverse else 'user_id', flat=True)
+        )
+        return
+
+    if action == 'pre_clear':
+        if reverse:
+            instance._removed_membership_ids = set(
+                HubMembership.objects.filter(user_id=instance.pk).values_list('careerhub_id', flat=True)
+            )
+        else:
+            instance._removed_membership_ids = set(
+                HubMembership.objects.filter(careerhub_id=instance.pk).values_list('user_id', flat=True)
+            )
+        return
+
+    if action == 'post_add':
+        changed_ids, delta = pk_set or set(), 1
+    elif action in ('post_remove', 'post_clear'):
+        changed_ids, delta = getattr(instance, '_removed_membership_ids', set()), -1
+        instance._removed_membership_ids = set()
+    else:
+        return
+
+    if not changed_ids:
+        return
+
+    if reverse:
+        # user.joined_hubs changed: one membership per hub
+        _adjust_member_counts(changed_ids, delta)
+        _invalidate_members([instance.pk])
+    else:
+        # hub.members changed: several users on one hub
+        _adjust_member_counts([instance.pk], delta * len(changed_ids))
+        _invalidate_members(changed_ids)
+
+
+@receiver(post_save, sender=CareerHub)
+def hub_saved(sender, instance, **kwargs):
+    invalidate_hub_overview(instance.pk)
@@ -0,0 +1,50 @@
+from django.db import IntegrityError, transaction
+from django.utils.crypto import get_random_string
+from django.utils.text import slugify
+
+
+SLUG_SUFFIX_LENGTH = 6
+SLUG_SUFFIX_CHARS = 'abcdefghijklmnopqrstuvwxyz0123456789'
+SLUG_MAX_ATTEMPTS = 5
+
+
+def slug_candidates(value, max_length, attempts=SLUG_MAX_ATTEMPTS):
+    """
+    Yield slug candidates for `value`.
+    The plain slug comes first, followed by variants with a short random suffix.
+    """
+    base_slug = slugify(value) or 'item'
+    yield base_slug[:max_length]
+
+    prefix = base_slug[:max_length - SLUG_SUFFIX_LENGTH - 1].rstrip('-')
+    for _ in range(attempts - 1):
+        yield f"{prefix}-{get_random_string(SLUG_SUFFIX_LENGTH, SLUG_SUFFIX_CHARS)}"
+
+
+def save_with_unique_slug(instance, value, save, field_name='slug'):
+    """
+    Assign a unique slug derived from `value` and persist the instance with `save`.
+
+    Uniqueness is enforced by the database constraint instead of probing with
+    `exists()` before every insert: each candidate is saved inside a savepoint
+    and a conflict simply moves on to the next candidate. The cost is constant
+    no matter how many rows already share the same title.
+    """
+    model = type(instance)
+    max_length = model._meta.get_field(field_name).max_length
+
+    for candidate in slug_candidates(value, max_length):
+        setattr(instance, field_name, candidate)
+        try:
+            with transaction.atomic(using=instance._state.db):
+                save()
+            return
+        except IntegrityError:
+            # Only retry when the slug is what collided
+            taken = model._default_manager.filter(**{field_name: candidate}).exclude(pk=instance.pk).exists()
+            if not taken:
+                setattr(instance, field_name, None)
+                raise
+
+    setattr(instance, field_name, None)
+    raise IntegrityError(f"Could not allocate a unique {field_name} for {model.__name__}")
@@ -1,20 +1,32 @@
 from rest_framework import viewsets, filters, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db import transaction
+from django.db.models import F
 from .models import CareerHub, Post, Comment, Vote
-from apps.courses.models import Course
-from apps.courses.serializers import CourseListSerializer
+from .pagination import FeedCursorPagination
+from .feeds import (
+    FEED_SORT_KEYS, HOME_FEED_DEFAULT_PAGE_SIZE, HOME_FEED_MAX_PAGE_SIZE,
+    get_home_feed_page, invalidate_home_feed,
+)
+from .membership import get_joined_hub_ids
+from .overview import (
+    build_overview, get_cached_overview, get_related_courses,
+    invalidate_hub_overview, personalize_overview,
+)
 from .serializers import (
     CareerHubSerializer, PostSerializer, PostCreateSerializer,
     CommentSerializer, CommentCreateSerializer, VoteSerializer
 )
+from apps.authentication.activity import record_activity
 from apps.authentication.permissions import IsContributorOrReadOnly, IsAuthorOrReadOnly
 
 
 class CareerHubViewSet(viewsets.ReadOnlyModelViewSet):
     """Career Hub CRUD"""
-    queryset = CareerHub.objects.all().prefetch_related('members')
+    queryset = CareerHub.objects.all()
     serializer_class = CareerHubSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'field', 'description']
@@ -28,8 +40,13 @@ class CareerHubViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def join(self, request, pk=None):
         hub = self.get_object()
+        already_member = hub.members.filter(pk=request.user.pk).exists()
+        # add() skips existing rows, and the signals that keep member_count and the
+        # membership cache in sync only count the rows it inserted
         hub.members.add(request.user)
-        hub.update_member_count()
+        hub.refresh_from_db(fields=['member_count'])
+        if not already_member:
+            record_activity(request.user, 'hub_joined', f"Joined {hub.name}", target=hub)
         serializer = self.get_serializer(hub, context={'request': request})
         return Response({'status': 'joined', 'hub': serializer.data})
 
@@ -37,36 +54,22 @@ class CareerHubViewSet(viewsets.ReadOnlyModelViewSet):
     def leave(self, request, pk=None):
         hub = self.get_object()
         hub.members.remove(request.user)
-        hub.update_member_count()
+        hub.refresh_from_db(fields=['member_count'])
         serializer = self.get_serializer(hub, context={'request': request})
         return Response({'status': 'left', 'hub': serializer.data})
 
     @action(detail=True, methods=['get'])
     def overview(self, request, pk=None):
-        hub = self.get_object()
-        hub_serializer = self.get_serializer(hub, context={'request': request})
-
-        posts_qs = hub.posts.filter(is_deleted=False).select_related('author').order_by('-created_at')[:5]
-        posts = PostSerializer(posts_qs, many=True, context={'request': request}).data
-
-        related_courses_qs = Course.objects.filter(category__iexact=hub.category).order_by('name')[:6]
-        courses = CourseListSerializer(related_courses_qs, many=True, context={'request': request}).data
-
-        return Response({
-            'hub': hub_serializer.data,
-            'recent_posts': posts,
-            'related_courses': courses,
-        })
+        overview = get_cached_overview(pk)
+        if overview is None:
+            overview = build_overview(self.get_object())
+        return Response(personalize_overview(overview, request.user))
 
     @action(detail=True, methods=['get'])
     def related_courses(self, request, pk=None):
         hub = self.get_object()
         limit = int(request.query_params.get('limit', 12))
-        courses_qs = Course.objects.filter(category__iexact=hub.category).order_by('name')
-        if limit:
-            courses_qs = courses_qs[:limit]
-        serializer = CourseListSerializer(courses_qs, many=True, context={'request': request})
-        return Response({'results': serializer.data})
+        return Response({'results': get_related_courses(hub.category, limit)})
 
     @action(detail=True, methods=['get'])
     def recent_posts(self, request, pk=None):
@@ -81,12 +84,13 @@ class CareerHubViewSet(viewsets.ReadOnlyModelViewSet):
 
 class PostViewSet(viewsets.ModelViewSet):
     """Post CRUD and voting"""
-    queryset = Post.objects.filter(is_deleted=False)
+    queryset = Post.objects.filter(is_deleted=False).select_related('author')
     serializer_class = PostSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['hub', 'post_type', 'author']
     search_fields = ['title', 'content']
-    ordering_fields = ['created_at', 'upvotes', 'comment_count']
+    ordering_fields = ['created_at', 'score', 'upvotes', 'comment_count']
+    pagination_class = FeedCursorPagination
     
     def get_permissions(self):
         if self.action in ['create']:
@@ -114,13 +118,68 @@ class PostViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
     
+    @transaction.atomic
     def perform_create(self, serializer):
         # Check if user is a member of the hub
         hub = serializer.validated_data.get('hub')
-        if hub and not hub.members.filter(id=self.request.user.id).exists():
+        if hub and not hub.members.filter(pk=self.request.user.pk).exists():
             from rest_framework.exceptions import PermissionDenied
             raise PermissionDenied("You must be a member of this hub to create posts.")
-        serializer.save(author=self.request.user)
+        post = serializer.save(author=self.request.user)
+        CareerHub.objects.filter(pk=post.hub_id).update(active_posts=F('active_posts') + 1)
+        invalidate_home_feed(self.request.user.pk)
+        invalidate_hub_overview(post.hub_id)
+        record_activity(
+            self.request.user, 'post_created', f"Created a post: {post.title}",
+            target=post, metadata={'hub_id': str(post.hub_id)},
+        )
+    
+    def perform_update(self, serializer):
+        previous_hub_id = serializer.instance.hub_id
+        post = serializer.save()
+        invalidate_hub_overview(previous_hub_id, post.hub_id)
+    
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        if not instance.is_deleted:
+            CareerHub.objects.filter(pk=instance.hub_id).update(active_posts=F('active_posts') - 1)
+        instance.delete()
+        invalidate_hub_overview(instance.hub_id)
+    
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def home(self, request):
+        """Posts from every hub the user has joined, merged server-side"""
+        sort = request.query_params.get('sort', 'new')
+        if sort not in FEED_SORT_KEYS:
+            return Response({'error': 'Invalid sort'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            page_size = int(request.query_params.get('page_size', HOME_FEED_DEFAULT_PAGE_SIZE))
+        except ValueError:
+            page_size = HOME_FEED_DEFAULT_PAGE_SIZE
+        page_size = max(1, min(page_size, HOME_FEED_MAX_PAGE_SIZE))
+        
+        hub_ids = get_joined_hub_ids(request.user)
+        post_ids, next_cursor = get_home_feed_page(
+            request.user, hub_ids, sort=sort,
+            cursor=request.query_params.get('cursor'), page_size=page_size,
+        )
+        
+        posts = Post.objects.filter(id__in=post_ids, is_deleted=False).select_related('author')
+        posts_by_id = {post.id: post for post in posts}
+        page = [posts_by_id[post_id] for post_id in post_ids if post_id in posts_by_id]
+        
+        context = self.get_serializer_context()
+        context['member_hub_ids'] = hub_ids
+        context['user_votes'] = dict(
+            Vote.objects.filter(user=request.user, votable_type='post', votable_id__in=post_ids)
+            .values_list('votable_id', 'vote_type')
+        )
+        serializer = PostSerializer(page, many=True, context=context)
+        
+        next_url = None
+        if next_cursor:
+            next_url = replace_query_param(request.build_absolute_uri(), 'cursor', next_cursor)
+        return Response({'next': next_url, 'previous': None, 'results': serializer.data})
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def vote(self, request, pk=None):
@@ -146,6 +205,12 @@ class PostViewSet(viewsets.ModelViewSet):
         post.upvotes = Vote.objects.filter(votable_type='post', votable_id=post.id, vote_type='upvote').count()
         post.downvotes = Vote.objects.filter(votable_type='post', votable_id=post.id, vote_type='downvote').count()
         post.save()
+        invalidate_hub_overview(post.hub_id)
+        if vote_type == 'upvote':
+            record_activity(
+                request.user, 'post_upvoted', f"Upvoted a post: {post.title}",
+                target=post, metadata={'author_id': str(post.author_id)},
+            )
         
         return Response({'status': 'voted', 'upvotes': post.upvotes, 'downvotes': post.downvotes})
     
@@ -158,18 +223,21 @@ class PostViewSet(viewsets.ModelViewSet):
         # Update post vote counts
         post.upvotes = Vote.objects.filter(votable_type='post', votable_id=post.id, vote_type='upvote').count()
         post.downvotes = Vote.objects.filter(votable_type='post', votable_id=post.id, vote_type='downvote').count()
+        post.save(update_fields=['upvotes', 'downvotes', 'score'])
+        invalidate_hub_overview(post.hub_id)
         
         return Response({'status': 'unvoted', 'upvotes': post.upvotes, 'downvotes': post.downvotes})
 
 
 class CommentViewSet(viewsets.ModelViewSet):
     """Comment CRUD, replies, and voting"""
-    queryset = Comment.objects.filter(is_deleted=False)
+    queryset = Comment.objects.filter(is_deleted=False).select_related('author')
     serializer_class = CommentSerializer
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['post', 'author', 'parent_comment']
     ordering_fields = ['created_at', 'upvotes']
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = FeedCursorPagination
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -183,12 +251,48 @@ class CommentViewSet(viewsets.ModelViewSet):
             return queryset.filter(parent_comment=parent)
         return queryset.filter(parent_comment__isnull=True)
 
+    @transaction.atomic
     def perform_create(self, serializer):
+        """Create comment with atomic updates to counts"""
         comment = serializer.save(author=self.request.user)
-        # Update post comment count
-        post = comment.post
-        post.comment_count = Comment.objects.filter(post=post, is_deleted=False).count()
-        post.save()
+        
+        # Update parent comment's reply_count atomically if this is a reply
+        if comment.parent_comment_id:
+            Comment.objects.filter(pk=comment.parent_comment_id).update(
+                reply_count=F('reply_count') + 1
+            )
+        
+        # Update post comment count atomically
+        Post.objects.filter(pk=comment.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+        invalidate_hub_overview(comment.post.hub_id)
+        record_activity(
+            self.request.user, 'comment_made', 'Commented on a post',
+            target=comment, metadata={'post_id': str(comment.post_id)},
+        )
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        """Handle comment deletion with proper count updates"""
+        if instance.is_deleted:
+            return
+        
+        # Mark as deleted instead of actually deleting to preserve thread structure
+        instance.is_deleted = True
+        instance.save(update_fields=['is_deleted'])
+        
+        # Decrement parent's reply_count if this is a reply
+        if instance.parent_comment_id:
+            Comment.objects.filter(pk=instance.parent_comment_id).update(
+                reply_count=F('reply_count') - 1
+            )
+        
+        # Decrement post's comment count
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') - 1
+        )
+        invalidate_hub_overview(instance.post.hub_id)
 
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
@@ -224,5 +328,7 @@ class CommentViewSet(viewsets.ModelViewSet):
         comment.upvotes = Vote.objects.filter(votable_type='comment', votable_id=comment.id, vote_type='upvote').count()
         comment.downvotes = Vote.objects.filter(votable_type='comment', votable_id=comment.id, vote_type='downvote').count()
         comment.save()
+        if vote_type == 'upvote':
+            record_activity(request.user, 'comment_upvoted', 'Upvoted a comment', target=comment)
         
         return Response({'status': 'voted', 'upvotes': comment.upvotes, 'downvotes': comment.downvotes})
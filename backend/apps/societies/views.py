@@ -6,6 +6,7 @@ from .models import Society, SocietyPost
 from .serializers import SocietySerializer, SocietyPostSerializer, SocietyPostCreateSerializer
 from apps.authentication.permissions import IsContributorOrReadOnly, IsAuthorOrReadOnly
 from apps.hubs.models import Vote
+from apps.hubs.pagination import FeedCursorPagination
 
 
 class SocietyViewSet(viewsets.ReadOnlyModelViewSet):
@@ -21,12 +22,13 @@ class SocietyViewSet(viewsets.ReadOnlyModelViewSet):
 class SocietyPostViewSet(viewsets.ModelViewSet):
     """Society post CRUD and voting"""
 
-    queryset = SocietyPost.objects.filter(is_deleted=False)
+    queryset = SocietyPost.objects.filter(is_deleted=False).select_related('author')
     serializer_class = SocietyPostSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['society', 'post_type', 'author']
     search_fields = ['title', 'content', 'tags']
     ordering_fields = ['created_at', 'upvotes']
+    pagination_class = FeedCursorPagination
 
     def get_permissions(self):
         if self.action == 'create':
@@ -81,6 +81,63 @@ DATABASES = {
     }
 }
 
+# Cache
+# Auth, membership and feed caches are invalidated explicitly, so production
+# should use a backend shared by all workers (e.g. django.core.cache.backends.redis.RedisCache).
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='edupath'),
+    }
+}
+
+# Activity recording
+# `memory`: bounded in-process buffer flushed by a background thread (may lose
+# buffered events on a crash). `durable`: staged in the activity_queue table and
+# written by `manage.py flush_activities --loop`.
+ACTIVITY_RECORDING_MODE = config('ACTIVITY_RECORDING_MODE', default='memory')
+ACTIVITY_BATCH_SIZE = config('ACTIVITY_BATCH_SIZE', default=200, cast=int)
+ACTIVITY_FLUSH_INTERVAL = config('ACTIVITY_FLUSH_INTERVAL', default=2.0, cast=float)
+ACTIVITY_BUFFER_SIZE = config('ACTIVITY_BUFFER_SIZE', default=10000, cast=int)
+ACTIVITY_RETENTION_DAYS = config('ACTIVITY_RETENTION_DAYS', default=365, cast=int)
+
+# Chatbot
+# Delay between words streamed by the offline `fake` provider
+CHATBOT_FAKE_TOKEN_DELAY = config('CHATBOT_FAKE_TOKEN_DELAY', default=0.02, cast=float)
+# Pooled keep-alive HTTP clients used by the async provider layer
+CHATBOT_HTTP_TIMEOUT = config('CHATBOT_HTTP_TIMEOUT', default=30.0, cast=float)
+CHATBOT_HTTP_CONNECT_TIMEOUT = config('CHATBOT_HTTP_CONNECT_TIMEOUT', default=5.0, cast=float)
+CHATBOT_HTTP_MAX_CONNECTIONS = config('CHATBOT_HTTP_MAX_CONNECTIONS', default=200, cast=int)
+CHATBOT_HTTP_MAX_KEEPALIVE = config('CHATBOT_HTTP_MAX_KEEPALIVE', default=50, cast=int)
+# Threads running synchronous provider calls, so they can time out, fail over and be hedged
+CHATBOT_PROVIDER_THREADS = config('CHATBOT_PROVIDER_THREADS', default=64, cast=int)
+# Approximate token budget for a chat request (system prompt, summary, history and new message);
+# older turns are folded into a rolling per-conversation summary
+CHATBOT_CONTEXT_TOKEN_BUDGET = config('CHATBOT_CONTEXT_TOKEN_BUDGET', default=3000, cast=int)
+CHATBOT_SUMMARY_TOKEN_BUDGET = config('CHATBOT_SUMMARY_TOKEN_BUDGET', default=400, cast=int)
+CHATBOT_MAX_MESSAGE_TOKENS = config('CHATBOT_MAX_MESSAGE_TOKENS', default=800, cast=int)
+# Catalog facts retrieved into the chatbot prompt (see apps/chatbot/retrieval.py)
+CHATBOT_RETRIEVAL_TOP_K = config('CHATBOT_RETRIEVAL_TOP_K', default=8, cast=int)
+CHATBOT_RETRIEVAL_TOKEN_BUDGET = config('CHATBOT_RETRIEVAL_TOKEN_BUDGET', default=500, cast=int)
+# Answer cache for repeated standalone questions (see apps/chatbot/answer_cache.py)
+CHATBOT_CACHE_ENABLED = config('CHATBOT_CACHE_ENABLED', default=True, cast=bool)
+CHATBOT_CACHE_TTL = config('CHATBOT_CACHE_TTL', default=7 * 24 * 3600, cast=int)
+# Seconds generated pros/cons are reused for identical requests (fallback content: much shorter)
+CHATBOT_PROS_CONS_TTL = config('CHATBOT_PROS_CONS_TTL', default=30 * 24 * 3600, cast=int)
+CHATBOT_PROS_CONS_FALLBACK_TTL = config('CHATBOT_PROS_CONS_FALLBACK_TTL', default=3600, cast=int)
+# Background generation jobs, run by `manage.py chat_worker`.
+# With CHATBOT_BACKGROUND_DEFAULT, send_message/generate_pros_cons queue unless the request sends "background": false
+CHATBOT_BACKGROUND_DEFAULT = config('CHATBOT_BACKGROUND_DEFAULT', default=False, cast=bool)
+CHATBOT_JOB_MAX_ATTEMPTS = config('CHATBOT_JOB_MAX_ATTEMPTS', default=3, cast=int)
+# Seconds before the first retry, doubling for each further one
+CHATBOT_JOB_BACKOFF = config('CHATBOT_JOB_BACKOFF', default=5.0, cast=float)
+CHATBOT_JOB_BACKOFF_MAX = config('CHATBOT_JOB_BACKOFF_MAX', default=300.0, cast=float)
+# Seconds after which a running job is assumed abandoned by its worker
+CHATBOT_JOB_LEASE = config('CHATBOT_JOB_LEASE', default=300, cast=int)
+CHATBOT_JOB_CONCURRENCY = config('CHATBOT_JOB_CONCURRENCY', default=4, cast=int)
+CHATBOT_JOB_POLL_INTERVAL = config('CHATBOT_JOB_POLL_INTERVAL', default=1.0, cast=float)
+CHATBOT_JOB_RETENTION_DAYS = config('CHATBOT_JOB_RETENTION_DAYS', default=7, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -120,8 +177,8 @@ AUTH_USER_MODEL = 'authentication.User'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.authentication.authentication.CachedTokenAuthentication',
+        'apps.authentication.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',